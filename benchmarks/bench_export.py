@@ -0,0 +1,64 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# Measures the throughput of exporting work items.
+#
+#   python -m benchmarks.bench_export [workitems] [latency]
+
+import os
+import sys
+import tempfile
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.export import WorkitemExporter
+from vstsclient.transports import InMemoryTransport
+
+def _handler(count):
+    def handler(method, url, body):
+        if method == 'POST':
+            return { 'queryType': 'flat', 'asOf': '2020-01-01T00:00:00Z', 'columns': [], 'workItems': [{ 'id': id } for id in range(count)] }
+
+        ids = url.split('ids=')[1].split('&')[0].split(',')
+        return { 'count': len(ids), 'value': [{ 'id': int(id), 'rev': 1, 'fields': { 'System.Title': 'Item ' + id, 'System.State': 'Active' } } for id in ids] }
+    return handler
+
+def main(count=100000, latency=0.05):
+    directory = tempfile.mkdtemp()
+    for format in ('ndjson', 'csv', 'parquet'):
+        for max_workers in (1, 8):
+            client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=InMemoryTransport(_handler(count), latency))
+            exporter = WorkitemExporter(client, ['System.Title', 'System.State'], max_workers=max_workers)
+            path = os.path.join(directory, 'workitems.' + format)
+            try:
+                exporter.export('SELECT [System.Id] FROM WorkItems', path, format)
+            except ImportError as e:
+                print('{:<8} skipped: {}'.format(format, e))
+                break
+
+            print('{:<8} workers={:<3} rows={:<7} elapsed={:.2f}s throughput={:.0f} rows/s'.format(
+                format, max_workers, exporter.rows, exporter.elapsed, exporter.throughput))
+            os.remove(path)
+    os.rmdir(directory)
+
+if __name__ == '__main__':
+    main(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,85 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# Compares the peak memory of reading a large response the way the client 
+# used to (joining the chunks read from the socket, decoding the body and 
+# parsing it while the raw bytes are still held) with the current response 
+# path, which reads into a single buffer and releases it before parsing.
+#
+#   python -m benchmarks.bench_response [workitems] [description size]
+
+import json
+import sys
+import time
+import tracemalloc
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.transports import Transport, _CHUNK_SIZE, _read_body
+from vstsclient._deserialize import _parse_json_to_workitems
+from vstsclient._http import HTTPResponse
+
+from .bench_streaming import _response
+
+class _SocketTransport(Transport):
+    # Hands out the response in chunks, as if read from a socket
+    def __init__(self, body):
+        self.body = body
+
+    def _chunks(self):
+        for i in range(0, len(self.body), _CHUNK_SIZE):
+            yield self.body[i:i + _CHUNK_SIZE]
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        response_headers = {'content-type': 'application/json', 'content-length': str(len(self.body))}
+        return HTTPResponse(200, 'OK', response_headers, _read_body(self._chunks(), response_headers))
+
+def _previous(transport):
+    # The body as requests' response.content builds it, then decoded and 
+    # parsed while the bytes are still referenced
+    body = b''.join(list(transport._chunks()))
+    return _parse_json_to_workitems(json.loads(body.decode('UTF-8')))
+
+def _measure(func):
+    tracemalloc.start()
+    started = time.monotonic()
+    count = func()
+    elapsed = time.monotonic() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+def main(count=10000, size=2000):
+    transport = _SocketTransport(_response(count, size))
+    ids = list(range(count))
+    client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+    print('response={:.1f}MB'.format(len(transport.body) / 1024 / 1024))
+    for name, func in [
+        ('previous',            lambda: len(_previous(transport))),
+        ('get_workitems_by_id', lambda: len(client.get_workitems_by_id(ids))),
+    ]:
+        items, elapsed, peak = _measure(func)
+        print('{:<20} workitems={:<6} elapsed={:.2f}s peak={:.1f}MB'.format(name, items, elapsed, peak / 1024 / 1024))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
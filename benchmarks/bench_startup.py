@@ -0,0 +1,67 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# Measures the time to import vstsclient and to construct a VstsClient in a 
+# fresh interpreter, and fails when either exceeds its budget.
+#
+#   python -m benchmarks.bench_startup [runs]
+
+import json
+import subprocess
+import sys
+
+IMPORT_BUDGET    = 0.100
+CONSTRUCT_BUDGET = 0.005
+
+_SCRIPT = '''
+import json, time
+started = time.perf_counter()
+from vstsclient.vstsclient import VstsClient
+imported = time.perf_counter()
+VstsClient('dev.azure.com/contoso', 'personal-access-token')
+constructed = time.perf_counter()
+print(json.dumps([imported - started, constructed - imported]))
+'''
+
+def measure(runs=10):
+    '''
+    :return: the fastest import and construction times of the runs, in seconds.
+    '''
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', _SCRIPT])
+        timings.append(json.loads(output.decode('utf-8').strip().splitlines()[-1]))
+    return min(t[0] for t in timings), min(t[1] for t in timings)
+
+def main(runs=10):
+    import_time, construct_time = measure(runs)
+    print('import={:.1f}ms (budget {:.0f}ms) construct={:.2f}ms (budget {:.0f}ms)'.format(
+        import_time * 1000, IMPORT_BUDGET * 1000, construct_time * 1000, CONSTRUCT_BUDGET * 1000))
+
+    if import_time > IMPORT_BUDGET or construct_time > CONSTRUCT_BUDGET:
+        print('Startup budget exceeded')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(*[int(arg) for arg in sys.argv[1:]]))
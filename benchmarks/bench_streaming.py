@@ -0,0 +1,71 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# Compares the peak memory of reading a large batch of work items at once 
+# with streaming them one at a time.
+#
+#   python -m benchmarks.bench_streaming [workitems] [description size]
+
+import json
+import sys
+import time
+import tracemalloc
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.transports import InMemoryTransport
+
+def _response(count, size):
+    return json.dumps({
+        'count': count,
+        'value': [{
+            'id': i,
+            'rev': 1,
+            'fields': { 'System.Title': 'Item {}'.format(i), 'System.Description': 'x' * size },
+            'url': 'https://dev.azure.com/contoso/_apis/wit/workItems/{}'.format(i)
+        } for i in range(count)]
+    }).encode('utf-8')
+
+def _measure(func):
+    tracemalloc.start()
+    started = time.monotonic()
+    count = func()
+    elapsed = time.monotonic() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+def main(count=10000, size=2000):
+    body = _response(count, size)
+    ids = list(range(count))
+    client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=InMemoryTransport(lambda method, url, data: body))
+
+    print('response={:.1f}MB'.format(len(body) / 1024 / 1024))
+    for name, func in [
+        ('get_workitems_by_id',  lambda: len(client.get_workitems_by_id(ids))),
+        ('iter_workitems_by_id', lambda: sum(1 for _ in client.iter_workitems_by_id(ids, chunk_size=count))),
+    ]:
+        items, elapsed, peak = _measure(func)
+        print('{:<21} workitems={:<6} elapsed={:.2f}s peak={:.1f}MB'.format(name, items, elapsed, peak / 1024 / 1024))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,60 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# Measures the throughput of publishing test results.
+#
+#   python -m benchmarks.bench_testresults [results] [latency]
+
+import json
+import sys
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.testresults import TestResultPublisher
+from vstsclient.transports import InMemoryTransport
+
+def _handler(method, url, body):
+    results = json.loads(body)
+    return { 'count': len(results), 'value': [{ 'id': 100000 + i } for i in range(len(results))] }
+
+def _results(count):
+    for i in range(count):
+        yield {
+            'testCaseTitle': 'Test {}'.format(i),
+            'automatedTestName': 'Tests.Test{}'.format(i),
+            'outcome': 'Passed' if i % 10 else 'Failed',
+            'state': 'Completed',
+            'durationInMs': i % 1000
+        }
+
+def main(count=50000, latency=0.05):
+    for max_workers in (1, 4, 8):
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=InMemoryTransport(_handler, latency))
+
+        publisher = TestResultPublisher(client, 'Contoso', 1, chunk_size=1000, max_workers=max_workers)
+        publisher.publish(_results(count))
+
+        print('workers={:<3} results={:<7} elapsed={:.2f}s throughput={:.0f} results/s'.format(
+            max_workers, publisher.published, publisher.elapsed, publisher.throughput))
+
+if __name__ == '__main__':
+    main(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
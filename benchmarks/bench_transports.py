@@ -0,0 +1,105 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+# Compares the throughput of the transports against a local keep-alive server.
+# The server speaks HTTP/1.1 without TLS, so the HTTP/2 transport (if httpx is 
+# installed) falls back to HTTP/1.1 here; multiplexing needs a TLS endpoint.
+#
+#   python -m benchmarks.bench_transports [requests] [workers]
+
+import json
+import sys
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:
+    sys.exit('This benchmark requires Python 3.7 or later')
+
+from vstsclient._concurrency import _imap_unordered
+from vstsclient._http import HTTPRequest
+from vstsclient._http.httpclient import _HTTPClient
+from vstsclient.transports import InMemoryTransport
+
+_BODY = json.dumps({ 'count': 200, 'value': [{ 'id': i, 'rev': 1, 'fields': { 'System.Title': 'Item {}'.format(i) } } for i in range(200)] }).encode('utf-8')
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(_BODY)))
+        self.end_headers()
+        self.wfile.write(_BODY)
+
+    def log_message(self, *args):
+        pass
+
+def _request(host):
+    request = HTTPRequest()
+    request.method = 'GET'
+    request.host = host
+    request.path = '/contoso/_apis/wit/workitems'
+    request.query = 'ids=1,2,3&api-version=5.1'
+    request.headers = {'Accept': 'application/json'}
+    return request
+
+def _run(client, host, count, workers):
+    started = time.monotonic()
+    for _, response in _imap_unordered(lambda _: client.perform_request(_request(host)), range(count), workers):
+        assert response.status == 200
+    return time.monotonic() - started
+
+def main(count=5000, workers=16):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = '127.0.0.1:{}'.format(server.server_address[1])
+
+    transports = [
+        ('requests', 'requests'),
+        ('urllib3',  'urllib3'),
+        ('http2',    'http2'),
+        ('memory',   InMemoryTransport(lambda method, url, body: _BODY)),
+    ]
+
+    for name, transport in transports:
+        client = _HTTPClient('HTTP', timeout=30, transport=transport)
+        try:
+            elapsed = _run(client, host, count, workers)
+        except ImportError as e:
+            print('{:<9} skipped: {}'.format(name, e))
+            continue
+        finally:
+            client.transport.close()
+
+        print('{:<9} requests={:<6} workers={:<3} elapsed={:.2f}s throughput={:.0f} requests/s'.format(
+            name, count, workers, elapsed, count / elapsed))
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
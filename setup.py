@@ -55,5 +55,14 @@ if __name__ == "__main__":
         ],
         zip_safe=False,
         packages=find_packages(),
-        install_requires=['requests', 'logging']
+        install_requires=['requests', 'logging'],
+        extras_require={
+            'http2': ['httpx[http2]'],
+            'parquet': ['pyarrow'],
+        },
+        entry_points={
+            'console_scripts': [
+                'vsts-export=vstsclient.export:main',
+            ],
+        }
     )
\ No newline at end of file
@@ -0,0 +1,114 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.transports import InMemoryTransport
+from vstsclient.batching import WorkitemBatcher
+from vstsclient.models import Workitem
+from vstsclient._http import HTTPError
+
+def _workitem(id):
+    workitem = Workitem()
+    workitem.id = id
+    return workitem
+
+class FakeClient(object):
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def get_workitems_by_id(self, workitem_ids, expand=None, error_policy=None):
+        with self.lock:
+            self.batches.append(sorted(workitem_ids))
+            self.expand = expand
+        if 503 in workitem_ids:
+            raise HTTPError(503, 'Service Unavailable', {}, b'')
+        if 404 in workitem_ids and error_policy != 'omit':
+            raise HTTPError(404, 'Not Found', {}, b'')
+        return [_workitem(id) for id in workitem_ids if id != 404]
+
+class WorkitemBatcherTest(unittest.TestCase):
+    def test_merges_lookups(self):
+        # Arrange
+        client = FakeClient()
+
+        # Act
+        with WorkitemBatcher(client, max_batch_size=3, max_wait=0.5) as batcher:
+            futures = batcher.get_workitems([1, 2, 2, 3, 4])
+            workitems = [future.result() for future in futures]
+
+        # Assert
+        self.assertEqual([1, 2, 2, 3, 4], [workitem.id for workitem in workitems])
+        self.assertEqual([[1, 2, 3], [4]], client.batches)
+
+    def test_isolates_errors(self):
+        # Arrange
+        client = FakeClient()
+
+        # Act
+        with WorkitemBatcher(client, max_wait=0.01) as batcher:
+            found = batcher.get_workitem(1)
+            missing = batcher.get_workitem(404)
+
+            # Assert
+            self.assertEqual(1, found.result().id)
+            with self.assertRaises(HTTPError) as context:
+                missing.result()
+            self.assertEqual(404, context.exception.status)
+            self.assertEqual([[1, 404]], client.batches)
+
+    def test_fails_batch_without_fallback(self):
+        # Arrange
+        client = FakeClient()
+
+        # Act
+        with WorkitemBatcher(client, max_wait=0.01, expand='relations') as batcher:
+            futures = batcher.get_workitems([1, 2, 503])
+
+            # Assert
+            for future in futures:
+                with self.assertRaises(HTTPError) as context:
+                    future.result()
+                self.assertEqual(503, context.exception.status)
+        self.assertEqual([[1, 2, 503]], client.batches)
+        self.assertEqual('relations', client.expand)
+
+    def test_omits_missing_workitems(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: { 'count': 2, 'value': [{ 'id': 1, 'rev': 1, 'fields': {} }, None] })
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        workitems = client.get_workitems_by_id([1, 404], error_policy='omit')
+        streamed  = list(client.iter_workitems_by_id([1, 404], error_policy='omit'))
+
+        # Assert
+        self.assertEqual([1], [workitem.id for workitem in workitems])
+        self.assertEqual([1], [workitem.id for workitem in streamed])
+        self.assertIn('errorPolicy=omit', transport.requests[0][1])
+
+if __name__ == '__main__':
+    unittest.main()
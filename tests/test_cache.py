@@ -0,0 +1,160 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import marshal
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from vstsclient.cache import CacheEntry, DiskCache, MemoryCache
+from vstsclient._http import HTTPRequest
+from vstsclient._http.httpclient import _HTTPClient
+
+class FakeResponse(object):
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.reason = 'OK'
+        self.headers = headers
+        self.content = content
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+    def close(self):
+        pass
+
+class FakeSession(object):
+    def __init__(self):
+        self.headers = {}
+        self.requests = []
+
+    def request(self, method, uri, params=None, headers=None, **kwargs):
+        self.requests.append(dict(headers))
+        if headers.get('If-None-Match') == '"1"':
+            return FakeResponse(304, {'ETag': '"1"'}, b'')
+        return FakeResponse(200, {'ETag': '"1"'}, b'{"id": 1}')
+
+def _request():
+    request = HTTPRequest()
+    request.method = 'GET'
+    request.host = 'dev.azure.com/contoso'
+    request.path = '/_apis/projects'
+    request.query = 'api-version=1.0'
+    request.headers = {'Authorization': 'Basic abc'}
+    return request
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_revalidates_with_etag(self):
+        # Arrange
+        session = FakeSession()
+        cache   = DiskCache(os.path.join(self.directory, 'cache.db'))
+        client  = _HTTPClient('https', session, cache=cache)
+        client.perform_request(_request())
+
+        # Act: a new client, as in another process
+        session = FakeSession()
+        client  = _HTTPClient('https', session, cache=DiskCache(os.path.join(self.directory, 'cache.db')))
+        response = client.perform_request(_request())
+
+        # Assert
+        self.assertEqual('"1"', session.requests[0]['If-None-Match'])
+        self.assertEqual(200, response.status)
+        self.assertEqual(b'{"id": 1}', response.body)
+
+    def test_disk_cache_evicts_least_recently_used(self):
+        # Arrange
+        cache = DiskCache(os.path.join(self.directory, 'cache.db'), max_size=2500)
+        body  = os.urandom(1000)
+
+        # Act
+        cache.set('a', CacheEntry('1', 200, 'OK', {}, body))
+        cache.set('b', CacheEntry('1', 200, 'OK', {}, body))
+        cache.get('a')
+        cache.set('c', CacheEntry('1', 200, 'OK', {}, body))
+
+        # Assert
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(body, cache.get('c').body)
+
+    def test_disk_cache_unreadable_entry_is_a_miss(self):
+        # Arrange
+        path  = os.path.join(self.directory, 'cache.db')
+        cache = DiskCache(path)
+        cache.set('a', CacheEntry('1', 200, 'OK', {}, b'a'))
+        with sqlite3.connect(path) as connection:
+            connection.execute('UPDATE responses SET headers = ? WHERE key = ?', (marshal.dumps({'etag': '1'}), 'a'))
+
+        # Act
+        entry = cache.get('a')
+
+        # Assert
+        self.assertIsNone(entry)
+        with sqlite3.connect(path) as connection:
+            self.assertEqual(0, connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0])
+            self.assertEqual(0, connection.execute('SELECT size FROM totals').fetchone()[0])
+
+    def test_disk_cache_reads_dont_write(self):
+        # Arrange
+        path  = os.path.join(self.directory, 'cache.db')
+        cache = DiskCache(path)
+        cache.set('a', CacheEntry('1', 200, 'OK', {'etag': '1'}, b'a'))
+        cache.set('a', CacheEntry('2', 200, 'OK', {'etag': '2'}, b'b'))
+        with sqlite3.connect(path) as connection:
+            accessed = connection.execute('SELECT accessed FROM responses').fetchone()[0]
+
+        # Act
+        entry = cache.get('a')
+
+        # Assert
+        self.assertEqual({'etag': '2'}, entry.headers)
+        with sqlite3.connect(path) as connection:
+            self.assertEqual(accessed, connection.execute('SELECT accessed FROM responses').fetchone()[0])
+            self.assertEqual(
+                connection.execute('SELECT SUM(size) FROM responses').fetchone()[0],
+                connection.execute('SELECT size FROM totals').fetchone()[0])
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        # Arrange
+        cache = MemoryCache(max_size=2)
+
+        # Act
+        cache.set('a', CacheEntry('1', 200, 'OK', {}, b'a'))
+        cache.set('b', CacheEntry('1', 200, 'OK', {}, b'b'))
+        cache.get('a')
+        cache.set('c', CacheEntry('1', 200, 'OK', {}, b'c'))
+
+        # Assert
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.circuitbreaker import CircuitBreaker, CircuitOpenError
+from vstsclient.transports import InMemoryTransport
+from vstsclient._http import HTTPError
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.events = []
+        self.breaker = CircuitBreaker(failure_rate=0.5, window=10, min_calls=4, open_duration=30, half_open_calls=2, clock=self.clock)
+        self.breaker.add_listener(lambda host, previous, state: self.events.append((host, previous, state)))
+
+    def _call(self, host, success, duration=0.1):
+        self.breaker.acquire(host)
+        self.breaker.record(host, success, duration)
+
+    def test_opens_on_failure_rate(self):
+        # Act
+        for success in (True, False, True, False):
+            self._call('contoso', success)
+
+        # Assert
+        self.assertEqual('open', self.breaker.get_state('contoso'))
+        self.assertEqual('closed', self.breaker.get_state('fabrikam'))
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.acquire('contoso')
+        self.assertEqual([('contoso', 'closed', 'open')], self.events)
+        self.assertEqual(1, self.breaker.get_metrics()['contoso']['rejected'])
+
+    def test_opens_on_slow_calls(self):
+        # Act
+        for _ in range(4):
+            self._call('contoso', True, duration=30)
+
+        # Assert
+        self.assertEqual('open', self.breaker.get_state('contoso'))
+
+    def test_half_open_probes(self):
+        # Arrange
+        for _ in range(4):
+            self._call('contoso', False)
+        self.clock.now = 30
+
+        # Act: only two probes are let through, and they close the circuit
+        self.breaker.acquire('contoso')
+        self.breaker.acquire('contoso')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.acquire('contoso')
+        self.breaker.record('contoso', True, 0.1)
+        self.breaker.record('contoso', True, 0.1)
+
+        # Assert
+        self.assertEqual('closed', self.breaker.get_state('contoso'))
+        self.assertEqual(['open', 'half-open', 'closed'], [state for _, _, state in self.events])
+
+    def test_get_state_notifies_half_open(self):
+        # Arrange
+        for _ in range(4):
+            self._call('contoso', False)
+        self.clock.now = 30
+
+        # Act
+        state = self.breaker.get_state('contoso')
+
+        # Assert
+        self.assertEqual('half-open', state)
+        self.assertEqual([('contoso', 'closed', 'open'), ('contoso', 'open', 'half-open')], self.events)
+
+    def test_failed_probe_reopens(self):
+        # Arrange
+        for _ in range(4):
+            self._call('contoso', False)
+        self.clock.now = 30
+
+        # Act
+        self._call('contoso', False)
+
+        # Assert
+        self.assertEqual('open', self.breaker.get_state('contoso'))
+        self.assertEqual(2, self.breaker.get_metrics()['contoso']['opened'])
+
+    def test_client_fails_fast(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: (503, { 'message': 'Service Unavailable' }))
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport, circuit_breaker=self.breaker)
+
+        # Act
+        for _ in range(4):
+            with self.assertRaises(HTTPError):
+                client.get_project('Contoso')
+
+        # Assert
+        with self.assertRaises(CircuitOpenError):
+            client.get_project('Contoso')
+        self.assertEqual(4, len(transport.requests))
+
+if __name__ == '__main__':
+    unittest.main()
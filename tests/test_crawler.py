@@ -0,0 +1,81 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.crawler import OrganizationCrawler
+from vstsclient.models import Project
+
+class FakeClient(object):
+    def __init__(self):
+        self.projects = []
+        for id, revision in [('p1', 10), ('p2', 20)]:
+            project = Project()
+            project.id = id
+            project.revision = revision
+            self.projects.append(project)
+        self.team_requests = []
+
+    def get_projects(self, state, top, skip):
+        return self.projects[skip:skip + top]
+
+    def get_teams(self, project_name, top, skip):
+        self.team_requests.append(project_name)
+        teams = [{'id': '{}-t{}'.format(project_name, i), 'name': 'Team {}'.format(i)} for i in range(3)]
+        return {'value': teams[skip:skip + top]}
+
+    def get_team_members(self, project_name, team_id, top, skip):
+        # Everybody is a member of every team
+        members = [{'identity': {'id': 'u{}'.format(i), 'uniqueName': 'user{}@contoso.com'.format(i)}} for i in range(2)]
+        return {'value': members[skip:skip + top]}
+
+class CrawlerTest(unittest.TestCase):
+    def test_crawl(self):
+        # Arrange
+        client  = FakeClient()
+        crawler = OrganizationCrawler(client, max_workers=4, page_size=2)
+
+        # Act
+        results = list(crawler.crawl())
+
+        # Assert
+        self.assertEqual(6, len(results))
+        self.assertEqual(2, len(crawler.identities))
+        self.assertIs(results[0].members[0], crawler.identities[results[0].members[0].id])
+        self.assertEqual({'p1': 10, 'p2': 20}, crawler.revisions)
+
+    def test_crawl_incremental(self):
+        # Arrange
+        client  = FakeClient()
+        crawler = OrganizationCrawler(client, revisions={'p1': 10, 'p2': 19})
+
+        # Act
+        results = list(crawler.crawl())
+
+        # Assert
+        self.assertEqual(['p2'], client.team_requests)
+        self.assertEqual(3, len(results))
+        self.assertEqual(20, crawler.revisions['p2'])
+
+if __name__ == '__main__':
+    unittest.main()
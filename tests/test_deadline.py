@@ -0,0 +1,208 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import socket
+import threading
+import time
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.deadline import CancellationToken, Cancelled, Deadline, DeadlineExceeded
+from vstsclient.pool import _FairScheduler
+from vstsclient.ratelimiter import RateLimiter
+from vstsclient.transports import Transport
+from vstsclient._http import HTTPResponse
+
+class SlowTransport(Transport):
+    # Responds after the latency, or times out like a socket would
+    def __init__(self, latency, body=b'{"count": 0, "value": []}'):
+        self.latency = latency
+        self.body = body
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        with self._lock:
+            self.timeouts.append(timeout)
+        if timeout is not None and timeout < self.latency:
+            time.sleep(timeout)
+            raise socket.timeout('timed out')
+        time.sleep(self.latency)
+        return HTTPResponse(200, 'OK', {}, self.body)
+
+class DeadlineTest(unittest.TestCase):
+    def test_timeout_bounds_request(self):
+        # Arrange
+        transport = SlowTransport(latency=1.0, body=b'{"id": 1, "name": "Contoso"}')
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            client.get_project('Contoso', timeout=0.05)
+
+        # Assert
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertLessEqual(transport.timeouts[0], 0.05)
+
+    def test_without_deadline(self):
+        # Arrange
+        transport = SlowTransport(latency=0.0, body=b'{"id": 1, "name": "Contoso"}')
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        project = client.get_project('Contoso')
+
+        # Assert
+        self.assertEqual('Contoso', project.name)
+        self.assertEqual([30], transport.timeouts)
+
+    def test_deadline_spans_composite_calls(self):
+        # Arrange
+        transport = SlowTransport(latency=0.05)
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            list(client.iter_history(range(100), max_workers=2, timeout=0.2))
+
+        # Assert: the sub-requests shared the budget and the rest was never sent
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertLess(len(transport.timeouts), 20)
+        self.assertTrue(all(timeout <= 0.2 for timeout in transport.timeouts))
+
+    def test_nested_scopes_use_earliest_deadline(self):
+        # Arrange
+        transport = SlowTransport(latency=0.0)
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        with Deadline(timeout=10):
+            client.get_teams('Contoso', timeout=0.5)
+            client.get_teams('Contoso')
+
+        # Assert
+        self.assertLessEqual(transport.timeouts[0], 0.5)
+        self.assertGreater(transport.timeouts[1], 0.5)
+        self.assertLessEqual(transport.timeouts[1], 10)
+
+    def test_cancellation(self):
+        # Arrange
+        transport = SlowTransport(latency=0.02)
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel).start()
+
+        # Act
+        with self.assertRaises(Cancelled):
+            for _ in client.iter_history(range(1000), max_workers=2, cancellation_token=token):
+                pass
+
+        # Assert
+        self.assertLess(len(transport.timeouts), 100)
+
+    def test_cancellation_interrupts_polling(self):
+        # Arrange
+        transport = SlowTransport(latency=0.0, body=b'{"id": "1", "status": "inProgress"}')
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(Cancelled):
+            client.wait_for_operation('1', timeout=60, interval=10, cancellation_token=token)
+
+        # Assert
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_deadline_bounds_blocked_rate_limiter(self):
+        # Arrange
+        limiter = RateLimiter()
+        limiter.update({'retry-after': '60'})
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            with Deadline(timeout=0.1):
+                limiter.acquire()
+
+        # Assert
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(limiter._waiters, [])
+
+    def test_cancellation_interrupts_blocked_rate_limiter(self):
+        # Arrange
+        limiter = RateLimiter()
+        limiter.update({'retry-after': '60'})
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(Cancelled):
+            with Deadline(cancellation_token=token):
+                limiter.acquire()
+
+        # Assert
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(limiter._waiters, [])
+
+    def test_deadline_bounds_blocked_scheduler(self):
+        # Arrange
+        scheduler = _FairScheduler(limit=1, limit_per_key=1)
+        scheduler.acquire('contoso')
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            with Deadline(timeout=0.1):
+                scheduler.acquire('contoso')
+
+        # Assert
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(scheduler.get_metrics()['waiting'], 0)
+        scheduler.release('contoso')
+        scheduler.acquire('contoso')
+        self.assertEqual(scheduler.get_metrics()['active'], 1)
+
+    def test_cancellation_interrupts_blocked_scheduler(self):
+        # Arrange
+        scheduler = _FairScheduler(limit=1, limit_per_key=1)
+        scheduler.acquire('contoso')
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        # Act
+        started = time.monotonic()
+        with self.assertRaises(Cancelled):
+            with Deadline(cancellation_token=token):
+                scheduler.acquire('fabrikam')
+
+        # Assert
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(scheduler.get_metrics()['waiting'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
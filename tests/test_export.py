@@ -0,0 +1,137 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.export import WorkitemExporter
+from vstsclient.transports import InMemoryTransport
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+def _handler(method, url, body):
+    if method == 'POST':
+        return { 'queryType': 'flat', 'asOf': '2020-01-01T00:00:00Z', 'columns': [], 'workItems': [{ 'id': id } for id in range(1, 8)] }
+
+    ids = url.split('ids=')[1].split('&')[0].split(',')
+    return { 'count': len(ids), 'value': [{
+        'id': int(id),
+        'rev': 1,
+        'fields': {
+            'System.Title': 'Item ' + id,
+            'System.AssignedTo': { 'displayName': 'Robbie' } if id == '1' else None
+        }
+    } for id in ids] }
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.transport = InMemoryTransport(_handler)
+        self.client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=self.transport)
+        self.exporter = WorkitemExporter(self.client, ['System.Title', 'System.AssignedTo'], chunk_size=3, max_workers=2)
+
+    def test_export_ndjson(self):
+        # Arrange
+        output = io.StringIO()
+
+        # Act
+        count = self.exporter.export('SELECT [System.Id] FROM WorkItems', output, 'ndjson', 'Contoso')
+
+        # Assert
+        rows = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda row: row['System.Id'])
+        self.assertEqual(7, count)
+        self.assertEqual(7, self.exporter.rows)
+        self.assertEqual({ 'System.Id': 1, 'System.Title': 'Item 1', 'System.AssignedTo': { 'displayName': 'Robbie' } }, rows[0])
+        self.assertIn('fields=System.Title,System.AssignedTo', self.transport.requests[1][1])
+        # One query and three chunks
+        self.assertEqual(4, len(self.transport.requests))
+
+    def test_export_link_query(self):
+        # Arrange
+        def handler(method, url, body):
+            if method == 'POST':
+                return { 'queryType': 'tree', 'workItemRelations': [
+                    { 'rel': None, 'source': None, 'target': { 'id': 1 } },
+                    { 'rel': 'System.LinkTypes.Hierarchy-Forward', 'source': { 'id': 1 }, 'target': { 'id': 2 } },
+                    { 'rel': 'System.LinkTypes.Hierarchy-Forward', 'source': { 'id': 1 }, 'target': { 'id': 6 } },
+                    { 'rel': 'System.LinkTypes.Hierarchy-Forward', 'source': { 'id': 2 }, 'target': { 'id': 2 } }
+                ] }
+
+            # Work item 6 was deleted
+            ids = url.split('ids=')[1].split('&')[0].split(',')
+            return { 'count': len(ids), 'value': [{ 'id': int(id), 'rev': 1, 'fields': {} } if id != '6' else None for id in ids] }
+
+        transport = InMemoryTransport(handler)
+        exporter  = WorkitemExporter(VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport), ['System.Title'])
+        output    = io.StringIO()
+
+        # Act
+        count = exporter.export('SELECT [System.Id] FROM WorkItemLinks', output)
+
+        # Assert
+        self.assertEqual(2, count)
+        self.assertEqual([1, 2], [json.loads(line)['System.Id'] for line in output.getvalue().splitlines()])
+        self.assertIn('ids=1,2,6&errorPolicy=omit', transport.requests[1][1])
+
+    def test_export_csv(self):
+        # Arrange
+        output = io.StringIO()
+
+        # Act
+        self.exporter.export_ids([1, 2], output, 'csv')
+
+        # Assert
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual(['System.Id', 'System.Title', 'System.AssignedTo'], rows[0])
+        self.assertEqual(['1', 'Item 1', '{"displayName": "Robbie"}'], rows[1])
+        self.assertEqual(['2', 'Item 2', ''], rows[2])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.exporter.export_ids([1], io.StringIO(), 'xlsx')
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_export_parquet(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'workitems.parquet')
+
+        # Act
+        self.exporter.export_ids(range(1, 8), path, 'parquet')
+
+        # Assert
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(7, table.num_rows)
+        self.assertEqual(['System.Id', 'System.Title', 'System.AssignedTo'], table.column_names)
+
+if __name__ == '__main__':
+    unittest.main()
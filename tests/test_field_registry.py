@@ -0,0 +1,136 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.transports import InMemoryTransport
+from vstsclient.fields import FieldRegistry
+from vstsclient.models import Field, JsonPatchDocument, JsonPatchOperation
+from vstsclient.constants import SystemFields, MicrosoftFields
+
+def _field(name, ref_name, field_type, read_only=False, picklist_id=None):
+    field = Field()
+    field.name = name
+    field.ref_name = ref_name
+    field.type = field_type
+    field.read_only = read_only
+    field.is_picklist = picklist_id is not None
+    field.picklist_id = picklist_id
+    return field
+
+class FakeClient(object):
+    def __init__(self):
+        self.requests = 0
+
+    def get_fields(self, project_name=None):
+        self.requests += 1
+        return [
+            _field('Title', 'System.Title', 'string'),
+            _field('ID', 'System.Id', 'integer', read_only=True),
+            _field('Story Points', 'Microsoft.VSTS.Scheduling.StoryPoints', 'double'),
+            _field('Value Area', 'Microsoft.VSTS.Common.ValueArea', 'picklistString', picklist_id='p1')
+        ]
+
+    def get_picklist(self, picklist_id):
+        self.requests += 1
+        return {'id': picklist_id, 'items': ['Architectural', 'Business']}
+
+class FieldRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.registry = FieldRegistry(self.client)
+
+    def test_get_by_name_and_ref_name(self):
+        # Act
+        by_name = self.registry.get('story points')
+        by_ref_name = self.registry.get('Microsoft.VSTS.Scheduling.StoryPoints')
+
+        # Assert
+        self.assertIs(by_name, by_ref_name)
+        self.assertEqual(1, self.client.requests)
+
+    def test_validate_valid_document(self):
+        # Arrange
+        doc = JsonPatchDocument()
+        doc.add(JsonPatchOperation('add', SystemFields.TITLE, 'Flying car'))
+        doc.add(JsonPatchOperation('add', MicrosoftFields.STORY_POINTS, 5))
+        doc.add(JsonPatchOperation('add', MicrosoftFields.VALUE_AREA, 'Business'))
+        doc.add(JsonPatchOperation('add', '/relations/-', {'rel': 'Hyperlink', 'url': 'https://contoso.com'}))
+
+        # Act
+        self.registry.validate(doc)
+
+        # Assert
+        self.assertEqual(2, self.client.requests)
+
+    def test_validate_invalid_document(self):
+        # Arrange
+        doc = JsonPatchDocument()
+        doc.add(JsonPatchOperation('add', '/fields/Custom.Unknown', 'x'))
+        doc.add(JsonPatchOperation('add', '/fields/System.Id', 1))
+        doc.add(JsonPatchOperation('add', MicrosoftFields.STORY_POINTS, 'five'))
+        doc.add(JsonPatchOperation('add', MicrosoftFields.VALUE_AREA, 'Marketing'))
+
+        # Act
+        with self.assertRaises(ValueError) as context:
+            self.registry.validate(doc)
+
+        # Assert
+        message = str(context.exception)
+        self.assertIn('Custom.Unknown does not exist', message)
+        self.assertIn('System.Id is read-only', message)
+        self.assertIn('expects a value of type double', message)
+        self.assertIn("does not allow value 'Marketing'", message)
+
+    def test_validate_read_only_bypassing_rules(self):
+        # Arrange
+        doc = JsonPatchDocument()
+        doc.add(JsonPatchOperation('add', '/fields/System.Id', 1))
+
+        # Act & Assert
+        self.registry.validate(doc, bypass_rules=True)
+
+    def test_batch_is_validated_before_sending(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: { 'count': 0, 'value': [] })
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+        client.field_registry = self.registry
+
+        valid = JsonPatchDocument()
+        valid.add(JsonPatchOperation('add', SystemFields.TITLE, 'Flying car'))
+        invalid = JsonPatchDocument()
+        invalid.add(JsonPatchOperation('add', '/fields/Custom.Unknown', 'x'))
+
+        # Act
+        with self.assertRaises(ValueError):
+            client.batch_workitems([
+                ('PATCH', '/_apis/wit/workitems/13', valid),
+                ('PATCH', '/_apis/wit/workitems/14', invalid)
+            ])
+
+        # Assert
+        self.assertEqual([], transport.requests)
+
+if __name__ == '__main__':
+    unittest.main()
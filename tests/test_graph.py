@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.graph import WorkitemGraph
+from vstsclient.constants import LinkTypes, MicrosoftFields
+from vstsclient.models import QueryResult
+from vstsclient._deserialize import _parse_json_to_workitem
+
+# 1 -> 2 -> (3, 4), 4 -> 5
+HIERARCHY = { 1: [2], 2: [3, 4], 3: [], 4: [5], 5: [] }
+
+class FakeClient(object):
+    def __init__(self):
+        self.requests = []
+
+    def get_workitems_by_id(self, workitem_ids, expand=None):
+        self.requests.append(sorted(workitem_ids))
+        workitems = []
+        for id in workitem_ids:
+            relations = [{ 'rel': LinkTypes.CHILD, 'url': 'https://contoso/_apis/wit/workItems/{}'.format(child) } for child in HIERARCHY[id]]
+            relations.append({ 'rel': 'Hyperlink', 'url': 'https://contoso.com' })
+            workitems.append(_parse_json_to_workitem({
+                'id': id, 
+                'fields': { 'Microsoft.VSTS.Scheduling.StoryPoints': id }, 
+                'relations': relations
+            }))
+        return workitems
+
+class WorkitemGraphTest(unittest.TestCase):
+    def test_build(self):
+        # Arrange
+        client = FakeClient()
+
+        # Act
+        graph = WorkitemGraph.build(client, [1], batch_size=1)
+
+        # Assert
+        self.assertEqual([[1], [2], [3], [4], [5]], sorted(client.requests))
+        self.assertEqual([2, 3, 4, 5], graph.descendants(1))
+        self.assertEqual([4, 2, 1], graph.ancestors(5))
+        self.assertEqual(4, graph.get_parent(5))
+
+    def test_build_max_depth(self):
+        # Act
+        graph = WorkitemGraph.build(FakeClient(), [1], max_depth=1)
+
+        # Assert
+        self.assertEqual([1, 2], sorted(graph.workitems))
+
+    def test_rollup(self):
+        # Arrange
+        graph = WorkitemGraph.build(FakeClient(), [1])
+
+        # Act
+        totals = graph.rollup(MicrosoftFields.STORY_POINTS)
+
+        # Assert
+        self.assertEqual(15, totals[1])
+        self.assertEqual(9, totals[4])
+        self.assertEqual(3, totals[3])
+
+    def test_find_cycles(self):
+        # Arrange
+        result = QueryResult()
+        result.rows = [
+            { 'source': None, 'target': { 'id': 1 }, 'rel': None },
+            { 'source': { 'id': 1 }, 'target': { 'id': 2 }, 'rel': LinkTypes.CHILD },
+            { 'source': { 'id': 2 }, 'target': { 'id': 3 }, 'rel': LinkTypes.CHILD },
+            { 'source': { 'id': 3 }, 'target': { 'id': 1 }, 'rel': LinkTypes.CHILD }
+        ]
+        graph = WorkitemGraph.from_query_result(result)
+
+        # Act
+        cycles = graph.find_cycles()
+
+        # Assert
+        self.assertEqual([[1, 2, 3]], cycles)
+
+if __name__ == '__main__':
+    unittest.main()
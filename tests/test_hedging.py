@@ -0,0 +1,113 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+
+from vstsclient.hedging import HedgingPolicy
+from vstsclient._http import HTTPRequest
+from vstsclient._http.httpclient import _HTTPClient
+
+class FakeResponse(object):
+    def __init__(self, body):
+        self.status_code = 200
+        self.reason = 'OK'
+        self.headers = {}
+        self.content = body
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+    def close(self):
+        pass
+
+class FakeSession(object):
+    def __init__(self, delays):
+        self.headers = {}
+        self.delays = list(delays)
+        self.lock = threading.Lock()
+
+    def request(self, method, uri, **kwargs):
+        with self.lock:
+            delay = self.delays.pop(0)
+        time.sleep(delay)
+        return FakeResponse(str(delay).encode())
+
+def _request(method='GET'):
+    request = HTTPRequest()
+    request.method = method
+    request.host = 'dev.azure.com/contoso'
+    request.path = '/_apis/wit/workitems/1'
+    return request
+
+class HedgingTest(unittest.TestCase):
+    def test_delay_is_percentile(self):
+        # Arrange
+        policy = HedgingPolicy(percentile=90, min_delay=0, min_samples=10)
+
+        # Act
+        for latency in range(1, 11):
+            policy.record(latency / 10.0)
+
+        # Assert
+        self.assertEqual(0.9, policy.get_delay())
+
+    def test_hedge_wins(self):
+        # Arrange
+        policy = HedgingPolicy(max_delay=0.05, budget=1)
+        client = _HTTPClient('https', FakeSession([1.0, 0.01]), hedging=policy)
+
+        # Act
+        response = client.perform_request(_request())
+
+        # Assert
+        self.assertEqual(b'0.01', response.body)
+        self.assertEqual({'requests': 1, 'hedges': 1, 'hedge_wins': 1}, policy.get_metrics())
+
+    def test_does_not_hedge_writes(self):
+        # Arrange
+        policy = HedgingPolicy(max_delay=0.01)
+        client = _HTTPClient('https', FakeSession([0.05]), hedging=policy)
+
+        # Act
+        response = client.perform_request(_request('PATCH'))
+
+        # Assert
+        self.assertEqual(b'0.05', response.body)
+        self.assertEqual(0, policy.get_metrics()['hedges'])
+
+    def test_respects_budget(self):
+        # Arrange
+        policy = HedgingPolicy(max_delay=0.01, budget=0)
+        policy.try_hedge()
+        client = _HTTPClient('https', FakeSession([0.05]), hedging=policy)
+
+        # Act
+        client.perform_request(_request())
+
+        # Assert
+        self.assertEqual(1, policy.get_metrics()['hedges'])
+
+if __name__ == '__main__':
+    unittest.main()
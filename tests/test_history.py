@@ -0,0 +1,56 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+
+class HistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.client = VstsClient('dev.azure.com/contoso', 'personal-access-token')
+        self.calls  = []
+
+        def get_revisions(workitem_id, top, skip):
+            self.calls.append((workitem_id, top, skip))
+            return list(range(workitem_id * 1000 + skip, workitem_id * 1000 + min(skip + top, 5)))
+
+        self.client.get_revisions = get_revisions
+
+    def test_iter_revisions_pages(self):
+        # Act
+        revisions = list(self.client.iter_revisions(1, page_size=2))
+
+        # Assert
+        self.assertEqual([1000, 1001, 1002, 1003, 1004], revisions)
+        self.assertEqual([(1, 2, 0), (1, 2, 2), (1, 2, 4)], self.calls)
+
+    def test_iter_history(self):
+        # Act
+        history = dict(self.client.iter_history([1, 2, 3], max_workers=2))
+
+        # Assert
+        self.assertEqual([1, 2, 3], sorted(history))
+        self.assertEqual([2000, 2001, 2002, 2003, 2004], history[2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+import unittest
+
+from vstsclient.identities import IdentityCache
+from vstsclient.models import Project
+
+class FakeClient(object):
+    def __init__(self):
+        self.project = Project()
+        self.project.id = 'p1'
+        self.requests = 0
+
+    def get_projects(self, state, top, skip):
+        self.requests += 1
+        return [self.project][skip:skip + top]
+
+    def get_teams(self, project_name, top, skip):
+        return {'value': [{'id': 't1', 'name': 'Team 1'}, {'id': 't2', 'name': 'Team 2'}][skip:skip + top]}
+
+    def get_team_members(self, project_name, team_id, top, skip):
+        members = [{'identity': {'id': 'u1', 'displayName': 'Jamal Hartnett', 'uniqueName': 'jamal@contoso.com'}}]
+        if team_id == 't2':
+            members.append({'identity': {'id': 'u2', 'displayName': 'Chuck Reinhart', 'uniqueName': 'chuck@contoso.com'}})
+        return {'value': members[skip:skip + top]}
+
+class IdentityCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        self.client = FakeClient()
+        self.cache = IdentityCache(self.client, ttl=60, clock=lambda: self.now)
+
+    def test_resolve(self):
+        # Act
+        by_id           = self.cache.resolve('u1')
+        by_unique_name  = self.cache.resolve('JAMAL@contoso.com')
+        by_display_name = self.cache.resolve('Chuck Reinhart')
+        by_field_value  = self.cache.resolve('Jamal Hartnett <jamal@contoso.com>')
+        by_reference    = self.cache.resolve({'uniqueName': 'chuck@contoso.com'})
+
+        # Assert
+        self.assertEqual('u1', by_id.id)
+        self.assertIs(by_id, by_unique_name)
+        self.assertIs(by_id, by_field_value)
+        self.assertEqual('u2', by_display_name.id)
+        self.assertIs(by_display_name, by_reference)
+        self.assertEqual(1, self.client.requests)
+
+    def test_resolve_many(self):
+        # Act
+        identities = self.cache.resolve_many(['u2', 'unknown', 'jamal@contoso.com'])
+
+        # Assert
+        self.assertEqual(['u2', None, 'u1'], [i.id if i else None for i in identities])
+
+    def test_membership(self):
+        # Act
+        teams = self.cache.get_teams('jamal@contoso.com')
+
+        # Assert
+        self.assertEqual(['t1', 't2'], sorted(team.id for team in teams))
+        self.assertTrue(self.cache.is_member('chuck@contoso.com', 't2'))
+        self.assertFalse(self.cache.is_member('chuck@contoso.com', 't1'))
+        self.assertEqual(['u1'], [member.id for member in self.cache.get_members('t1')])
+
+    def test_reloads_when_expired(self):
+        # Arrange
+        self.cache.resolve('u1')
+
+        # Act
+        self.now = 61
+        self.cache.resolve('u1')
+
+        # Assert
+        self.assertEqual(2, self.client.requests)
+
+    def test_serves_stale_indexes_while_reloading(self):
+        # Arrange
+        self.cache.resolve('u1')
+        self.now = 61
+
+        started  = threading.Event()
+        release  = threading.Event()
+        get_projects = self.client.get_projects
+        def blocking_get_projects(state, top, skip):
+            started.set()
+            release.wait(5)
+            return get_projects(state, top, skip)
+        self.client.get_projects = blocking_get_projects
+
+        reader = threading.Thread(target=self.cache.resolve, args=('u1',))
+        reader.start()
+        started.wait(5)
+
+        # Act
+        identity = self.cache.resolve('u2')
+        still_loading = reader.is_alive()
+        release.set()
+        reader.join(5)
+
+        # Assert: served from the old indexes, without a second reload
+        self.assertTrue(still_loading)
+        self.assertEqual('u2', identity.id)
+        self.assertEqual(2, self.client.requests)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from vstsclient.importer import WorkitemImporter, read_csv, read_ndjson
+from vstsclient.models import QueryResult, Workitem
+
+class FakeClient(object):
+    def __init__(self, fail=()):
+        self.workitems = {}
+        self.creates = 0
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def create_workitem(self, project_name, workitem_type_name, document, bypass_rules=False):
+        fields = dict((operation.path.split('/')[-1], operation.value) for operation in document)
+        if fields['System.Title'] in self.fail:
+            raise RuntimeError('Failed to create ' + fields['System.Title'])
+
+        with self._lock:
+            self.creates += 1
+            workitem = Workitem()
+            workitem.id = len(self.workitems) + 1
+            workitem.fields = fields
+            self.workitems[workitem.id] = workitem
+        return workitem
+
+    def query(self, query, project_name=None):
+        tag = query.split("CONTAINS '")[1][:-1]
+        result = QueryResult()
+        result.rows = [{ 'id': id } for id, workitem in self.workitems.items() if tag in workitem.fields['System.Tags'].split('; ')]
+        return result
+
+class ImporterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal = os.path.join(self.directory, 'import.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _importer(self, client):
+        return WorkitemImporter(client, 'Contoso', 'Task', self.journal, key='key',
+            mapping=lambda row: { 'System.Title': row['title'], 'System.Tags': row.get('tags') }, max_workers=4, batch_size=2)
+
+    def test_import(self):
+        # Arrange
+        client = FakeClient()
+        rows = [{ 'key': str(i), 'title': 'Task {}'.format(i) } for i in range(5)]
+        rows[0]['tags'] = 'migrated'
+
+        # Act
+        created = self._importer(client).run(rows)
+
+        # Assert
+        self.assertEqual(5, len(created))
+        self.assertEqual('migrated; import:0', client.workitems[created['0']].fields['System.Tags'])
+        self.assertEqual('import:4', client.workitems[created['4']].fields['System.Tags'])
+
+    def test_rerun_skips_completed_rows(self):
+        # Arrange
+        client = FakeClient()
+        rows = [{ 'key': str(i), 'title': 'Task {}'.format(i) } for i in range(5)]
+        self._importer(client).run(rows)
+
+        # Act
+        importer = self._importer(client)
+        created = importer.run(rows)
+
+        # Assert
+        self.assertEqual({}, created)
+        self.assertEqual(5, importer.skipped)
+        self.assertEqual(5, client.creates)
+
+    def test_resume_after_crash(self):
+        # Arrange: row 0 was created but the result was lost, row 1 was in 
+        # flight and never created, and the last line is incomplete
+        client = FakeClient()
+        client.create_workitem('Contoso', 'Task', self._importer(client)._to_document('0', { 'title': 'Task 0' }))
+        with open(self.journal, 'w') as f:
+            f.write('{"key": "0", "state": "intent"}\n{"key": "1", "state": "intent"}\n{"key": "2", "sta')
+
+        rows = [{ 'key': str(i), 'title': 'Task {}'.format(i) } for i in range(3)]
+
+        # Act
+        created = self._importer(client).run(rows)
+
+        # Assert
+        self.assertEqual(3, len(client.workitems))
+        self.assertEqual(1, created['0'])
+        with open(self.journal) as f:
+            records = [json.loads(line) for line in f.read().splitlines()[3:]]
+        self.assertEqual(3, len([record for record in records if record['state'] == 'done']))
+
+    def test_failed_rows_are_retried(self):
+        # Arrange
+        rows = [{ 'key': str(i), 'title': 'Task {}'.format(i) } for i in range(3)]
+        importer = self._importer(FakeClient(fail=('Task 1',)))
+        importer.run(rows)
+
+        # Act
+        client = FakeClient()
+        created = self._importer(client).run(rows)
+
+        # Assert
+        self.assertEqual(1, importer.failed)
+        self.assertIn('1', importer.errors)
+        self.assertEqual(['1'], list(created))
+
+    def test_read_sources(self):
+        # Arrange
+        ndjson = io.StringIO('{"key": 1, "title": "A"}\n\n{"key": 2, "title": "B"}\n')
+        csv    = io.StringIO('key,title\n1,A\n2,"B, C"\n')
+
+        # Act & Assert
+        self.assertEqual(['A', 'B'], [row['title'] for row in read_ndjson(ndjson)])
+        self.assertEqual(['A', 'B, C'], [row['title'] for row in read_csv(csv)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient._http import HTTPError
+from vstsclient.constants import LinkTypes
+from vstsclient._deserialize import _parse_json_to_workitem
+
+class AddLinksTest(unittest.TestCase):
+    def setUp(self):
+        self.client  = VstsClient('dev.azure.com/contoso', 'personal-access-token')
+        self.batches = []
+
+        def get_workitems_by_id(workitem_ids, expand=None, error_policy=None):
+            if 500 in workitem_ids:
+                raise HTTPError(500, 'Internal Server Error', {}, b'')
+            return [_parse_json_to_workitem({
+                'id': id,
+                'rev': 1,
+                'relations': [{ 'rel': LinkTypes.RELATED, 'url': 'https://dev.azure.com/contoso/_apis/wit/workItems/3' }]
+            }) for id in workitem_ids if id != 404]
+
+        def batch_workitems(operations, bypass_rules=False):
+            self.batches.append(operations)
+            return [path for _, path, _ in operations]
+
+        self.client.get_workitems_by_id = get_workitems_by_id
+        self.client.batch_workitems = batch_workitems
+
+    def test_add_links(self):
+        # Arrange
+        links = [
+            (1, 2, LinkTypes.CHILD),
+            (1, 3, LinkTypes.RELATED),
+            (1, 4, LinkTypes.CHILD),
+            (2, 3, LinkTypes.RELATED)
+        ]
+
+        # Act
+        results = self.client.add_links(links, max_workers=1)
+
+        # Assert
+        self.assertEqual(1, len(self.batches))
+        operations = self.batches[0]
+        self.assertEqual(1, len(operations))
+        self.assertEqual('/_apis/wit/workitems/1', operations[0][1])
+        self.assertEqual(
+            ['HTTPS://dev.azure.com/contoso/_apis/wit/workItems/2', 'HTTPS://dev.azure.com/contoso/_apis/wit/workItems/4'],
+            [op.value['url'] for op in operations[0][2]])
+        self.assertEqual([1, 2], sorted(results))
+
+    def test_reports_failed_chunks_per_source(self):
+        # Arrange
+        links = [
+            (1, 2, LinkTypes.CHILD),
+            (404, 3, LinkTypes.CHILD),
+            (500, 3, LinkTypes.CHILD),
+            (501, 3, LinkTypes.CHILD)
+        ]
+
+        # Act
+        results = self.client.add_links(links, max_workers=1, batch_size=2)
+
+        # Assert
+        self.assertEqual('/_apis/wit/workitems/1', results[1])
+        self.assertEqual(404, results[404].status)
+        self.assertEqual(500, results[500].status)
+        self.assertIs(results[500], results[501])
+
+if __name__ == '__main__':
+    unittest.main()
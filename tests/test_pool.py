@@ -0,0 +1,160 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+
+from vstsclient.pool import VstsClientPool, _FairScheduler
+from vstsclient.transports import InMemoryTransport
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class PoolTest(unittest.TestCase):
+    def test_clients_share_transport(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: { 'id': 1, 'name': 'Contoso' })
+
+        with VstsClientPool(transport=transport) as pool:
+            # Act
+            contoso  = pool.get_client('dev.azure.com/contoso', 'token')
+            fabrikam = pool.get_client('dev.azure.com/fabrikam', 'token')
+            futures  = [pool.submit(client.get_project, 'Contoso') for client in (contoso, fabrikam)]
+
+            # Assert
+            self.assertIs(contoso, pool.get_client('dev.azure.com/contoso', 'token'))
+            self.assertIsNot(contoso, pool.get_client('dev.azure.com/contoso', 'other token'))
+            self.assertIs(transport, fabrikam._http_client.transport)
+            self.assertEqual(['Contoso', 'Contoso'], [future.result().name for future in futures])
+            self.assertEqual(3, pool.get_metrics()['clients'])
+
+    def test_evicts_idle_clients(self):
+        # Arrange
+        clock = FakeClock()
+        pool = VstsClientPool(transport=InMemoryTransport(lambda method, url, body: {}), idle_timeout=60, clock=clock)
+        contoso = pool.get_client('dev.azure.com/contoso', 'token')
+        pool.get_client('dev.azure.com/fabrikam', 'token')
+
+        # Act
+        clock.now = 50
+        contoso.get_project('Contoso')
+        clock.now = 100
+        evicted = pool.evict_idle()
+
+        # Assert
+        self.assertEqual(1, evicted)
+        self.assertIs(contoso, pool.get_client('dev.azure.com/contoso', 'token'))
+
+    def test_composite_operations_share_worker_pool(self):
+        # Arrange
+        threads = set()
+        def handler(method, url, body):
+            threads.add(threading.current_thread())
+            return { 'count': 1, 'value': [{ 'id': 1, 'rev': 1 }] }
+
+        with VstsClientPool(max_concurrency=2, transport=InMemoryTransport(handler, latency=0.001)) as pool:
+            clients = [pool.get_client('dev.azure.com/org{}'.format(i), 'token') for i in range(4)]
+
+            # Act: every task fans out on the same, small pool
+            futures = [pool.submit(lambda client: list(client.iter_history(range(10), max_workers=4)), client) for client in clients]
+            results = [future.result(timeout=10) for future in futures]
+
+            # Assert
+            self.assertEqual([10] * 4, [len(result) for result in results])
+            self.assertTrue(threads <= set(pool._executor._threads))
+
+    def test_streamed_response_holds_slot_until_closed(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: { 'count': 2, 'value': [{ 'id': 1, 'rev': 1 }, { 'id': 2, 'rev': 1 }] })
+
+        with VstsClientPool(transport=transport) as pool:
+            client = pool.get_client('dev.azure.com/contoso', 'token')
+
+            # Act
+            workitems = client.iter_workitems_by_id([1, 2])
+            next(workitems)
+            active = pool.get_metrics()['active']
+            workitems.close()
+
+            # Assert
+            self.assertEqual(1, active)
+            self.assertEqual(0, pool.get_metrics()['active'])
+
+    def test_scheduler_is_fair_across_orgs(self):
+        # Arrange: a single slot, held while the others queue up
+        scheduler = _FairScheduler(limit=1, limit_per_key=1)
+        order = []
+        scheduler.acquire('busy')
+
+        def request(key):
+            scheduler.acquire(key)
+            order.append(key)
+            scheduler.release(key)
+
+        threads = []
+        for key in ['busy', 'busy', 'busy', 'quiet']:
+            thread = threading.Thread(target=request, args=(key,))
+            thread.start()
+            threads.append(thread)
+            # Let the thread queue up before starting the next one
+            while sum(len(waiters) for waiters in scheduler._waiting.values()) < len(threads):
+                time.sleep(0.001)
+
+        # Act
+        scheduler.release('busy')
+        for thread in threads:
+            thread.join()
+
+        # Assert: the quiet org is served before the busy org's backlog
+        self.assertEqual(['busy', 'quiet', 'busy', 'busy'], order)
+
+    def test_scheduler_limits_per_key(self):
+        # Arrange
+        scheduler = _FairScheduler(limit=4, limit_per_key=2)
+        scheduler.acquire('contoso')
+        scheduler.acquire('contoso')
+        acquired = threading.Event()
+
+        def request():
+            scheduler.acquire('contoso')
+            acquired.set()
+
+        threading.Thread(target=request).start()
+
+        # Act
+        scheduler.acquire('fabrikam')
+        blocked = not acquired.wait(0.05)
+        scheduler.release('contoso')
+
+        # Assert
+        self.assertTrue(blocked)
+        self.assertTrue(acquired.wait(1))
+        self.assertEqual({ 'contoso': 2, 'fabrikam': 1 }, scheduler.get_metrics()['active_by_org'])
+
+if __name__ == '__main__':
+    unittest.main()
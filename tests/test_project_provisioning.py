@@ -0,0 +1,110 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import json
+import threading
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.projects import ProjectProvisioner
+from vstsclient.transports import InMemoryTransport
+from vstsclient._error import OperationError
+
+class FakeServer(object):
+    # Operations succeed after a number of polls, project 'Broken' fails
+    def __init__(self, polls=3):
+        self.polls = polls
+        self.operations = {}
+        self.projects = {}
+        self.in_progress = 0
+        self.max_in_progress = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, body):
+        with self._lock:
+            if method == 'POST':
+                name = json.loads(body)['name']
+                id = 'op-{}'.format(len(self.operations))
+                self.operations[id] = [name, 0]
+                self.in_progress += 1
+                self.max_in_progress = max(self.max_in_progress, self.in_progress)
+                return (202, { 'id': id, 'status': 'queued', 'url': url })
+
+            if '/_apis/operations/' in url:
+                id = url.split('/_apis/operations/')[1].split('?')[0]
+                operation = self.operations[id]
+                operation[1] += 1
+                if operation[1] < self.polls:
+                    return { 'id': id, 'status': 'inProgress' if operation[1] > 1 else 'queued' }
+
+                self.in_progress -= 1
+                if operation[0] == 'Broken':
+                    return { 'id': id, 'status': 'failed', 'resultMessage': 'Template not found' }
+
+                self.projects[operation[0]] = 'wellFormed'
+                return { 'id': id, 'status': 'succeeded' }
+
+            name = url.split('/_apis/projects/')[1].split('?')[0]
+            return { 'id': name, 'name': name, 'state': self.projects.get(name, 'new') }
+
+class ProjectProvisionerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeServer()
+        self.client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=InMemoryTransport(self.server))
+
+    def test_wait_for_operation(self):
+        # Arrange
+        operation = self.client.queue_project('Contoso', 'Description')
+
+        # Act
+        operation = self.client.wait_for_operation(operation.id, interval=0.001)
+
+        # Assert
+        self.assertEqual('succeeded', operation.status)
+
+    def test_wait_for_operation_timeout(self):
+        # Arrange
+        self.server.polls = 1000
+        operation = self.client.queue_project('Contoso', 'Description')
+
+        # Act & Assert
+        with self.assertRaises(TimeoutError):
+            self.client.wait_for_operation(operation.id, timeout=0.05, interval=0.001)
+
+    def test_create_projects(self):
+        # Arrange
+        projects = [{ 'name': 'Project {}'.format(i), 'description': '' } for i in range(6)]
+        projects.append({ 'name': 'Broken', 'description': '' })
+
+        # Act
+        with ProjectProvisioner(self.client, max_concurrent=2, interval=0.001) as provisioner:
+            futures = provisioner.create_projects(projects)
+
+        # Assert
+        self.assertEqual(['Project {}'.format(i) for i in range(6)], [future.result().name for future in futures[:6]])
+        self.assertEqual('wellFormed', futures[0].result().state)
+        self.assertIsInstance(futures[6].exception(), OperationError)
+        self.assertLessEqual(self.server.max_in_progress, 2)
+
+if __name__ == '__main__':
+    unittest.main()
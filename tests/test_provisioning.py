@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import datetime
+import threading
+import unittest
+
+from vstsclient.provisioning import TreeProvisioner
+from vstsclient.models import Area, Iteration
+
+def _node(cls, id, name, children=(), start_date=None, finish_date=None):
+    node = cls()
+    node.id = id
+    node.name = name
+    node.children = list(children)
+    node.has_children = bool(children)
+    if cls is Iteration:
+        node.attributes.startDate = start_date
+        node.attributes.finishDate = finish_date
+    return node
+
+class FakeClient(object):
+    def __init__(self, areas=None, iterations=None):
+        self.areas = areas
+        self.iterations = iterations
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+
+    def get_areas(self, project_name, depth=1):
+        return self.areas
+
+    def get_iterations(self, project_name, depth=1):
+        return self.iterations
+
+    def create_area(self, project_name, name, parent_path=None):
+        self._record('create', parent_path, name)
+
+    def create_iteration(self, project_name, name, start_date=None, finish_date=None, parent_path=None):
+        self._record('create', parent_path, name, start_date)
+
+    def update_iteration(self, project_name, iteration_path, start_date, finish_date):
+        self._record('update', iteration_path, start_date)
+
+    def delete_area(self, project_name, area_path, reclassify_id=''):
+        self._record('delete', area_path, reclassify_id)
+
+class ProvisioningTest(unittest.TestCase):
+    def test_creates_missing_areas_level_by_level(self):
+        # Arrange
+        client = FakeClient(areas=_node(Area, 1, 'Contoso', [_node(Area, 2, 'Team A')]))
+        provisioner = TreeProvisioner(client, 'Contoso', 'areas', max_workers=4)
+
+        # Act
+        plan = provisioner.apply(['team a/Backend', 'Team A/Frontend', 'Team B/Backend/API'])
+
+        # Assert
+        self.assertEqual(['Team A/Frontend', 'Team B', 'Team B/Backend', 'Team B/Backend/API', 'team a/Backend'], sorted(path for path, _, _ in plan.create))
+        levels = [call[1].count('/') + 1 if call[1] else 0 for call in client.calls]
+        self.assertEqual(sorted(levels), levels)
+        self.assertIn(('create', 'Team B/Backend', 'API'), client.calls)
+        self.assertIn(('create', None, 'Team B'), client.calls)
+
+    def test_deletes_extra_areas(self):
+        # Arrange
+        client = FakeClient(areas=_node(Area, 1, 'Contoso', [
+            _node(Area, 2, 'Team A', [_node(Area, 3, 'Legacy', [_node(Area, 4, 'Old')])]),
+            _node(Area, 5, 'Archive')
+        ]))
+        provisioner = TreeProvisioner(client, 'Contoso', 'areas')
+
+        # Act
+        plan = provisioner.apply(['Team A', 'Archive'], delete=True, reclassify_path='Archive')
+
+        # Assert
+        self.assertEqual(['Team A/Legacy'], plan.delete)
+        self.assertEqual([('delete', 'Team A/Legacy', 5)], client.calls)
+
+    def test_creates_and_updates_iteration_dates(self):
+        # Arrange
+        january = datetime.datetime(2020, 1, 6)
+        february = datetime.datetime(2020, 2, 3)
+        client = FakeClient(iterations=_node(Iteration, 1, 'Contoso', [
+            _node(Iteration, 2, 'Release 1', [_node(Iteration, 3, 'Sprint 1', start_date=january, finish_date=january)])
+        ]))
+        provisioner = TreeProvisioner(client, 'Contoso', 'iterations')
+        spec = {
+            'Release 1/Sprint 1': (february, february),
+            'Release 1/Sprint 2': (february, february)
+        }
+
+        # Act
+        plan = provisioner.plan(spec)
+        provisioner.apply(spec)
+
+        # Assert
+        self.assertEqual([('Release 1/Sprint 2', february, february)], plan.create)
+        self.assertEqual([('Release 1/Sprint 1', february, february)], plan.update)
+        self.assertEqual([('create', 'Release 1', 'Sprint 2', february), ('update', 'Release 1/Sprint 1', february)], client.calls)
+
+    def test_unchanged_tree(self):
+        # Arrange
+        client = FakeClient(areas=_node(Area, 1, 'Contoso', [_node(Area, 2, 'Team A')]))
+
+        # Act
+        plan = TreeProvisioner(client, 'Contoso').plan(['Team A'], delete=True)
+
+        # Assert
+        self.assertFalse(plan.has_changes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+import threading
+import time
+
+from vstsclient.ratelimiter import RateLimiter
+from vstsclient.constants import Priority
+
+class RateLimiterTest(unittest.TestCase):
+    def test_backs_off_when_delayed(self):
+        # Arrange
+        limiter = RateLimiter(rate=10, min_rate=1)
+
+        # Act
+        limiter.update({'x-ratelimit-delay': '0.5'})
+
+        # Assert
+        self.assertEqual(5, limiter.rate)
+
+    def test_recovers_up_to_max_rate(self):
+        # Arrange
+        limiter = RateLimiter(rate=10, max_rate=11, increase=0.5)
+
+        # Act
+        for _ in range(5):
+            limiter.update({'x-ratelimit-remaining': '100'})
+
+        # Assert
+        self.assertEqual(11, limiter.rate)
+
+    def test_blocks_on_retry_after(self):
+        # Arrange
+        limiter = RateLimiter(rate=100)
+        limiter.update({'retry-after': '0.2'})
+
+        # Act
+        start = time.monotonic()
+        limiter.acquire()
+
+        # Assert
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_interactive_preempts_background(self):
+        # Arrange
+        limiter = RateLimiter(rate=5, burst=1)
+        limiter.acquire()
+        order = []
+
+        def worker(priority):
+            limiter.acquire(priority)
+            order.append(priority)
+
+        background  = threading.Thread(target=worker, args=(Priority.BACKGROUND,))
+        interactive = threading.Thread(target=worker, args=(Priority.INTERACTIVE,))
+
+        # Act
+        background.start()
+        time.sleep(0.02)
+        interactive.start()
+        background.join()
+        interactive.join()
+
+        # Assert
+        self.assertEqual([Priority.INTERACTIVE, Priority.BACKGROUND], order)
+
+if __name__ == '__main__':
+    unittest.main()
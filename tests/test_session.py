@@ -0,0 +1,107 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient.session import WorkitemSession
+from vstsclient.models import QueryResult
+from vstsclient.constants import LinkTypes
+from vstsclient._deserialize import _parse_json_to_workitem
+
+class FakeClient(object):
+    def __init__(self):
+        self.fetched = []
+        self.batches = []
+        self.next_id = 100
+
+    def get_workitem_url(self, workitem_id):
+        return 'https://contoso/_apis/wit/workItems/{}'.format(workitem_id)
+
+    def get_workitems_by_id(self, workitem_ids, expand=None):
+        self.fetched.append(list(workitem_ids))
+        return [_parse_json_to_workitem({ 'id': id, 'rev': 1, 'fields': { 'System.Title': 'Item {}'.format(id) }, 'relations': [] }) for id in workitem_ids]
+
+    def query(self, query, project_name=None):
+        result = QueryResult()
+        result.rows = [{ 'id': 1 }, { 'id': 2 }]
+        return result
+
+    def batch_workitems(self, operations, bypass_rules=False):
+        self.batches.append(operations)
+        results = []
+        for method, path, doc in operations:
+            if '$' in path:
+                id = self.next_id
+                self.next_id += 1
+                rev = 1
+            else:
+                id = int(path.rsplit('/', 1)[1])
+                rev = 2
+            relations = [op.value for op in doc if op.path == '/relations/-']
+            fields = dict((op.path[len('/fields/'):], op.value) for op in doc if op.path.startswith('/fields/'))
+            results.append(_parse_json_to_workitem({ 'id': id, 'rev': rev, 'fields': fields, 'relations': relations }))
+        return results
+
+class WorkitemSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.session = WorkitemSession(self.client)
+
+    def test_identity_map(self):
+        # Act
+        first  = self.session.get(1)
+        items  = self.session.get_many([1, 2, 3])
+        result = self.session.query('SELECT [System.Id] FROM WorkItems')
+
+        # Assert
+        self.assertIs(first, items[0])
+        self.assertIs(items[1], result[1])
+        self.assertEqual([[1], [2, 3]], self.client.fetched)
+
+    def test_commit_creates_before_linking(self):
+        # Arrange
+        parent = self.session.get(1)
+        parent.fields['System.State'] = 'Active'
+        child = self.session.create('Contoso', 'Task', { 'System.Title': 'New task' })
+        self.session.add_link(child, parent, LinkTypes.PARENT)
+        self.session.add_link(parent, child, LinkTypes.CHILD)
+
+        # Act
+        self.session.commit()
+
+        # Assert
+        self.assertEqual(2, len(self.client.batches))
+        created = self.client.batches[0]
+        self.assertEqual(1, len(created))
+        self.assertIn('/relations/-', [op.path for op in created[0][2]])
+
+        updated = self.client.batches[1]
+        self.assertEqual(['/_apis/wit/workitems/1'], [path for _, path, _ in updated])
+        link = [op.value for op in updated[0][2] if op.path == '/relations/-'][0]
+        self.assertEqual('https://contoso/_apis/wit/workItems/100', link['url'])
+        self.assertEqual(100, child.id)
+        self.assertIs(child, self.session.get(100))
+        self.assertFalse(parent.has_changes())
+
+if __name__ == '__main__':
+    unittest.main()
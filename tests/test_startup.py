@@ -0,0 +1,52 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+_SCRIPT = '''
+import sys
+from vstsclient.vstsclient import VstsClient
+VstsClient('dev.azure.com/contoso', 'personal-access-token')
+print(','.join(m for m in ('requests', 'dateutil', 'sqlite3') if m in sys.modules))
+'''
+
+class StartupTest(unittest.TestCase):
+    def test_import_and_construct_are_lightweight(self):
+        # Arrange
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env  = dict(os.environ, PYTHONPATH=root)
+
+        with tempfile.TemporaryDirectory() as cwd:
+            # Act
+            output = subprocess.check_output([sys.executable, '-c', _SCRIPT], cwd=cwd, env=env)
+
+            # Assert
+            self.assertEqual('', output.decode('utf-8').strip())
+            self.assertEqual([], os.listdir(cwd))
+
+if __name__ == '__main__':
+    unittest.main()
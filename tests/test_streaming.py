@@ -0,0 +1,103 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import json
+import unittest
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.transports import InMemoryTransport
+from vstsclient._http import HTTPError
+from vstsclient._streaming import _iter_json_array
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class StreamingTest(unittest.TestCase):
+    def test_parses_items_split_across_chunks(self):
+        # Arrange
+        document = {
+            'queryType': 'flat',
+            'columns': [{ 'referenceName': 'System.Title', 'name': 'Title ]}"' }],
+            'workItems': [{ 'id': 1, 'title': 'Café \\"[{' }, 12345, 2.5, 'text', None, True, [1, [2]]]
+        }
+        data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+        for size in (1, 2, 3, 7, len(data)):
+            # Act
+            items = list(_iter_json_array(_split(data, size), ('workItems',)))
+
+            # Assert
+            self.assertEqual(document['workItems'], items)
+
+    def test_missing_array(self):
+        self.assertEqual([], list(_iter_json_array([b'{"count": 0}'], ('value',))))
+
+    def test_truncated_response(self):
+        with self.assertRaises(ValueError):
+            list(_iter_json_array(_split(b'{"value": [{"id": 1}, {"id": 2', 4), ('value',)))
+
+    def test_iter_workitems_by_id(self):
+        # Arrange
+        def handler(method, url, body):
+            ids = url.split('ids=')[1].split('&')[0].split(',')
+            return { 'count': len(ids), 'value': [{ 'id': int(id), 'rev': 1, 'fields': { 'System.Title': 'Item ' + id } } for id in ids] }
+
+        transport = InMemoryTransport(handler)
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        workitems = list(client.iter_workitems_by_id(range(1, 6), chunk_size=2))
+
+        # Assert
+        self.assertEqual([1, 2, 3, 4, 5], [workitem.id for workitem in workitems])
+        self.assertEqual('Item 5', workitems[4].fields['System.Title'])
+        self.assertEqual(3, len(transport.requests))
+
+    def test_iter_query(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: {
+            'queryType': 'oneHop',
+            'asOf': '2020-01-01T00:00:00Z',
+            'columns': [],
+            'workItemRelations': [{ 'source': None, 'target': { 'id': 1 } }, { 'source': { 'id': 1 }, 'target': { 'id': 2 } }]
+        })
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        rows = list(client.iter_query('SELECT [System.Id] FROM WorkItemLinks', 'Contoso'))
+
+        # Assert
+        self.assertEqual([1, 2], [row['target']['id'] for row in rows])
+
+    def test_error_response(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: (404, { 'message': 'Not found' }))
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act & Assert
+        with self.assertRaises(HTTPError) as context:
+            list(client.iter_workitems_by_id([1]))
+        self.assertEqual(404, context.exception.status)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import json
+import unittest
+
+from urllib.parse import parse_qs, urlparse
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.testplans import TestPlanCrawler
+from vstsclient.transports import Transport
+from vstsclient._http import HTTPResponse
+from vstsclient._deserialize import (
+    _parse_json_to_testplans,
+    _parse_json_to_testsuites,
+    _parse_json_to_testcases,
+    _parse_json_to_testpoints
+)
+
+class FakeClient(object):
+    def __init__(self):
+        self.requests = 0
+        self.revision = 1
+        self.outcome = 'passed'
+
+    def get_testplans(self, project_name):
+        self.requests += 1
+        return _parse_json_to_testplans({ 'value': [
+            { 'id': 1, 'name': 'Plan', 'revision': self.revision, 'rootSuite': { 'id': 10 }, 'startDate': '2020-01-01T00:00:00Z' }
+        ]})
+
+    def get_testsuites(self, project_name, plan_id):
+        self.requests += 1
+        return _parse_json_to_testsuites({ 'value': [
+            { 'id': 10, 'name': 'Plan' },
+            { 'id': 11, 'name': 'Login', 'parentSuite': { 'id': 10 } },
+            { 'id': 12, 'name': 'Checkout', 'parentSuite': { 'id': 10 } }
+        ]})
+
+    def get_testcases(self, project_name, plan_id, suite_id):
+        self.requests += 1
+        return _parse_json_to_testcases({ 'value': [
+            { 'workItem': { 'id': suite_id * 10, 'name': 'Case {}'.format(suite_id) } }
+        ]})
+
+    def get_testpoints(self, project_name, plan_id, suite_id):
+        self.requests += 1
+        return _parse_json_to_testpoints({ 'value': [
+            { 'id': suite_id * 100 + i, 'testCaseReference': { 'id': suite_id * 10 }, 'configuration': { 'name': 'Windows' }, 'results': { 'outcome': self.outcome } }
+            for i in range(2)
+        ]})
+
+class TestPlanCrawlerTest(unittest.TestCase):
+    def test_lazy_tree(self):
+        # Arrange
+        client  = FakeClient()
+        crawler = TestPlanCrawler(client, 'Contoso', max_workers=4)
+
+        # Act
+        plan = crawler.get_testplans()[0]
+        self.assertEqual(1, client.requests)
+        root = plan.root_suite
+
+        # Assert
+        self.assertEqual(8, client.requests)
+        self.assertEqual(10, root.id)
+        self.assertEqual(['Login', 'Checkout'], [suite.name for suite in root.children])
+        case = root.children[0].test_cases[0]
+        self.assertEqual(110, case.id)
+        self.assertEqual([1100, 1101], [point.id for point in case.points])
+        self.assertEqual('passed', case.points[0].outcome)
+
+    def test_cached_by_revision(self):
+        # Arrange
+        client  = FakeClient()
+        crawler = TestPlanCrawler(client, 'Contoso')
+        first   = crawler.get_testplans()[0].root_suite
+
+        # Act
+        same = crawler.get_testplans()[0].root_suite
+        client.revision = 2
+        changed = crawler.get_testplans()[0].root_suite
+
+        # Assert
+        self.assertIs(first, same)
+        self.assertIsNot(first, changed)
+
+    def test_points_are_not_cached(self):
+        # Arrange
+        client  = FakeClient()
+        crawler = TestPlanCrawler(client, 'Contoso')
+        crawler.get_testplans()[0].root_suite
+
+        # Act
+        client.outcome = 'failed'
+        root = crawler.get_testplans()[0].root_suite
+
+        # Assert
+        self.assertEqual('failed', root.children[0].test_cases[0].points[0].outcome)
+        self.assertEqual(2, len(root.children[0].test_cases[0].points))
+
+class ContinuationTransport(Transport):
+    # Returns the points in pages of two, linked by continuation tokens
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        start = int(parse_qs(query).get('continuationToken', ['0;x'])[0].split(';')[0])
+        points = [{ 'id': i, 'testCaseReference': { 'id': 1 } } for i in range(start, min(start + 2, 5))]
+        response_headers = { 'content-type': 'application/json' }
+        if start + 2 < 5:
+            response_headers['x-ms-continuation-token'] = '{};x'.format(start + 2)
+        return HTTPResponse(200, 'OK', response_headers, json.dumps({ 'count': len(points), 'value': points }).encode('utf-8'))
+
+class ContinuationTest(unittest.TestCase):
+    def test_follows_continuation_tokens(self):
+        # Arrange
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=ContinuationTransport())
+
+        # Act
+        points = client.get_testpoints('Contoso', 1, 10)
+
+        # Assert
+        self.assertEqual([0, 1, 2, 3, 4], [point.id for point in points])
+
+if __name__ == '__main__':
+    unittest.main()
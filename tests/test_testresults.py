@@ -0,0 +1,74 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import base64
+import io
+import json
+import unittest
+
+from vstsclient.testresults import TestResultPublisher
+from vstsclient._serialization import _stream_json_with_base64
+
+class FakeClient(object):
+    def __init__(self):
+        self.chunks = []
+        self.completed = False
+
+    def add_testresults(self, project_name, run_id, results):
+        self.chunks.append(len(results))
+        return []
+
+    def update_testrun(self, project_name, run_id, state='Completed', comment=None):
+        self.completed = state == 'Completed'
+
+class TestResultPublisherTest(unittest.TestCase):
+    def test_publish(self):
+        # Arrange
+        client    = FakeClient()
+        publisher = TestResultPublisher(client, 'Contoso', 1, chunk_size=100, max_workers=2)
+        results   = ({ 'testCaseTitle': 'Test {}'.format(i), 'outcome': 'Passed' } for i in range(250))
+
+        # Act
+        count = publisher.publish(results)
+        publisher.complete()
+
+        # Assert
+        self.assertEqual(250, count)
+        self.assertEqual(250, publisher.published)
+        self.assertEqual([50, 100, 100], sorted(client.chunks))
+        self.assertTrue(client.completed)
+
+    def test_stream_attachment_body(self):
+        # Arrange
+        data = bytes(range(256)) * 41
+
+        # Act
+        body = b''.join(_stream_json_with_base64({ 'fileName': 'log.txt' }, 'stream', io.BytesIO(data), chunk_size=100))
+
+        # Assert
+        payload = json.loads(body.decode('utf-8'))
+        self.assertEqual('log.txt', payload['fileName'])
+        self.assertEqual(data, base64.b64decode(payload['stream']))
+
+if __name__ == '__main__':
+    unittest.main()
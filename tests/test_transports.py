@@ -0,0 +1,218 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import json
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from vstsclient.vstsclient import VstsClient
+from vstsclient.transports import InMemoryTransport, RequestsTransport, Urllib3Transport, _read_body
+from vstsclient._http import HTTPRequest
+from vstsclient._http.httpclient import _HTTPClient
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        content = json.dumps({ 'path': self.path, 'body': body.decode('utf-8') }).encode('utf-8')
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-RateLimit-Remaining', '100')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        # Revalidation of a cached response, announcing the length of the 
+        # representation without sending it
+        self.send_response(304)
+        self.send_header('ETag', '"1"')
+        self.send_header('Content-Length', '9')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class TransportTest(unittest.TestCase):
+    def test_in_memory_transport(self):
+        # Arrange
+        transport = InMemoryTransport(lambda method, url, body: { 'id': 1, 'name': 'Contoso' })
+        client = VstsClient('dev.azure.com/contoso', 'personal-access-token', transport=transport)
+
+        # Act
+        project = client.get_project('Contoso')
+
+        # Assert
+        self.assertEqual('Contoso', project.name)
+        self.assertEqual('GET', transport.requests[0][0])
+        self.assertEqual('https://dev.azure.com/contoso/_apis/projects/Contoso?includeCapabilities=true&api-version=1.0', transport.requests[0][1])
+
+    def test_urllib3_transport(self):
+        # Arrange
+        server = HTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        client = _HTTPClient('HTTP', timeout=5, transport='urllib3')
+        request = HTTPRequest()
+        request.method = 'POST'
+        request.host = '127.0.0.1:{}'.format(server.server_address[1])
+        request.path = '/_apis/wit'
+        request.query = 'api-version=5.1'
+        request.headers = {'Content-Type': 'application/json'}
+        request.body = '{"title": "café"}'
+
+        # Act
+        try:
+            response = client.perform_request(request)
+        finally:
+            client.transport.close()
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        self.assertIsInstance(client.transport, Urllib3Transport)
+        self.assertEqual(201, response.status)
+        self.assertEqual('100', response.headers['x-ratelimit-remaining'])
+        self.assertEqual({ 'path': '/_apis/wit?api-version=5.1', 'body': '{"title": "café"}' }, json.loads(response.body.decode('utf-8')))
+
+    def test_requests_transport(self):
+        # Arrange
+        server = HTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        client = _HTTPClient('HTTP', timeout=5)
+        request = HTTPRequest()
+        request.method = 'POST'
+        request.host = '127.0.0.1:{}'.format(server.server_address[1])
+        request.path = '/_apis/wit'
+        request.query = 'api-version=5.1'
+        request.headers = {'Content-Type': 'application/json'}
+        request.body = '{"title": "café"}'
+
+        # Act
+        try:
+            response = client.perform_request(request)
+        finally:
+            client.transport.close()
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        self.assertEqual(201, response.status)
+        self.assertEqual({ 'path': '/_apis/wit?api-version=5.1', 'body': '{"title": "café"}' }, json.loads(response.body))
+
+    def test_not_modified_with_content_length(self):
+        for transport in ['requests', 'urllib3']:
+            # Arrange
+            server = HTTPServer(('127.0.0.1', 0), _Handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+            client = _HTTPClient('HTTP', timeout=5, transport=transport)
+            request = HTTPRequest()
+            request.method = 'GET'
+            request.host = '127.0.0.1:{}'.format(server.server_address[1])
+            request.path = '/_apis/wit/workitems/1'
+            request.query = 'api-version=5.1'
+            request.headers = {'If-None-Match': '"1"'}
+
+            # Act
+            try:
+                response = client.perform_request(request)
+            finally:
+                client.transport.close()
+                server.shutdown()
+                server.server_close()
+
+            # Assert
+            self.assertEqual(304, response.status)
+            self.assertEqual(b'', bytes(response.body))
+
+    def test_read_body_without_body(self):
+        # Act
+        not_modified = _read_body(iter([]), {'content-length': '9'}, 304, 'GET')
+        no_content   = _read_body(iter([]), {'content-length': '9'}, 204, 'DELETE')
+        head         = _read_body(iter([]), {'content-length': str(2 ** 40)}, 200, 'HEAD')
+
+        # Assert
+        for body in [not_modified, no_content, head]:
+            self.assertEqual(b'', body)
+
+    def test_read_body(self):
+        # Arrange
+        chunks = [b'abc', b'def', b'g']
+
+        # Act
+        announced = _read_body(iter(chunks), {'content-length': '7'})
+        longer    = _read_body(iter(chunks), {'content-length': '4'})
+        encoded   = _read_body(iter(chunks), {'content-length': '3', 'content-encoding': 'gzip'})
+        unknown   = _read_body(iter(chunks), {})
+        empty     = _read_body(iter([]), {'content-length': '0'})
+
+        # Assert
+        for body in [announced, longer, encoded, unknown]:
+            self.assertEqual(b'abcdefg', body)
+        self.assertEqual(b'', empty)
+
+    def test_read_body_larger_than_preallocated(self):
+        # Arrange
+        chunks = [b'x' * 1024 * 1024] * 6
+
+        # Act
+        body = _read_body(iter(chunks), {'content-length': str(6 * 1024 * 1024)})
+
+        # Assert
+        self.assertEqual(6 * 1024 * 1024, len(body))
+
+    def test_read_body_truncated(self):
+        # Arrange
+        chunks = [b'abc', b'def', b'g']
+
+        # Act / Assert
+        with self.assertRaises(ConnectionError):
+            _read_body(iter(chunks), {'content-length': '10'})
+        with self.assertRaises(ConnectionError):
+            _read_body(iter(chunks), {'content-length': str(2 ** 40)})
+
+    def test_session_selects_requests_transport(self):
+        # Arrange
+        class FakeSession(object):
+            headers = {'Accept': '*/*'}
+
+        client = _HTTPClient('HTTPS', transport='urllib3')
+
+        # Act
+        client.session = FakeSession()
+
+        # Assert
+        self.assertIsInstance(client.transport, RequestsTransport)
+        self.assertNotIn('Accept', client.session.headers)
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ValueError):
+            VstsClient('dev.azure.com/contoso', 'personal-access-token', transport='curl')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import unittest
+
+from vstsclient._deserialize import _parse_json_to_workitem
+from vstsclient.constants import LinkTypes
+
+def _ops(doc):
+    return [(operation.op, operation.path, operation.value) for operation in doc]
+
+class WorkitemChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.workitem = _parse_json_to_workitem({
+            'id': 13,
+            'rev': 4,
+            'fields': {
+                'System.Title': 'Flying car',
+                'System.State': 'New',
+                'System.Tags': 'car',
+                'Microsoft.VSTS.Scheduling.StoryPoints': 3
+            },
+            'relations': [
+                { 'rel': LinkTypes.PARENT, 'url': 'https://contoso/_apis/wit/workItems/1' },
+                { 'rel': 'Hyperlink', 'url': 'https://contoso.com', 'attributes': { 'comment': 'old' } },
+                { 'rel': LinkTypes.RELATED, 'url': 'https://contoso/_apis/wit/workItems/2' }
+            ]
+        })
+
+    def test_no_changes(self):
+        # Act
+        doc = self.workitem.get_changes()
+
+        # Assert
+        self.assertFalse(self.workitem.has_changes())
+        self.assertEqual([('test', '/rev', 4)], _ops(doc))
+
+    def test_field_changes(self):
+        # Arrange
+        self.workitem.fields['System.State'] = 'Active'
+        self.workitem.fields['System.Title'] = 'Flying car'
+        self.workitem.fields['System.Description'] = 'A flying car'
+        del self.workitem.fields['Microsoft.VSTS.Scheduling.StoryPoints']
+        self.workitem.add_tags(['CAR', 'migrated'])
+
+        # Act
+        doc = self.workitem.get_changes()
+
+        # Assert
+        self.assertEqual([
+            ('test', '/rev', 4),
+            ('replace', '/fields/System.State', 'Active'),
+            ('replace', '/fields/System.Tags', 'car; migrated'),
+            ('add', '/fields/System.Description', 'A flying car'),
+            ('remove', '/fields/Microsoft.VSTS.Scheduling.StoryPoints', None)
+        ], _ops(doc))
+
+    def test_relation_changes(self):
+        # Arrange
+        self.workitem.remove_relation(LinkTypes.PARENT, 'https://contoso/_apis/wit/workItems/1')
+        self.workitem.remove_relation(LinkTypes.RELATED, 'https://contoso/_apis/wit/workItems/2')
+        self.workitem.relations[0]['attributes'] = { 'comment': 'new' }
+        self.workitem.add_relation(LinkTypes.PARENT, 'https://contoso/_apis/wit/workItems/1')
+        self.workitem.add_hyperlink('https://fabrikam.com')
+        self.workitem.add_hyperlink('https://fabrikam.com')
+
+        # Act
+        doc = self.workitem.get_changes(test_rev=False)
+
+        # Assert
+        self.assertEqual([
+            ('remove', '/relations/2', None),
+            ('replace', '/relations/1/attributes', { 'comment': 'new' }),
+            ('add', '/relations/-', { 'rel': 'Hyperlink', 'url': 'https://fabrikam.com' })
+        ], _ops(doc))
+
+    def test_relation_attributes_changed_in_place(self):
+        # Arrange
+        self.workitem.relations[1]['attributes']['comment'] = 'edited'
+
+        # Act
+        doc = self.workitem.get_changes(test_rev=False)
+
+        # Assert
+        self.assertEqual([
+            ('replace', '/relations/1/attributes', { 'comment': 'edited' })
+        ], _ops(doc))
+
+if __name__ == '__main__':
+    unittest.main()
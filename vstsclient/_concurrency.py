@@ -0,0 +1,166 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import contextvars
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .deadline import _wait
+
+class _Call(object):
+    # A call submitted to an executor that the thread waiting for it can run 
+    # itself, if no worker has started it yet. The scope of the caller 
+    # follows the call.
+
+    def __init__(self, func, args):
+        self.future = Future()
+        self._func = func
+        self._args = args
+        self._context = contextvars.copy_context()
+        self._claim = threading.Lock()
+
+    def run(self):
+        # Returns False if the call was already started (or cancelled)
+        if not self._claim.acquire(False) or not self.future.set_running_or_notify_cancel():
+            return False
+        try:
+            result = self._context.run(self._func, *self._args)
+        except BaseException as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+        return True
+
+class _Workers(object):
+    # Runs calls on a pool of max_workers threads of its own, or on a shared 
+    # executor. The workers of a shared executor may all be busy waiting for 
+    # calls like these, so a thread that waits runs a queued call itself 
+    # rather than waiting for a worker to pick it up.
+
+    def __init__(self, max_workers, executor=None):
+        self._shared = executor is not None
+        self._executor = executor if self._shared else ThreadPoolExecutor(max_workers=max_workers)
+        self._queued = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, func, *args):
+        call = _Call(func, args)
+        if self._shared:
+            self._queued.append(call)
+        self._executor.submit(call.run)
+        return call.future
+
+    def wait(self, futures):
+        # Waits for at least one of the futures, within the current scope
+        while self._queued:
+            call = self._queued.pop()
+            if call.run():
+                return {call.future}
+        return _wait(futures)
+
+    def close(self, wait=True):
+        self._queued = []
+        if not self._shared:
+            self._executor.shutdown(wait=wait)
+
+def _get_executor(client):
+    # The executor shared by the clients of a pool, if any
+    return getattr(client, 'executor', None)
+
+def _iter_pages(fetch_page, page_size, prefetch=True, executor=None):
+    # Yields the items of consecutive pages returned by fetch_page(top, skip)
+    # until a page comes back short. With prefetch the next page is requested
+    # in the background while the caller consumes the current one.
+    workers = _Workers(1, executor) if prefetch else None
+    try:
+        skip = 0
+        page = fetch_page(page_size, skip)
+        while True:
+            skip += page_size
+            last = len(page) < page_size
+
+            future = None
+            if workers is not None and not last:
+                future = workers.submit(fetch_page, page_size, skip)
+
+            for item in page:
+                yield item
+
+            if last:
+                return
+
+            if future is not None:
+                workers.wait([future])
+                page = future.result()
+            else:
+                page = fetch_page(page_size, skip)
+    finally:
+        if workers is not None:
+            workers.close(wait=False)
+
+def _imap_unordered(func, iterable, max_workers=8, executor=None):
+    # Applies func to every item using a bounded pool of workers and yields
+    # (item, result) tuples as they complete. Only a limited number of items
+    # is in flight at any time, so the iterable can be arbitrarily large.
+    # The deadline and cancellation scope of the caller follows the items
+    with _Workers(max_workers, executor) as workers:
+        pending = {}
+        iterator = iter(iterable)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max_workers * 2:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[workers.submit(func, item)] = item
+
+                if not pending:
+                    return
+
+                for future in workers.wait(pending):
+                    item = pending.pop(future)
+                    yield item, future.result()
+        finally:
+            # Don't start the queued items when the caller stops early
+            for future in pending:
+                future.cancel()
+
+def _chunks(iterable, size):
+    # Splits an iterable into lists of at most size items
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
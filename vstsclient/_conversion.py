@@ -22,9 +22,10 @@
 # -----------------------------------------------------------------------------
 
 from datetime import tzinfo, datetime
-from dateutil.parser import parse
 
 def _utc_string_to_datetime(value):
+    # dateutil is imported on first use, it adds noticeably to the import time
+    from dateutil.parser import parse
     return parse(value)
 
 def _datetime_to_utc_string(value):
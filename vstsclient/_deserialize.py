@@ -21,19 +21,31 @@
 # SOFTWARE.
 # -----------------------------------------------------------------------------
 
+import json
+
 from .models import (
     Project,
+    Operation,
     Iteration,
     Area,
     Workitem,
     WorkitemType,
+    WorkitemUpdate,
     Attachment,
     QueryResult,
     TestPlan,
-    Field
+    TestSuite,
+    TestCase,
+    TestPoint,
+    TestRun,
+    TestResult,
+    Field,
+    Team,
+    Identity
 )
 
 from ._conversion import _utc_string_to_datetime
+from ._http import HTTPError
 
 def _parse_json_to_workitemtypes(response):
     workitemtypes = []
@@ -55,30 +67,74 @@ def _parse_json_to_project(response):
     attrs = ['id', 'name', 'url', 'state', 'revision', 'visibility', 'description', 'capabilities']
     return _map_attrs_values(Project, attrs, response)
 
+def _parse_json_to_operation(response):
+    attrs = ['id', 'status', 'url']
+    obj = _map_attrs_values(Operation, attrs, response)
+    obj.result_message = response.get('resultMessage')
+    return obj
+
 def _parse_json_to_workitems(response):
     workitems = []
     for value in response['value']:
-        workitems.append(_parse_json_to_workitem(value))
+        # Omitted (missing or deleted) work items are returned as null
+        if value is not None:
+            workitems.append(_parse_json_to_workitem(value))
     return workitems
 
 def _parse_json_to_workitem(response):
     attrs = ['id', 'rev', 'fields', 'url', 'relations']
-    return _map_attrs_values(Workitem, attrs, response)
+    obj = _map_attrs_values(Workitem, attrs, response)
+    obj.accept_changes()
+    return obj
+
+def _parse_json_to_workitem_batch(response):
+    # Every operation of a batch succeeds or fails on its own, failures are 
+    # returned (not raised) as HTTPError in place of the work item
+    results = []
+    for value in response['value']:
+        body = value.get('body')
+        if isinstance(body, str):
+            body = json.loads(body) if body else None
+
+        if value['code'] >= 300:
+            message = body.get('message') if isinstance(body, dict) else None
+            results.append(HTTPError(value['code'], message, value.get('headers'), body))
+        else:
+            results.append(_parse_json_to_workitem(body))
+    return results
+
+def _parse_json_to_workitem_updates(response):
+    updates = []
+    for value in response['value']:
+        updates.append(_parse_json_to_workitem_update(value))
+    return updates
+
+def _parse_json_to_workitem_update(response):
+    attrs = ['id', 'rev', 'fields', 'url', 'relations']
+    obj = _map_attrs_values(WorkitemUpdate, attrs, response)
+    obj.workitem_id = _get_attr_value('workItemId', response)
+    obj.revised_by  = _get_attr_value('revisedBy', response)
+
+    if 'revisedDate' in response:
+        obj.revised_date = _utc_string_to_datetime(response['revisedDate'])
+    return obj
 
 def _parse_json_to_iteration(response):
     attrs = ['id', 'name', 'identifier', 'url']
     obj = _map_attrs_values(Iteration, attrs, response)
     
-    if 'attributes' in response:
+    # Iterations without dates have no (or empty) attributes
+    if response.get('attributes', {}).get('startDate'):
         obj.attributes.startDate = _utc_string_to_datetime(response['attributes']['startDate'])
+    if response.get('attributes', {}).get('finishDate'):
         obj.attributes.finishDate = _utc_string_to_datetime(response['attributes']['finishDate'])
     
     if 'hasChildren' in response:
         obj.has_children = bool(response['hasChildren'])
 
-        # Parse child iterations
+        # Parse child iterations, children below the requested depth are omitted
         if obj.has_children:
-            for child in response['children']:
+            for child in response.get('children', []):
                 obj.children.append(_parse_json_to_iteration(child))
 
     return obj
@@ -90,9 +146,9 @@ def _parse_json_to_area(response):
     if 'hasChildren' in response:
         obj.has_children = bool(response['hasChildren'])
 
-        # Parse child areas
+        # Parse child areas, children below the requested depth are omitted
         if obj.has_children:
-            for child in response['children']:
+            for child in response.get('children', []):
                 obj.children.append(_parse_json_to_area(child))
 
     return obj
@@ -118,11 +174,97 @@ def _parse_json_to_attachment(response):
     attachment.url = response['url']
     return attachment
 
+def _parse_json_to_testplans(response):
+    testplans = []
+    for value in response['value']:
+        testplans.append(_parse_json_to_testplan(value))
+    return testplans
+
 def _parse_json_to_testplan(response):
-    attrs = ['id', 'name', 'description']
+    attrs = ['id', 'name', 'description', 'revision']
     obj = _map_attrs_values(TestPlan, attrs, response)
-    obj.start_date = _utc_string_to_datetime(response['startDate'])
-    obj.end_date   = _utc_string_to_datetime(response['endDate'])
+
+    if 'startDate' in response:
+        obj.start_date = _utc_string_to_datetime(response['startDate'])
+    if 'endDate' in response:
+        obj.end_date = _utc_string_to_datetime(response['endDate'])
+    if 'rootSuite' in response:
+        obj.root_suite_id = response['rootSuite']['id']
+    return obj
+
+def _parse_json_to_testsuites(response):
+    testsuites = []
+    for value in response['value']:
+        testsuites.append(_parse_json_to_testsuite(value))
+    return testsuites
+
+def _parse_json_to_testsuite(response):
+    attrs = ['id', 'name', 'url']
+    obj = _map_attrs_values(TestSuite, attrs, response)
+    obj.suite_type = _get_attr_value('suiteType', response)
+
+    parent = response.get('parentSuite') or response.get('parent')
+    if parent:
+        obj.parent_id = int(parent['id'])
+    return obj
+
+def _parse_json_to_testcases(response):
+    testcases = []
+    for value in response['value']:
+        testcases.append(_parse_json_to_testcase(value))
+    return testcases
+
+def _parse_json_to_testcase(response):
+    # Suite entries wrap the work item of the test case
+    workitem = _get_attr_value('workItem', response, _get_attr_value('testCase', response, response))
+    attrs = ['id', 'name', 'url']
+    return _map_attrs_values(TestCase, attrs, workitem)
+
+def _parse_json_to_testpoints(response):
+    testpoints = []
+    for value in response['value']:
+        testpoints.append(_parse_json_to_testpoint(value))
+    return testpoints
+
+def _parse_json_to_testpoint(response):
+    attrs = ['id', 'outcome', 'state', 'url']
+    obj = _map_attrs_values(TestPoint, attrs, response)
+    obj.assigned_to = _get_attr_value('tester', response, _get_attr_value('assignedTo', response))
+
+    test_case = _get_attr_value('testCaseReference', response, _get_attr_value('testCase', response))
+    if test_case:
+        obj.test_case_id = int(test_case['id'])
+
+    configuration = _get_attr_value('configuration', response)
+    if configuration:
+        obj.configuration = configuration.get('name')
+
+    results = _get_attr_value('results', response)
+    if results and obj.outcome is None:
+        obj.outcome = results.get('outcome')
+    return obj
+
+def _parse_json_to_testrun(response):
+    attrs = ['id', 'name', 'state', 'url']
+    obj = _map_attrs_values(TestRun, attrs, response)
+    obj.is_automated = _get_attr_value('isAutomated', response, False)
+    obj.total_tests  = _get_attr_value('totalTests', response, 0)
+    obj.passed_tests = _get_attr_value('passedTests', response, 0)
+    return obj
+
+def _parse_json_to_testresults(response):
+    results = []
+    for value in response['value']:
+        results.append(_parse_json_to_testresult(value))
+    return results
+
+def _parse_json_to_testresult(response):
+    attrs = ['id', 'outcome', 'state', 'url']
+    obj = _map_attrs_values(TestResult, attrs, response)
+    obj.test_case_title     = _get_attr_value('testCaseTitle', response)
+    obj.automated_test_name = _get_attr_value('automatedTestName', response)
+    obj.duration_in_ms      = _get_attr_value('durationInMs', response)
+    obj.error_message       = _get_attr_value('errorMessage', response)
     return obj
 
 def _parse_json_to_field(response):
@@ -138,6 +280,41 @@ def _parse_json_to_field(response):
 
     obj.is_picklist_suggested = response['isPicklistSuggested']
     obj.supported_operations  = response['supportedOperations']
+    obj.picklist_id           = _get_attr_value('picklistId', response)
+    return obj
+
+def _parse_json_to_fields(response):
+    fields = []
+    for value in response['value']:
+        fields.append(_parse_json_to_field(value))
+    return fields
+
+def _parse_json_to_teams(response):
+    teams = []
+    for value in response['value']:
+        teams.append(_parse_json_to_team(value))
+    return teams
+
+def _parse_json_to_team(response):
+    attrs = ['id', 'name', 'description', 'url']
+    obj = _map_attrs_values(Team, attrs, response)
+    obj.project_id   = _get_attr_value('projectId', response)
+    obj.project_name = _get_attr_value('projectName', response)
+    return obj
+
+def _parse_json_to_team_members(response):
+    members = []
+    for value in response['value']:
+        # Since api-version 5.0 the identity is wrapped in a team member
+        members.append(_parse_json_to_identity(_get_attr_value('identity', value, value)))
+    return members
+
+def _parse_json_to_identity(response):
+    attrs = ['id', 'url', 'descriptor']
+    obj = _map_attrs_values(Identity, attrs, response)
+    obj.display_name = _get_attr_value('displayName', response)
+    obj.unique_name  = _get_attr_value('uniqueName', response)
+    obj.image_url    = _get_attr_value('imageUrl', response)
     return obj
 
 def _get_attr_value(attr, values, default=None):
@@ -23,6 +23,38 @@
 
 ERROR_VALUE_NONE = '{0} should not be None.'
 
+ERROR_FIELD_UNKNOWN    = 'Field {0} does not exist.'
+ERROR_FIELD_READ_ONLY  = 'Field {0} is read-only.'
+ERROR_FIELD_TYPE       = 'Field {0} expects a value of type {1}, got {2!r}.'
+ERROR_FIELD_PICKLIST   = 'Field {0} does not allow value {1!r}.'
+ERROR_INVALID_DOCUMENT = 'Invalid JsonPatchDocument: {0}'
+
+ERROR_UNKNOWN_TRANSPORT = 'Unknown transport {0}, expected one of: {1}.'
+ERROR_UNKNOWN_FORMAT    = 'Unknown format {0}, expected one of: {1}.'
+ERROR_UNKNOWN_STRUCTURE = 'Unknown structure {0}, expected areas or iterations.'
+ERROR_NODE_NOT_FOUND    = 'Node {0} does not exist.'
+ERROR_INCOMPLETE_BODY   = 'Received {0} of the {1} bytes announced by the server.'
+
+ERROR_WORKITEM_NOT_FOUND = 'Work item {0} does not exist or you do not have permissions to read it.'
+
+ERROR_OPERATION_FAILED  = 'Operation {0} {1}: {2}'
+ERROR_OPERATION_TIMEOUT = 'Operation {0} did not complete within {1} seconds.'
+ERROR_CIRCUIT_OPEN      = 'Circuit for {0} is open, retry after {1:.1f}s.'
+ERROR_DEADLINE_EXCEEDED = 'The deadline was exceeded.'
+ERROR_CANCELLED         = 'The call was cancelled.'
+
+class OperationError(Exception):
+    '''
+    Raised when an asynchronous operation failed or was cancelled.
+
+    :ivar Operation operation:
+        the operation.
+    '''
+
+    def __init__(self, operation):
+        self.operation = operation
+        Exception.__init__(self, ERROR_OPERATION_FAILED.format(operation.id, operation.status, operation.result_message))
+
 def _validate_not_none(param_name, param):
     if param is None:
         raise ValueError(ERROR_VALUE_NONE.format(param_name))
\ No newline at end of file
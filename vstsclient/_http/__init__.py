@@ -45,14 +45,23 @@ class HTTPResponse(object):
     :ivar dict headers:
         the returned headers
     :ivar bytes body:
-        the body of the response
+        the body of the response (bytes or a bytearray), or an iterable of 
+        byte chunks when the response is streamed
     '''
 
-    def __init__(self, status, message, headers, body):
+    def __init__(self, status, message, headers, body, close=None):
         self.status = status
         self.message = message
         self.headers = headers
         self.body = body
+        self._close = close
+
+    def close(self):
+        '''
+        Releases the connection of a streamed response.
+        '''
+        if self._close is not None:
+            self._close()
 
 
 class HTTPRequest(object):
@@ -70,6 +79,10 @@ class HTTPRequest(object):
         header values
     :ivar bytes body:
         the body of the request.
+    :ivar int priority:
+        the priority class used by the rate limiter.
+    :ivar bool idempotent:
+        whether the request can safely be sent more than once.
     '''
 
     def __init__(self):
@@ -78,4 +91,6 @@ class HTTPRequest(object):
         self.path = ''
         self.query = {}  # list of (name, value)
         self.headers = {}  # list of (header name, header value)
-        self.body = ''
\ No newline at end of file
+        self.body = ''
+        self.priority = None
+        self.idempotent = False
\ No newline at end of file
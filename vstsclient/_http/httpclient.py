@@ -21,36 +21,74 @@
 # SOFTWARE.
 # -----------------------------------------------------------------------------
 
+import hashlib
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
 from . import HTTPResponse
+from ..transports import RequestsTransport, _create_transport
+from .._concurrency import _Call
+from ..deadline import Cancelled, DeadlineExceeded, _check, _get_current, _get_timeout
 
 class _HTTPClient(object):
     '''
     Takes the request and sends it to cloud service and returns the response.
     '''
 
-    def __init__(self, protocol=None, session=None, timeout=None):
+    def __init__(self, protocol=None, session=None, timeout=None, rate_limiter=None, hedging=None, cache=None, transport=None, circuit_breaker=None):
         '''
         :param str protocol:
             http or https.
         :param requests.Session session:
-            session object created with requests library (or compatible).
+            session object created with requests library (or compatible). 
+            Shorthand for a RequestsTransport with this session.
         :param int timeout:
             timeout for the http request, in seconds.
+        :param RateLimiter rate_limiter:
+            optional (shared) rate limiter that throttles outgoing requests.
+        :param HedgingPolicy hedging:
+            optional policy to hedge idempotent requests.
+        :param cache:
+            optional response cache (e.g. MemoryCache or DiskCache), GET 
+            responses with an ETag are cached and revalidated.
+        :param transport:
+            the transport that sends the requests, a Transport instance or 
+            the name of a built-in one ('requests', 'urllib3' or 'http2'). 
+            Defaults to requests.
+        :param CircuitBreaker circuit_breaker:
+            optional (shared) circuit breaker that rejects requests to hosts 
+            that are failing.
         '''
+        self._lock = threading.Lock()
         self.protocol = protocol
-        self.session = session
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.hedging = hedging
+        self.cache = cache
+        self.circuit_breaker = circuit_breaker
+        # Limits concurrent requests across the clients of a VstsClientPool
+        self.scheduler = None
+        # The executor of the hedged requests, shared by the clients of a pool
+        self.executor = None
+        self.proxies = None
+        self.transport = _create_transport(transport)
 
-        # By default, requests adds an Accept:*/* and Accept-Encoding to the session, 
-        # which causes issues with some Azure REST APIs. Removing these here gives us 
-        # the flexibility to add it back on a case by case basis.
-        if 'Accept' in self.session.headers:
-            del self.session.headers['Accept']
+        if session is not None:
+            self.session = session
 
-        if 'Accept-Encoding' in self.session.headers:
-            del self.session.headers['Accept-Encoding']
+    @property
+    def session(self):
+        '''
+        The requests session of the transport, only available when sending 
+        requests with requests.
+        '''
+        return self.transport.session
 
-        self.proxies = None
+    @session.setter
+    def session(self, session):
+        self.transport = RequestsTransport(session)
 
     def set_proxy(self, host, port, user, password):
         '''
@@ -76,35 +114,181 @@ class _HTTPClient(object):
         self.proxies = {'http': 'http://{}'.format(proxy_string),
                         'https': 'https://{}'.format(proxy_string)}
 
-    def perform_request(self, request):
+    def perform_request(self, request, stream=False):
         '''
         Sends an HTTPRequest to Azure Storage and returns an HTTPResponse. If 
         the response code indicates an error, raise an HTTPError.    
         
         :param HTTPRequest request:
             The request to serialize and send.
+        :param bool stream:
+            If True, the body is returned as an iterable of byte chunks and the 
+            response must be closed. Streamed requests are neither cached nor 
+            hedged.
         :return: An HTTPResponse containing the parsed HTTP response.
         :rtype: :class:`~azure.storage.common._http.HTTPResponse`
         '''
+        if stream:
+            return self._send(request, stream=True)
+
+        if self.cache is not None and request.method == 'GET':
+            return self._perform_cached_request(request)
+
+        return self._dispatch(request)
+
+    def _dispatch(self, request):
+        if self.hedging is not None and (request.method == 'GET' or request.idempotent):
+            return self._perform_hedged_request(request)
+
+        return self._send(request)
+
+    def _perform_cached_request(self, request):
+        # Responses are cached per user, as they depend on permissions
+        key = '{} {}{}?{} {}'.format(
+            request.method,
+            request.host,
+            request.path,
+            request.query,
+            hashlib.sha256(request.headers.get('Authorization', '').encode('utf-8')).hexdigest())
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            request.headers['If-None-Match'] = entry.etag
+
+        response = self._dispatch(request)
+
+        if response.status == 304 and entry is not None:
+            return HTTPResponse(entry.status, entry.message, entry.headers, entry.body)
+
+        if response.status == 200 and 'etag' in response.headers:
+            from ..cache import CacheEntry
+            self.cache.set(key, CacheEntry(response.headers['etag'], response.status, response.message, response.headers, response.body))
+
+        return response
+
+    def _perform_hedged_request(self, request):
+        with self._lock:
+            # Both the original request and the hedge run on the pool
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=64)
+
+        started = time.monotonic()
+        call = _Call(self._send, (request,))
+        self.executor.submit(call.run)
+        primary = call.future
+        done, _ = wait([primary], timeout=self.hedging.get_delay())
+
+        # When no worker picked the request up in time (the pool is busy), 
+        # send it from this thread instead of hedging a request that wasn't sent
+        if not done and call.run():
+            done = {primary}
+
+        if not done and self.hedging.try_hedge():
+            hedge = _Call(self._send, (request,))
+            self.executor.submit(hedge.run)
+            hedge = hedge.future
+            pending = {primary, hedge}
+            while True:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                succeeded = [future for future in done if future.exception() is None]
+                winner = succeeded[0] if succeeded else done.pop()
+                # If the first to complete failed, wait for the other one
+                if succeeded or not pending:
+                    break
+
+            # The other request can't be aborted once it is on the wire, 
+            # its response is discarded
+            for future in pending:
+                future.cancel()
+
+            if winner is hedge and winner.exception() is None:
+                self.hedging.record_win()
+        else:
+            winner = primary
+
+        response = winner.result()
+        self.hedging.record(time.monotonic() - started)
+        return response
+
+    def _send(self, request, stream=False):
         # Construct the URI
         uri = self.protocol.lower() + '://' + request.host + request.path
 
-        # Send the request
-        response = self.session.request(request.method,
-                                        uri,
-                                        params=request.query,
-                                        headers=request.headers,
-                                        data=request.body or None,
-                                        timeout=self.timeout,
-                                        proxies=self.proxies)
-
-        # Parse the response
-        status = int(response.status_code)
-        response_headers = {}
-        for key, name in response.headers.items():
-            response_headers[key.lower()] = name
-
-        wrap = HTTPResponse(status, response.reason, response_headers, response.content)
-        response.close()
-
-        return wrap
\ No newline at end of file
+        # Don't start when the caller's deadline passed or it was cancelled
+        _check()
+
+        # Fail fast when the host is failing, before waiting for our turn
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.acquire(request.host)
+
+        try:
+            # Wait for our turn
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(request.priority)
+
+            if self.scheduler is not None:
+                self.scheduler.acquire(request.host)
+        except Exception:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.cancel(request.host)
+            raise
+
+        # Send the request, with no more time than the caller has left
+        started = time.monotonic()
+        timeout = _get_timeout(self.timeout)
+        response = None
+        try:
+            _check()
+            response = self.transport.send(request.method,
+                                           uri,
+                                           request.query,
+                                           request.headers,
+                                           request.body,
+                                           timeout,
+                                           self.proxies,
+                                           stream)
+        except Exception as e:
+            scope = _get_current()
+            expired = scope is not None and (scope.cancelled or scope.remaining() == 0)
+
+            # Running out of the caller's time says nothing about the host
+            if self.circuit_breaker is not None:
+                if expired:
+                    self.circuit_breaker.cancel(request.host)
+                else:
+                    self.circuit_breaker.record(request.host, False, time.monotonic() - started)
+
+            if expired and not isinstance(e, (DeadlineExceeded, Cancelled)):
+                scope.check()
+            raise
+        finally:
+            if self.scheduler is not None:
+                # The body of a streamed response is read later, it holds on 
+                # to its turn until it is closed
+                if stream and response is not None:
+                    _release_on_close(response, lambda: self.scheduler.release(request.host))
+                else:
+                    self.scheduler.release(request.host)
+
+        # Server errors count as failures, client errors (incl. throttling) don't
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(request.host, response.status < 500, time.monotonic() - started)
+
+        # Adapt the rate to the resource usage reported by the server
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(response.headers)
+
+        return response
+
+def _release_on_close(response, release):
+    close = response._close
+    released = threading.Lock()
+
+    def _close():
+        try:
+            if close is not None:
+                close()
+        finally:
+            if released.acquire(False):
+                release()
+    response._close = _close
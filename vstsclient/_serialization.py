@@ -0,0 +1,49 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import base64
+import json
+
+def _stream_json_with_base64(payload, key, stream, chunk_size=3 * 65536):
+    # Generates a JSON object from the payload with an additional key holding 
+    # the base64 encoded contents of the stream. The stream is encoded chunk 
+    # by chunk while it is being sent.
+    prefix = json.dumps(payload)[:-1]
+    if payload:
+        prefix += ', '
+    yield '{}"{}": "'.format(prefix, key).encode('utf-8')
+
+    remainder = b''
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        data = remainder + data
+
+        # Only whole 3 byte groups can be encoded without padding
+        size = len(data) - len(data) % 3
+        remainder = data[size:]
+        if size:
+            yield base64.b64encode(data[:size])
+
+    yield base64.b64encode(remainder) + b'"}'
@@ -0,0 +1,142 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'[^ \t\n\r]')
+_DECODER    = json.JSONDecoder()
+
+class _JsonReader(object):
+    # Parses JSON values one at a time from an iterable of byte chunks. Only 
+    # the value being parsed and the unread remainder of the last chunks are 
+    # held in memory.
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        # Appends the next chunk to the buffer, returns False at the end
+        while not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                chunk = self._decoder.decode(b'', final=True)
+            else:
+                chunk = self._decoder.decode(chunk)
+
+            if chunk:
+                self._buffer += chunk
+                return True
+        return False
+
+    def _compact(self):
+        # Drops the consumed part of the buffer once it makes up most of it, 
+        # rather than copying the remainder after every value
+        if self._pos > len(self._buffer) // 2:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def peek(self):
+        # Returns the next non-whitespace character without consuming it
+        while True:
+            match = _WHITESPACE.search(self._buffer, self._pos)
+            if match:
+                self._pos = match.start()
+                return self._buffer[self._pos]
+
+            self._pos = len(self._buffer)
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON response')
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError('Expected {!r} at {!r}'.format(char, self._buffer[self._pos:self._pos + 20]))
+        self._pos += 1
+
+    def read(self):
+        # Parses the next value and moves past it
+        self.peek()
+        self._compact()
+
+        start = self._pos
+        attempted = 0
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, start)
+            except ValueError:
+                # The value continues in the next chunks. Read at least as 
+                # much again before retrying, so a value spanning many chunks 
+                # is not parsed over and over.
+                attempted = len(self._buffer) - start
+                while len(self._buffer) - start < 2 * attempted:
+                    if not self._fill():
+                        break
+                if self._eof and len(self._buffer) - start == attempted:
+                    raise
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+def _iter_json_array(chunks, keys):
+    # Yields the items of the first array found under one of the keys of the 
+    # top-level JSON object, parsing them one at a time as the chunks arrive.
+    reader = _JsonReader(chunks)
+    reader.expect('{')
+
+    while True:
+        char = reader.peek()
+        if char == '}':
+            return
+        if char == ',':
+            reader.expect(',')
+            continue
+
+        key = reader.read()
+        reader.expect(':')
+
+        if key not in keys or reader.peek() != '[':
+            reader.read()
+            continue
+
+        reader.expect('[')
+        while True:
+            char = reader.peek()
+            if char == ']':
+                return
+            if char == ',':
+                reader.expect(',')
+                continue
+
+            yield reader.read()
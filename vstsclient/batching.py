@@ -0,0 +1,153 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ._error import _validate_not_none, ERROR_WORKITEM_NOT_FOUND
+from ._http import HTTPError
+
+class WorkitemBatcher(object):
+    '''
+    Collects individual work item lookups made within a short window and 
+    fetches them with a single ``get_workitems_by_id`` request.
+
+    Every lookup returns a :class:`concurrent.futures.Future` that resolves 
+    to the :class:`Workitem`. Lookups of the same id within one window share 
+    a single future. Missing or deleted work items are left out of the batch 
+    and fail with a 404 :class:`HTTPError` of their own; any other error of 
+    the request (e.g. throttling or a timeout) fails all lookups in the 
+    batch, without sending more requests.
+
+    Use the batcher as a context manager, or call :meth:`close` to flush the 
+    pending lookups and stop the background thread.
+    '''
+
+    def __init__(self, client, max_batch_size=200, max_wait=0.01, max_workers=4, expand='all'):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param int max_batch_size:
+            the maximum number of ids per request (200 at most).
+        :param float max_wait:
+            the maximum time, in seconds, a lookup waits for others to join.
+        :param int max_workers:
+            the maximum number of concurrent batch requests.
+        :param str expand:
+            the $expand option of the requests.
+        '''
+        _validate_not_none('client', client)
+
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.expand = expand
+
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._first = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_workitem(self, workitem_id):
+        '''
+        :return: a Future that resolves to the :class:`Workitem`.
+        '''
+        _validate_not_none('workitem_id', workitem_id)
+        workitem_id = int(workitem_id)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('The batcher is closed.')
+
+            future = self._pending.get(workitem_id)
+            if future is None:
+                future = self._pending[workitem_id] = Future()
+                if self._first is None:
+                    self._first = time.monotonic()
+                self._condition.notify()
+            return future
+
+    def get_workitems(self, workitem_ids):
+        '''
+        :return: a list of Futures, in the order of the given ids.
+        '''
+        return [self.get_workitem(workitem_id) for workitem_id in workitem_ids]
+
+    def close(self):
+        '''
+        Sends the pending lookups and waits for all batches to complete.
+        '''
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # Wait until the batch is full, the window has passed, or the 
+                # batcher is closed
+                while True:
+                    if self._pending and (self._closed or len(self._pending) >= self.max_batch_size):
+                        break
+                    if not self._pending and self._closed:
+                        return
+                    timeout = None
+                    if self._first is not None:
+                        timeout = self._first + self.max_wait - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self._condition.wait(timeout)
+
+                ids = list(self._pending)[:self.max_batch_size]
+                batch = dict((id, self._pending.pop(id)) for id in ids)
+                self._first = time.monotonic() if self._pending else None
+
+            self._executor.submit(self._fetch, batch)
+
+    def _fetch(self, batch):
+        try:
+            workitems = self.client.get_workitems_by_id(list(batch), expand=self.expand, error_policy='omit')
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+
+        found = dict((workitem.id, workitem) for workitem in workitems)
+        for workitem_id, future in batch.items():
+            if workitem_id in found:
+                future.set_result(found[workitem_id])
+            else:
+                future.set_exception(HTTPError(404, ERROR_WORKITEM_NOT_FOUND.format(workitem_id), {}, b''))
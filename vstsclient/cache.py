@@ -0,0 +1,235 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# The interval, in seconds, at which access times are written when only reading
+_FLUSH_INTERVAL = 60
+
+class CacheEntry(object):
+    '''
+    A cached response.
+
+    :ivar str etag:
+        the entity tag the response is revalidated with.
+    :ivar int status:
+        the status code of the response.
+    :ivar str message:
+        the reason phrase of the response.
+    :ivar dict headers:
+        the response headers, with lower case names.
+    :ivar bytes body:
+        the body of the response.
+    '''
+
+    def __init__(self, etag, status, message, headers, body):
+        self.etag = etag
+        self.status = status
+        self.message = message
+        self.headers = headers
+        self.body = body
+
+class MemoryCache(object):
+    '''
+    A size-bounded, in-memory LRU cache of responses, shared by the threads 
+    of a single process.
+    '''
+
+    def __init__(self, max_size=64 * 1024 * 1024):
+        '''
+        :param int max_size:
+            the maximum total size of the cached bodies, in bytes.
+        '''
+        self.max_size = max_size
+        self._size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_size and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+class DiskCache(object):
+    '''
+    A size-bounded LRU cache of responses stored in a SQLite database, so it 
+    can be shared by multiple processes (e.g. consecutive or concurrent jobs).
+
+    Bodies are stored zlib compressed and headers as JSON. SQLite takes care 
+    of locking between processes; every thread uses its own connection. 
+    Entries that can't be read (e.g. corrupt ones) are treated as a miss and 
+    removed. Reads don't write: the access times are collected in memory and 
+    written in batches, with the next entry stored or every minute.
+    '''
+
+    def __init__(self, path, max_size=256 * 1024 * 1024, timeout=30):
+        '''
+        :param str path:
+            the path of the database file, created if it doesn't exist.
+        :param int max_size:
+            the maximum total size of the stored (compressed) entries, in bytes.
+        :param float timeout:
+            the time to wait for a lock held by another process, in seconds.
+        '''
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._flushed = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, etag TEXT, status INTEGER, message TEXT, '
+                'headers BLOB, body BLOB, size INTEGER, accessed REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+            # The total size is kept up to date by triggers, so that storing 
+            # an entry doesn't need to sum the sizes of all entries
+            connection.execute('CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL)')
+            connection.execute('INSERT OR IGNORE INTO totals (id, size) SELECT 0, COALESCE(SUM(size), 0) FROM responses')
+            connection.execute(
+                'CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses '
+                'BEGIN UPDATE totals SET size = size + NEW.size; END')
+            connection.execute(
+                'CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses '
+                'BEGIN UPDATE totals SET size = size - OLD.size; END')
+
+    def get(self, key):
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT etag, status, message, headers, body FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        etag, status, message, headers, body = row
+        try:
+            headers = json.loads(headers)
+            if not isinstance(headers, dict):
+                raise ValueError(headers)
+            entry = CacheEntry(etag, status, message, headers, zlib.decompress(body))
+        except (ValueError, TypeError, zlib.error):
+            # Corrupt, or written in another format
+            with connection:
+                connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+            return None
+
+        with self._lock:
+            self._accessed[key] = time.time()
+            flush = time.monotonic() - self._flushed >= _FLUSH_INTERVAL
+
+        if flush:
+            with connection:
+                self._flush(connection)
+        return entry
+
+    def set(self, key, entry):
+        headers = json.dumps(entry.headers)
+        body = zlib.compress(entry.body)
+        size = len(headers) + len(body)
+        if size > self.max_size:
+            return
+
+        connection = self._connect()
+        with connection:
+            self._flush(connection)
+            # Replaced explicitly, a REPLACE doesn't fire the delete trigger
+            connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+            connection.execute(
+                'INSERT INTO responses (key, etag, status, message, headers, body, size, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, entry.etag, entry.status, entry.message, headers, body, size, time.time()))
+            self._evict(connection)
+
+    def clear(self):
+        with self._lock:
+            self._accessed = {}
+
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM responses')
+
+    def _flush(self, connection):
+        # Writes the access times collected since the last flush
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+            self._flushed = time.monotonic()
+
+        if accessed:
+            connection.executemany(
+                'UPDATE responses SET accessed = ? WHERE key = ?', [(at, key) for key, at in accessed.items()])
+
+    def _evict(self, connection):
+        excess = connection.execute('SELECT size FROM totals').fetchone()[0] - self.max_size
+
+        # Remove the least recently used entries until the cache fits
+        while excess > 0:
+            rows = connection.execute('SELECT key, size FROM responses ORDER BY accessed LIMIT 64').fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                excess -= size
+                if excess <= 0:
+                    break
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,253 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import collections
+import logging
+import threading
+import time
+
+from ._error import ERROR_CIRCUIT_OPEN
+
+logger = logging.getLogger(__name__)
+
+CLOSED    = 'closed'
+OPEN      = 'open'
+HALF_OPEN = 'half-open'
+
+class CircuitOpenError(Exception):
+    '''
+    Raised instead of sending a request to a host whose circuit is open.
+
+    :ivar str host:
+        the host.
+    :ivar float retry_after:
+        the time, in seconds, until probe requests are let through again.
+    '''
+
+    def __init__(self, host, retry_after):
+        self.host = host
+        self.retry_after = retry_after
+        Exception.__init__(self, ERROR_CIRCUIT_OPEN.format(host, retry_after))
+
+class CircuitBreaker(object):
+    '''
+    Stops sending requests to an organization (host) that is failing or 
+    responding very slowly, so callers fail fast instead of each waiting 
+    for a timeout.
+
+    Every host has its own circuit. A closed circuit lets all requests 
+    through and tracks the outcome of the most recent ones. When too many 
+    of them failed (connection errors, timeouts and 5xx responses) or were 
+    slow, the circuit opens and requests are rejected immediately with a 
+    :class:`CircuitOpenError`. After ``open_duration`` the circuit is 
+    half-open: a limited number of probe requests is let through, and the 
+    circuit closes when they all succeed or opens again when one fails.
+
+    A single breaker can be shared by multiple clients and threads.
+    '''
+
+    def __init__(self, failure_rate=0.5, slow_call_rate=0.8, slow_call_duration=10.0, window=20, min_calls=10, open_duration=30.0, half_open_calls=3, clock=time.monotonic):
+        '''
+        :param float failure_rate:
+            the fraction of failed requests at which the circuit opens.
+        :param float slow_call_rate:
+            the fraction of slow requests at which the circuit opens.
+        :param float slow_call_duration:
+            the duration, in seconds, above which a request is slow.
+        :param int window:
+            the number of recent requests the rates are computed over.
+        :param int min_calls:
+            the number of requests required before the circuit can open.
+        :param float open_duration:
+            the time, in seconds, the circuit stays open before probing.
+        :param int half_open_calls:
+            the number of probe requests while half-open.
+        :param clock:
+            function returning the current time in seconds (for testing).
+        '''
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_duration = slow_call_duration
+        self.window = window
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._circuits = {}
+        self._listeners = []
+
+    def add_listener(self, listener):
+        '''
+        Registers a function that is called with the host, the previous 
+        state and the new state whenever a circuit changes state.
+        '''
+        with self._lock:
+            self._listeners.append(listener)
+
+    def get_state(self, host):
+        '''
+        :return: closed, open or half-open.
+        '''
+        with self._lock:
+            circuit = self._get_circuit(host)
+            events = self._check_open(host, circuit)
+            state = circuit.state
+
+        self._notify(events)
+        return state
+
+    def acquire(self, host):
+        '''
+        Lets a request to the host through, or raises CircuitOpenError. Every 
+        request that is let through must be followed by a call to ``record``.
+        '''
+        events = []
+        try:
+            with self._lock:
+                circuit = self._get_circuit(host)
+                events += self._check_open(host, circuit)
+
+                if circuit.state == OPEN:
+                    circuit.rejected += 1
+                    raise CircuitOpenError(host, circuit.opened + self.open_duration - self.clock())
+
+                if circuit.state == HALF_OPEN:
+                    if circuit.probes >= self.half_open_calls:
+                        circuit.rejected += 1
+                        raise CircuitOpenError(host, 0.0)
+                    circuit.probes += 1
+        finally:
+            self._notify(events)
+
+    def record(self, host, success, duration):
+        '''
+        Records the outcome of a request that was let through.
+
+        :param str host:
+            the host.
+        :param bool success:
+            False if the request failed.
+        :param float duration:
+            the duration of the request, in seconds.
+        '''
+        events = []
+        with self._lock:
+            circuit = self._get_circuit(host)
+            slow = duration >= self.slow_call_duration
+            circuit.calls += 1
+            circuit.failures += 0 if success else 1
+            circuit.slow_calls += 1 if slow else 0
+
+            if circuit.state == HALF_OPEN:
+                if not success or slow:
+                    events += self._transition(host, circuit, OPEN)
+                else:
+                    circuit.successes += 1
+                    if circuit.successes >= self.half_open_calls:
+                        events += self._transition(host, circuit, CLOSED)
+
+            elif circuit.state == CLOSED:
+                circuit.outcomes.append((success, slow))
+                if len(circuit.outcomes) >= self.min_calls:
+                    failures = sum(1 for success, _ in circuit.outcomes if not success)
+                    slow_calls = sum(1 for _, slow in circuit.outcomes if slow)
+                    if failures >= self.failure_rate * len(circuit.outcomes) or slow_calls >= self.slow_call_rate * len(circuit.outcomes):
+                        events += self._transition(host, circuit, OPEN)
+
+        self._notify(events)
+
+    def cancel(self, host):
+        '''
+        Releases a request that was let through but not completed for 
+        reasons unrelated to the host (e.g. the caller's deadline passed).
+        '''
+        with self._lock:
+            circuit = self._get_circuit(host)
+            if circuit.state == HALF_OPEN and circuit.probes > 0:
+                circuit.probes -= 1
+
+    def get_metrics(self):
+        '''
+        :return: a dict by host of dicts with the state and the number of 
+            requests, failures, slow requests, rejected requests and times 
+            the circuit opened.
+        '''
+        with self._lock:
+            metrics = {}
+            for host, circuit in self._circuits.items():
+                metrics[host] = {
+                    'state': circuit.state,
+                    'calls': circuit.calls,
+                    'failures': circuit.failures,
+                    'slow_calls': circuit.slow_calls,
+                    'rejected': circuit.rejected,
+                    'opened': circuit.times_opened
+                }
+            return metrics
+
+    def _get_circuit(self, host):
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _Circuit(self.window)
+        return circuit
+
+    def _check_open(self, host, circuit):
+        # An open circuit becomes half-open once the open duration has passed
+        if circuit.state == OPEN and self.clock() - circuit.opened >= self.open_duration:
+            return self._transition(host, circuit, HALF_OPEN)
+        return []
+
+    def _transition(self, host, circuit, state):
+        previous = circuit.state
+        circuit.state = state
+        circuit.probes = 0
+        circuit.successes = 0
+        circuit.outcomes.clear()
+
+        if state == OPEN:
+            circuit.opened = self.clock()
+            circuit.times_opened += 1
+
+        return [(host, previous, state)]
+
+    def _notify(self, events):
+        # Listeners are called outside the lock
+        for host, previous, state in events:
+            logger.warning('Circuit for %s changed from %s to %s', host, previous, state)
+            for listener in list(self._listeners):
+                listener(host, previous, state)
+
+class _Circuit(object):
+    def __init__(self, window):
+        self.state = CLOSED
+        self.outcomes = collections.deque(maxlen=window)
+        self.opened = 0.0
+        self.probes = 0
+        self.successes = 0
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
@@ -81,4 +81,8 @@ class LinkTypes(object):
     RELATED = 'System.LinkTypes.Related'
 
     ATTACHED_FILE = 'AttachedFile'
-    HYPERLINK     = 'Hyperlink'
\ No newline at end of file
+    HYPERLINK     = 'Hyperlink'
+
+class Priority(object):
+    INTERACTIVE = 0
+    BACKGROUND  = 10
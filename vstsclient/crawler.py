@@ -0,0 +1,145 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+
+from ._concurrency import _Workers, _get_executor, _iter_pages
+from ._deserialize import _parse_json_to_teams, _parse_json_to_team_members
+from ._error import _validate_not_none
+from .constants import StateFilter
+
+class CrawlResult(object):
+    '''
+    The members of a single team, as yielded by :class:`OrganizationCrawler`.
+
+    :ivar Project project:
+        the team project.
+    :ivar Team team:
+        the team.
+    :ivar list members:
+        the :class:`Identity` objects of the team members. Identities are 
+        deduplicated across teams, so the same person is the same object.
+    '''
+
+    def __init__(self, project, team, members):
+        self.project = project
+        self.team = team
+        self.members = members
+
+class OrganizationCrawler(object):
+    '''
+    Walks the projects, teams and team members of an organization (or 
+    collection) using a bounded pool of workers.
+
+    The crawler remembers the revision of every project it has crawled. When 
+    crawling incrementally, projects whose revision did not change since the 
+    previous crawl are skipped. The revisions can be persisted by the caller 
+    and passed back in to continue where a previous process left off.
+
+    :ivar dict revisions:
+        the last crawled revision per project id.
+    :ivar dict identities:
+        all identities seen so far, keyed by id.
+    '''
+
+    def __init__(self, client, max_workers=8, page_size=100, revisions=None):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param int max_workers:
+            the maximum number of concurrent requests.
+        :param int page_size:
+            the number of projects, teams and members to request per page.
+        :param dict revisions:
+            the project revisions of a previous crawl.
+        '''
+        _validate_not_none('client', client)
+
+        self.client = client
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.revisions = dict(revisions or {})
+        self.identities = {}
+        self._lock = threading.Lock()
+
+    def crawl(self, incremental=True):
+        '''
+        Crawls the organization and yields a :class:`CrawlResult` per team as 
+        soon as its members have been fetched.
+
+        :param bool incremental:
+            skip projects whose revision did not change since the last crawl.
+        '''
+        projects = _iter_pages(
+            lambda top, skip: self.client.get_projects(StateFilter.WELL_FORMED, top, skip), 
+            self.page_size,
+            executor=_get_executor(self.client)
+        )
+
+        with _Workers(self.max_workers, _get_executor(self.client)) as workers:
+            pending = {}
+
+            # Number of outstanding team requests per project id, a project 
+            # is only marked as crawled once all of its teams are done
+            outstanding = {}
+
+            for project in projects:
+                if incremental and self.revisions.get(project.id) == project.revision:
+                    continue
+                outstanding[project.id] = 1
+                pending[workers.submit(self._get_teams, project)] = (project, None)
+
+            while pending:
+                for future in workers.wait(pending):
+                    project, team = pending.pop(future)
+
+                    if team is None:
+                        teams = future.result()
+                        outstanding[project.id] += len(teams) - 1
+                        for team in teams:
+                            pending[workers.submit(self._get_members, project, team)] = (project, team)
+                    else:
+                        outstanding[project.id] -= 1
+                        yield CrawlResult(project, team, future.result())
+
+                    if outstanding[project.id] == 0:
+                        self.revisions[project.id] = project.revision
+
+    def _get_teams(self, project):
+        return list(_iter_pages(
+            lambda top, skip: _parse_json_to_teams(self.client.get_teams(project.id, top, skip)),
+            self.page_size,
+            prefetch=False
+        ))
+
+    def _get_members(self, project, team):
+        members = _iter_pages(
+            lambda top, skip: _parse_json_to_team_members(self.client.get_team_members(project.id, team.id, top, skip)),
+            self.page_size,
+            prefetch=False
+        )
+        return [self._deduplicate(member) for member in members]
+
+    def _deduplicate(self, identity):
+        with self._lock:
+            return self.identities.setdefault(identity.id, identity)
@@ -0,0 +1,278 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import contextvars
+import datetime
+import functools
+import inspect
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from ._error import ERROR_DEADLINE_EXCEEDED, ERROR_CANCELLED
+
+class DeadlineExceeded(TimeoutError):
+    '''
+    Raised when a call did not complete before its deadline.
+    '''
+    pass
+
+class Cancelled(Exception):
+    '''
+    Raised when a call was cancelled through its CancellationToken.
+    '''
+    pass
+
+class CancellationToken(object):
+    '''
+    Cancels the calls it is passed to, e.g. from another thread. Requests 
+    that have not been sent yet fail with :class:`Cancelled`; requests that 
+    are already on the wire complete, but their results are discarded.
+    '''
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def wait(self, timeout=None):
+        '''
+        Waits until the token is cancelled or the timeout passes.
+
+        :return: True if the token was cancelled.
+        '''
+        return self._event.wait(timeout)
+
+class Deadline(object):
+    '''
+    Bounds the time all requests made within its scope may take, and lets 
+    them be cancelled. Scopes can be nested: the earliest deadline applies 
+    and any of the tokens cancels.
+
+    The scope follows the work to the worker threads of composite calls 
+    (queries and hydration, crawls, batches), so the sub-requests share the 
+    remaining time: every request is sent with a timeout of at most the 
+    time that remains, and no request is sent once the deadline passed::
+
+        with Deadline(timeout=5.0, cancellation_token=token):
+            workitems = client.get_workitems_by_id(ids)
+            history = list(client.iter_history(ids))
+    '''
+
+    def __init__(self, timeout=None, deadline=None, cancellation_token=None):
+        '''
+        :param float timeout:
+            the time, in seconds, the scope may take from now.
+        :param deadline:
+            the time the scope must complete by, as a datetime or a 
+            ``time.monotonic()`` value.
+        :param CancellationToken cancellation_token:
+            optional token to cancel the scope.
+        '''
+        parent = _current.get()
+
+        expires = None
+        if timeout is not None:
+            expires = time.monotonic() + timeout
+        if deadline is not None:
+            expires = _to_monotonic(deadline) if expires is None else min(expires, _to_monotonic(deadline))
+        if parent is not None and parent.expires is not None:
+            expires = parent.expires if expires is None else min(expires, parent.expires)
+
+        tokens = parent.tokens if parent is not None else ()
+        if cancellation_token is not None:
+            tokens += (cancellation_token,)
+
+        self.expires = expires
+        self.tokens = tokens
+        self._reset = None
+
+    def __enter__(self):
+        self._reset = _current.set(self)
+        return self
+
+    def __exit__(self, *args):
+        _current.reset(self._reset)
+
+    @property
+    def cancelled(self):
+        return any(token.cancelled for token in self.tokens)
+
+    def remaining(self):
+        '''
+        :return: the time left, in seconds, or None without deadline.
+        '''
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0.0)
+
+    def check(self):
+        '''
+        Raises Cancelled or DeadlineExceeded if the scope is over.
+        '''
+        if self.cancelled:
+            raise Cancelled(ERROR_CANCELLED)
+        if self.expires is not None and time.monotonic() >= self.expires:
+            raise DeadlineExceeded(ERROR_DEADLINE_EXCEEDED)
+
+_current = contextvars.ContextVar('vstsclient.deadline', default=None)
+
+def _get_current():
+    return _current.get()
+
+def _check():
+    # Raises if the current scope is cancelled or past its deadline
+    scope = _current.get()
+    if scope is not None:
+        scope.check()
+
+def _get_timeout(timeout):
+    # Returns the timeout of the next request, bounded by the current scope
+    scope = _current.get()
+    remaining = scope.remaining() if scope is not None else None
+    if remaining is None:
+        return timeout
+    return remaining if timeout is None else min(timeout, remaining)
+
+def _sleep(seconds):
+    # Sleeps, but wakes up when the current scope is cancelled or expires
+    scope = _current.get()
+    if scope is None:
+        time.sleep(seconds)
+        return
+
+    scope.check()
+    remaining = scope.remaining()
+    if remaining is not None and remaining < seconds:
+        seconds = remaining
+
+    end = time.monotonic() + seconds
+    while True:
+        left = end - time.monotonic()
+        if left <= 0:
+            break
+        if scope.tokens:
+            # Wait on one token, and poll the others in short intervals
+            if scope.tokens[0].wait(min(left, 0.1) if len(scope.tokens) > 1 else left):
+                break
+            if scope.cancelled:
+                break
+        else:
+            time.sleep(left)
+    scope.check()
+
+def _wait_condition(condition, timeout=None):
+    # Waits on a condition held by the caller, but no longer than the current 
+    # scope has left, and raises when the scope is cancelled or expires. 
+    # Tokens can't wake the condition, so they are polled.
+    scope = _current.get()
+    if scope is None:
+        condition.wait(timeout)
+        return
+
+    scope.check()
+    for bound in (scope.remaining(), 0.1 if scope.tokens else None):
+        if bound is not None:
+            timeout = bound if timeout is None else min(timeout, bound)
+    condition.wait(timeout)
+    scope.check()
+
+def _wait(futures):
+    # Waits for at least one of the futures, but stops waiting when the 
+    # current scope is cancelled or expires
+    scope = _current.get()
+    if scope is None:
+        return wait(futures, return_when=FIRST_COMPLETED)[0]
+
+    while True:
+        scope.check()
+        remaining = scope.remaining()
+        done, _ = wait(futures, timeout=0.1 if remaining is None else min(0.1, remaining), return_when=FIRST_COMPLETED)
+        if done:
+            return done
+
+def _submit(executor, func, *args, **kwargs):
+    # Submits func with the current context, so the scope follows the work
+    context = contextvars.copy_context()
+    return executor.submit(context.run, func, *args, **kwargs)
+
+def _to_monotonic(deadline):
+    if isinstance(deadline, datetime.datetime):
+        now = datetime.datetime.now(deadline.tzinfo) if deadline.tzinfo is not None else datetime.datetime.now()
+        return time.monotonic() + (deadline - now).total_seconds()
+    return deadline
+
+def _accepts_deadline(cls):
+    # Class decorator, lets every public method accept timeout, deadline and 
+    # cancellation_token keyword arguments. Methods that have a parameter of 
+    # the same name keep it.
+    for name, func in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(func):
+            continue
+        setattr(cls, name, _with_deadline(func))
+    return cls
+
+def _with_deadline(func):
+    own = set(inspect.signature(func).parameters)
+    names = [name for name in ('timeout', 'deadline', 'cancellation_token') if name not in own]
+
+    def _pop(kwargs):
+        values = dict((name, kwargs.pop(name, None)) for name in names)
+        if not any(value is not None for value in values.values()):
+            return None
+        return Deadline(**values)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        scope = _pop(kwargs)
+        if scope is None:
+            return func(*args, **kwargs)
+
+        context = contextvars.copy_context()
+        context.run(scope.__enter__)
+        result = context.run(func, *args, **kwargs)
+
+        # Generators run after the call returns, in the same scope
+        if inspect.isgenerator(result):
+            return _iterate(context, result)
+        return result
+    return wrapper
+
+def _iterate(context, iterator):
+    # The scope is only active while the generator runs, not in between 
+    # items when the caller has control
+    try:
+        while True:
+            try:
+                item = context.run(next, iterator)
+            except StopIteration:
+                return
+            yield item
+    finally:
+        context.run(iterator.close)
@@ -0,0 +1,301 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+
+from ._concurrency import _chunks, _get_executor, _imap_unordered
+from ._error import _validate_not_none, ERROR_UNKNOWN_FORMAT
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+
+class WorkitemExporter(object):
+    '''
+    Exports the work items returned by a WIQL query to NDJSON, CSV or 
+    Apache Parquet.
+
+    The ids returned by the query are streamed, split into chunks of 
+    ``chunk_size`` ids and the chunks are fetched concurrently, only 
+    requesting the exported fields. Chunks are written as soon as they 
+    arrive while the next ones are being fetched, so rows are never all 
+    held in memory. Rows are written in the order the chunks complete.
+
+    :ivar int rows:
+        the number of rows exported so far.
+    :ivar float elapsed:
+        the time spent exporting, in seconds.
+    '''
+
+    def __init__(self, client, fields, chunk_size=200, max_workers=8, progress=None):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param list fields:
+            the reference names of the fields to export, e.g. System.Title. 
+            Every field becomes a column, after the System.Id column.
+        :param int chunk_size:
+            the number of work items per request (at most 200).
+        :param int max_workers:
+            the maximum number of concurrent requests.
+        :param progress:
+            optional function called with the exporter after every chunk.
+        '''
+        _validate_not_none('client', client)
+        _validate_not_none('fields', fields)
+
+        self.client = client
+        self.fields = [field for field in fields if field != 'System.Id']
+        self.columns = ['System.Id'] + self.fields
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.progress = progress
+
+        self.rows = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def throughput(self):
+        '''
+        The number of rows exported per second.
+        '''
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def export(self, query, output, format='ndjson', project_name=None):
+        '''
+        Runs the query and writes the work items it returns. For link 
+        queries (tree or direct links), the work items on either end of the 
+        links are written, once each.
+
+        :param str query:
+            the WIQL query.
+        :param output:
+            the path of the file to write, or a file object (text for NDJSON 
+            and CSV, binary for Parquet).
+        :param str format:
+            ndjson, csv or parquet. Parquet requires pyarrow.
+        :param str project_name:
+            optional team project to run the query in.
+        :return: the number of rows exported.
+        '''
+        _validate_not_none('query', query)
+        _validate_not_none('output', output)
+
+        if format not in FORMATS:
+            raise ValueError(ERROR_UNKNOWN_FORMAT.format(format, ', '.join(FORMATS)))
+
+        return self.export_ids(_iter_ids(self.client.iter_query(query, project_name)), output, format)
+
+    def export_ids(self, workitem_ids, output, format='ndjson'):
+        '''
+        Writes the work items with the given ids, see ``export``. Ids of 
+        work items that don't exist (anymore) are skipped.
+        '''
+        _validate_not_none('workitem_ids', workitem_ids)
+        _validate_not_none('output', output)
+
+        if format not in FORMATS:
+            raise ValueError(ERROR_UNKNOWN_FORMAT.format(format, ', '.join(FORMATS)))
+
+        count = 0
+        started = time.monotonic()
+
+        writer = _WRITERS[format](output, self.columns)
+        try:
+            chunks = _imap_unordered(
+                lambda chunk: self.client.get_workitems_by_id(chunk, fields=self.fields or None, error_policy='omit'),
+                _chunks(workitem_ids, self.chunk_size),
+                self.max_workers,
+                _get_executor(self.client)
+            )
+            for _, workitems in chunks:
+                writer.write([self._to_row(workitem) for workitem in workitems])
+                count += len(workitems)
+                with self._lock:
+                    self.rows += len(workitems)
+                    self.elapsed = time.monotonic() - started
+
+                if self.progress is not None:
+                    self.progress(self)
+        finally:
+            writer.close()
+            with self._lock:
+                self.elapsed = time.monotonic() - started
+        return count
+
+    def _to_row(self, workitem):
+        fields = workitem.fields or {}
+        return [workitem.id] + [fields.get(field) for field in self.fields]
+
+def _iter_ids(rows):
+    # Rows of flat queries reference a work item, rows of link queries a 
+    # link, of which every work item is the target once (roots without a 
+    # source)
+    seen = set()
+    for row in rows:
+        if 'id' in row:
+            yield row['id']
+            continue
+
+        target = row.get('target')
+        if target is not None and target['id'] not in seen:
+            seen.add(target['id'])
+            yield target['id']
+
+class _Writer(object):
+    # Opens the output if it is a path, and only closes what it opened
+    mode = 'w'
+
+    def __init__(self, output, columns):
+        self.columns = columns
+        self._owned = isinstance(output, (str, bytes, os.PathLike))
+        if self._owned:
+            output = open(output, self.mode, **({'newline': '', 'encoding': 'utf-8'} if 'b' not in self.mode else {}))
+        self.file = output
+
+    def write(self, rows):
+        raise NotImplementedError()
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+class _NdjsonWriter(_Writer):
+    def write(self, rows):
+        self.file.write(''.join(json.dumps(dict(zip(self.columns, row))) + '\n' for row in rows))
+
+class _CsvWriter(_Writer):
+    def __init__(self, output, columns):
+        super(_CsvWriter, self).__init__(output, columns)
+        self._writer = csv.writer(self.file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows([[_to_text(value) for value in row] for row in rows])
+
+class _ParquetWriter(_Writer):
+    # Rows are buffered into row groups, all columns but the id are strings 
+    # as the type of a field cannot be known from the values alone
+    mode = 'wb'
+
+    def __init__(self, output, columns, row_group_size=10000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('Exporting to Parquet requires pyarrow, install it with: pip install pyarrow')
+
+        super(_ParquetWriter, self).__init__(output, columns)
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(columns[0], pyarrow.int64())] + [(column, pyarrow.string()) for column in columns[1:]])
+        self._writer = pyarrow.parquet.ParquetWriter(self.file, self._schema)
+        self._row_group_size = row_group_size
+        self._rows = []
+
+    def write(self, rows):
+        self._rows.extend(rows)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            arrays = [self._pyarrow.array([row[0] for row in self._rows], self._pyarrow.int64())]
+            for index in range(1, len(self.columns)):
+                arrays.append(self._pyarrow.array([_to_text(row[index]) for row in self._rows], self._pyarrow.string()))
+            self._writer.write_table(self._pyarrow.Table.from_arrays(arrays, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        try:
+            self._flush()
+            self._writer.close()
+        finally:
+            super(_ParquetWriter, self).close()
+
+_WRITERS = {
+    'ndjson':  _NdjsonWriter,
+    'csv':     _CsvWriter,
+    'parquet': _ParquetWriter,
+}
+
+def _to_text(value):
+    # Identities and other structured values are written as JSON
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+def main(argv=None):
+    '''
+    Entry point of the vsts-export command.
+    '''
+    parser = argparse.ArgumentParser(prog='vsts-export', description='Exports the work items returned by a WIQL query.')
+    parser.add_argument('instance', help='e.g. dev.azure.com/contoso or tfs.contoso.com:8080')
+    parser.add_argument('query', help='the WIQL query')
+    parser.add_argument('output', help='the file to write, - for stdout (NDJSON and CSV only)')
+    parser.add_argument('--fields', default='System.Title,System.State', help='comma separated reference names of the fields to export')
+    parser.add_argument('--format', choices=FORMATS, help='defaults to the extension of the output file, or ndjson')
+    parser.add_argument('--project', help='the team project to run the query in')
+    parser.add_argument('--collection', default='DefaultCollection', help='the project collection (TFS)')
+    parser.add_argument('--token', default=os.environ.get('VSTS_PAT'), help='personal access token, defaults to $VSTS_PAT')
+    parser.add_argument('--workers', type=int, default=8, help='the number of concurrent requests')
+    parser.add_argument('--chunk-size', type=int, default=200, help='the number of work items per request')
+    parser.add_argument('--transport', default='requests', help='requests, urllib3 or http2')
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        parser.error('a personal access token is required, use --token or $VSTS_PAT')
+
+    format = args.format
+    if format is None:
+        extension = os.path.splitext(args.output)[1].lstrip('.').lower()
+        format = extension if extension in FORMATS else 'ndjson'
+
+    if args.output == '-' and format == 'parquet':
+        parser.error('Parquet cannot be written to stdout')
+
+    from .vstsclient import VstsClient
+    client = VstsClient(args.instance, args.token, args.collection, transport=args.transport)
+
+    last = [0.0]
+    def progress(exporter):
+        if exporter.elapsed - last[0] >= 1.0:
+            last[0] = exporter.elapsed
+            sys.stderr.write('{} rows, {:.0f} rows/s\n'.format(exporter.rows, exporter.throughput))
+
+    exporter = WorkitemExporter(client, [field.strip() for field in args.fields.split(',') if field.strip()], args.chunk_size, args.workers, progress)
+    exporter.export(args.query, sys.stdout if args.output == '-' else args.output, format, args.project)
+
+    sys.stderr.write('Exported {} rows in {:.1f}s ({:.0f} rows/s)\n'.format(exporter.rows, exporter.elapsed, exporter.throughput))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
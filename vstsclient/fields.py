@@ -0,0 +1,171 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import datetime
+import threading
+
+from ._error import (
+    _validate_not_none,
+    ERROR_FIELD_UNKNOWN,
+    ERROR_FIELD_READ_ONLY,
+    ERROR_FIELD_TYPE,
+    ERROR_FIELD_PICKLIST,
+    ERROR_INVALID_DOCUMENT
+)
+
+# Python types accepted for each field type, unknown field types are not checked
+_FIELD_TYPES = {
+    'string':          (str,),
+    'plainText':       (str,),
+    'html':            (str,),
+    'history':         (str,),
+    'treePath':        (str,),
+    'guid':            (str,),
+    'picklistString':  (str,),
+    'integer':         (int,),
+    'picklistInteger': (int,),
+    'double':          (int, float),
+    'picklistDouble':  (int, float),
+    'boolean':         (bool,),
+    'dateTime':        (str, datetime.datetime, datetime.date),
+    'identity':        (str, dict)
+}
+
+class FieldRegistry(object):
+    '''
+    A cache of the work item field definitions of an organization (or a 
+    project) that validates JsonPatchDocuments before they are sent.
+
+    The field definitions are loaded with a single request the first time 
+    they are needed. Picklists are loaded on demand and cached as well.
+
+    Assign a registry to :attr:`VstsClient.field_registry` to validate every 
+    document passed to ``create_workitem`` and ``update_workitem``.
+    '''
+
+    def __init__(self, client, project_name=None):
+        '''
+        :param VstsClient client:
+            the client used to load the field definitions.
+        :param str project_name:
+            load the fields of this project instead of the organization.
+        '''
+        _validate_not_none('client', client)
+
+        self.client = client
+        self.project_name = project_name
+        self._lock = threading.Lock()
+        self._fields = None
+        self._picklists = {}
+
+    def load(self):
+        '''
+        (Re)loads all field definitions.
+        '''
+        fields = {}
+        for field in self.client.get_fields(self.project_name):
+            fields[field.ref_name.lower()] = field
+            fields[field.name.lower()] = field
+
+        with self._lock:
+            self._fields = fields
+            self._picklists = {}
+
+    def get(self, name_or_ref_name):
+        '''
+        :param str name_or_ref_name:
+            the name (e.g. 'Story Points') or reference name (e.g. 
+            'Microsoft.VSTS.Scheduling.StoryPoints') of the field.
+        :return: the :class:`Field`, or None if it does not exist.
+        '''
+        if self._fields is None:
+            self.load()
+        return self._fields.get(name_or_ref_name.lower())
+
+    def get_allowed_values(self, field):
+        '''
+        :return: the values of the field's picklist, or None if the field 
+            does not have a picklist.
+        '''
+        if not field.is_picklist or field.picklist_id is None:
+            return None
+
+        with self._lock:
+            if field.picklist_id in self._picklists:
+                return self._picklists[field.picklist_id]
+
+        picklist = self.client.get_picklist(field.picklist_id)
+        items = picklist.get('items', []) if picklist else []
+
+        with self._lock:
+            self._picklists[field.picklist_id] = items
+        return items
+
+    def validate(self, document, bypass_rules=False):
+        '''
+        Validates the field operations of a JsonPatchDocument.
+
+        :param JsonPatchDocument document:
+            the document to validate.
+        :param bool bypass_rules:
+            allow updates of read-only fields, as the server does when 
+            rules are bypassed.
+        :raises ValueError: if one or more operations are invalid.
+        '''
+        errors = []
+        for operation in document:
+            errors.extend(self.validate_operation(operation, bypass_rules))
+
+        if errors:
+            raise ValueError(ERROR_INVALID_DOCUMENT.format(' '.join(errors)))
+
+    def validate_operation(self, operation, bypass_rules=False):
+        '''
+        :return: a list of error messages, empty if the operation is valid.
+        '''
+        if not operation.path.startswith('/fields/') or operation.op in ('test', 'copy', 'move'):
+            return []
+
+        name  = operation.path[len('/fields/'):]
+        field = self.get(name)
+        if field is None:
+            return [ERROR_FIELD_UNKNOWN.format(name)]
+
+        if field.read_only and not bypass_rules:
+            return [ERROR_FIELD_READ_ONLY.format(name)]
+
+        if operation.op == 'remove' or operation.value is None:
+            return []
+
+        expected = _FIELD_TYPES.get(field.type)
+        if expected is not None:
+            # bool is a subclass of int, but not a valid number
+            if not isinstance(operation.value, expected) or (isinstance(operation.value, bool) and bool not in expected):
+                return [ERROR_FIELD_TYPE.format(name, field.type, operation.value)]
+
+        if not field.is_picklist_suggested:
+            allowed = self.get_allowed_values(field)
+            if allowed is not None and operation.value not in allowed:
+                return [ERROR_FIELD_PICKLIST.format(name, operation.value)]
+
+        return []
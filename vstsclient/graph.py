@@ -0,0 +1,232 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import collections
+import re
+
+from ._concurrency import _chunks, _get_executor, _imap_unordered
+from ._error import _validate_not_none
+from .constants import LinkTypes
+
+_INVERSE_LINK_TYPES = {
+    LinkTypes.CHILD: LinkTypes.PARENT,
+    LinkTypes.PARENT: LinkTypes.CHILD,
+    LinkTypes.RELATED: LinkTypes.RELATED
+}
+
+_WORKITEM_URL = re.compile(r'/workItems/(\d+)$', re.IGNORECASE)
+
+class WorkitemGraph(object):
+    '''
+    An in-memory graph of work items and the links between them.
+
+    Links are stored as adjacency lists keyed by work item id and link type. 
+    Adding a hierarchy or related link also adds its inverse, so the graph 
+    can be traversed in both directions.
+
+    :ivar dict workitems:
+        the hydrated work items, keyed by id.
+    '''
+
+    def __init__(self):
+        self.workitems = {}
+        self._links = {}
+
+    @classmethod
+    def build(cls, client, workitem_ids, link_types=(LinkTypes.CHILD,), max_depth=None, max_workers=4, batch_size=200):
+        '''
+        Builds the graph by breadth-first expansion from the given work 
+        items. The work items of each level are fetched in batches, and the 
+        batches of a level are fetched concurrently.
+
+        :param VstsClient client:
+            the client used to fetch the work items.
+        :param list workitem_ids:
+            the ids of the work items to start from.
+        :param tuple link_types:
+            the link types to follow.
+        :param int max_depth:
+            the maximum number of levels to expand, None for no limit.
+        '''
+        _validate_not_none('client', client)
+        _validate_not_none('workitem_ids', workitem_ids)
+
+        graph = cls()
+        level = list(dict.fromkeys(int(id) for id in workitem_ids))
+        depth = 0
+
+        while level and (max_depth is None or depth <= max_depth):
+            next_level = []
+            batches = _imap_unordered(
+                lambda chunk: client.get_workitems_by_id(chunk, expand='relations'),
+                _chunks(level, batch_size),
+                max_workers,
+                _get_executor(client)
+            )
+            for _, workitems in batches:
+                for workitem in workitems:
+                    graph.workitems[workitem.id] = workitem
+                    for relation in workitem.relations or []:
+                        if relation['rel'] not in link_types:
+                            continue
+                        match = _WORKITEM_URL.search(relation['url'])
+                        if match is None:
+                            continue
+                        target = int(match.group(1))
+                        graph.add_link(workitem.id, target, relation['rel'])
+                        if target not in graph.workitems:
+                            next_level.append(target)
+
+            level = [id for id in dict.fromkeys(next_level) if id not in graph.workitems]
+            depth += 1
+
+        return graph
+
+    @classmethod
+    def from_query_result(cls, result):
+        '''
+        Builds the graph from the result of a link (tree or one-hop) query.
+        The work items themselves are not hydrated.
+        '''
+        _validate_not_none('result', result)
+
+        graph = cls()
+        for row in result.rows:
+            if row.get('source') and row.get('target') and row.get('rel'):
+                graph.add_link(row['source']['id'], row['target']['id'], row['rel'])
+        return graph
+
+    def add_link(self, source_id, target_id, link_type):
+        self._links.setdefault(source_id, {}).setdefault(link_type, set()).add(target_id)
+
+        inverse = _INVERSE_LINK_TYPES.get(link_type)
+        if inverse is not None:
+            self._links.setdefault(target_id, {}).setdefault(inverse, set()).add(source_id)
+
+    def get_links(self, workitem_id, link_type):
+        '''
+        :return: the ids of the work items linked to the work item.
+        '''
+        return set(self._links.get(workitem_id, {}).get(link_type, ()))
+
+    def get_children(self, workitem_id):
+        return self.get_links(workitem_id, LinkTypes.CHILD)
+
+    def get_parent(self, workitem_id):
+        parents = self.get_links(workitem_id, LinkTypes.PARENT)
+        return next(iter(parents)) if parents else None
+
+    def ancestors(self, workitem_id):
+        '''
+        :return: the ids of the parent, grandparent, etc. of the work item, 
+            closest first.
+        '''
+        return list(self._walk(workitem_id, LinkTypes.PARENT))
+
+    def descendants(self, workitem_id):
+        '''
+        :return: the ids of all children, grandchildren, etc. of the work 
+            item, in breadth-first order.
+        '''
+        return list(self._walk(workitem_id, LinkTypes.CHILD))
+
+    def find_cycles(self, link_type=LinkTypes.CHILD):
+        '''
+        :return: a list of cycles, each cycle being a list of work item ids.
+        '''
+        cycles = []
+        state = {}  # id -> 1 while on the stack, 2 when done
+
+        for start in list(self._links):
+            if start in state:
+                continue
+
+            path = [start]
+            stack = [iter(sorted(self.get_links(start, link_type)))]
+            state[start] = 1
+            while stack:
+                target = next(stack[-1], None)
+                if target is None:
+                    state[path.pop()] = 2
+                    stack.pop()
+                elif state.get(target) == 1:
+                    cycles.append(path[path.index(target):])
+                elif target not in state:
+                    state[target] = 1
+                    path.append(target)
+                    stack.append(iter(sorted(self.get_links(target, link_type))))
+        return cycles
+
+    def rollup(self, field, link_type=LinkTypes.CHILD):
+        '''
+        Sums a numeric field up the hierarchy, e.g. the story points of all 
+        descendants of an epic.
+
+        :param str field:
+            the reference name or path of the field, e.g. 
+            MicrosoftFields.STORY_POINTS.
+        :return: a dict with the total per work item id.
+        '''
+        if field.startswith('/fields/'):
+            field = field[len('/fields/'):]
+
+        totals = {}
+        for root in set(self.workitems) | set(self._links):
+            if root in totals:
+                continue
+
+            # Iterative post-order traversal, guarded against cycles
+            stack = [(root, False)]
+            visiting = set()
+            while stack:
+                workitem_id, expanded = stack.pop()
+                if workitem_id in totals:
+                    continue
+                children = self.get_links(workitem_id, link_type)
+                if not expanded:
+                    visiting.add(workitem_id)
+                    stack.append((workitem_id, True))
+                    stack.extend((child, False) for child in children if child not in totals and child not in visiting)
+                else:
+                    visiting.discard(workitem_id)
+                    total = self._get_value(workitem_id, field)
+                    total += sum(totals.get(child, 0) for child in children)
+                    totals[workitem_id] = total
+        return totals
+
+    def _get_value(self, workitem_id, field):
+        workitem = self.workitems.get(workitem_id)
+        if workitem is None or not workitem.fields:
+            return 0
+        return workitem.fields.get(field) or 0
+
+    def _walk(self, workitem_id, link_type):
+        seen  = {workitem_id}
+        queue = collections.deque([workitem_id])
+        while queue:
+            current = queue.popleft()
+            for target in sorted(self.get_links(current, link_type)):
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+                    yield target
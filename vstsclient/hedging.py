@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import collections
+import math
+import threading
+
+class HedgingPolicy(object):
+    '''
+    Decides when to hedge idempotent requests, i.e. when to send a duplicate 
+    request because the original one takes longer than usual. Whichever of 
+    the two responds first is used.
+
+    The hedging delay is a percentile of the latencies of recent requests. 
+    A budget caps the number of hedges to a fraction of all requests, so 
+    hedging cannot double the load on a slow server.
+
+    :ivar int requests:
+        the number of hedgeable requests sent.
+    :ivar int hedges:
+        the number of hedges sent.
+    :ivar int hedge_wins:
+        the number of hedges that responded before the original request.
+    '''
+
+    def __init__(self, percentile=95, min_delay=0.05, max_delay=5.0, budget=0.05, window=1000, min_samples=20):
+        '''
+        :param float percentile:
+            the latency percentile after which a hedge is sent.
+        :param float min_delay:
+            the lower bound of the hedging delay, in seconds.
+        :param float max_delay:
+            the upper bound of the hedging delay, in seconds. Also used until 
+            enough latencies have been recorded.
+        :param float budget:
+            the maximum fraction of requests that can be hedged.
+        :param int window:
+            the number of recent latencies the percentile is computed over.
+        :param int min_samples:
+            the number of latencies required before the percentile is used.
+        '''
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.min_samples = min_samples
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=window)
+        self._tokens = 1.0
+
+    def get_delay(self):
+        '''
+        :return: the time to wait for a response before hedging, in seconds.
+        '''
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.max_delay
+            latencies = sorted(self._latencies)
+
+        index = min(len(latencies) - 1, int(math.ceil(self.percentile / 100.0 * len(latencies))) - 1)
+        return min(self.max_delay, max(self.min_delay, latencies[max(0, index)]))
+
+    def record(self, latency):
+        '''
+        Records the latency of a completed request and adds to the budget.
+        '''
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            self._tokens = min(10.0, self._tokens + self.budget)
+
+    def try_hedge(self):
+        '''
+        :return: True if the budget allows for another hedge.
+        '''
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            self.hedges += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def get_metrics(self):
+        '''
+        :return: a dict with the number of requests, hedges and hedge wins.
+        '''
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins
+            }
@@ -0,0 +1,229 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import re
+import threading
+import time
+
+from ._error import _validate_not_none
+from .crawler import OrganizationCrawler
+
+class IdentityCache(object):
+    '''
+    An in-memory cache of the identities and team memberships of an 
+    organization (or collection). 
+
+    Identities are indexed by id, unique name and display name, and every 
+    identity is mapped to the teams it is a member of. The cache is loaded 
+    with :class:`OrganizationCrawler` and reloaded once it is older than the 
+    configured time-to-live, either on access or by a background thread.
+    '''
+
+    def __init__(self, client, ttl=300, max_workers=8, clock=time.monotonic):
+        '''
+        :param VstsClient client:
+            the client used to load the identities.
+        :param int ttl:
+            the time-to-live of the cache, in seconds.
+        :param int max_workers:
+            the maximum number of concurrent requests while loading.
+        '''
+        _validate_not_none('client', client)
+
+        self.client = client
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._loaded = threading.Condition(self._lock)
+        self._loading = False
+        self._loaded_at = None
+        self._indexes = None
+        self._stop = None
+
+    def refresh(self):
+        '''
+        Reloads all identities and team memberships.
+
+        Team memberships do not change the project revision, so this is 
+        always a full crawl. The new indexes replace the old ones atomically; 
+        readers are never blocked by a refresh in progress.
+        '''
+        crawler = OrganizationCrawler(self.client, self.max_workers)
+        indexes = _Indexes()
+        for result in crawler.crawl(incremental=False):
+            indexes.add(result.team, result.members)
+
+        with self._lock:
+            self._indexes = indexes
+            self._loaded_at = self._clock()
+
+    def start(self):
+        '''
+        Loads the cache and starts refreshing it in the background every 
+        ``ttl`` seconds.
+        '''
+        with self._lock:
+            if self._stop is not None:
+                return
+            self._stop = threading.Event()
+
+        self.refresh()
+        thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+        thread.start()
+
+    def stop(self):
+        '''
+        Stops the background refresh.
+        '''
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+                self._stop = None
+
+    def resolve(self, value):
+        '''
+        Resolves an identity by id, unique name, display name, an identity 
+        reference as returned in work item fields, or a 'Display Name 
+        <unique name>' string.
+
+        :return: the :class:`Identity`, or None if it is unknown.
+        '''
+        return self._get_indexes().resolve(value)
+
+    def resolve_many(self, values):
+        '''
+        Resolves many identities in a single pass over the cache.
+
+        :return: a list of :class:`Identity` objects (or None) in the order of 
+            the given values.
+        '''
+        indexes = self._get_indexes()
+        return [indexes.resolve(value) for value in values]
+
+    def get_teams(self, identity):
+        '''
+        :return: the teams the identity is a member of.
+        '''
+        indexes = self._get_indexes()
+        member  = indexes.resolve(identity)
+        if member is None:
+            return []
+        return [indexes.teams[team_id] for team_id in indexes.teams_by_member.get(member.id, ())]
+
+    def get_members(self, team_id):
+        '''
+        :return: the members of the team.
+        '''
+        indexes = self._get_indexes()
+        return [indexes.by_id[member_id] for member_id in indexes.members_by_team.get(team_id, ())]
+
+    def is_member(self, identity, team_id):
+        '''
+        :return: True if the identity is a member of the team.
+        '''
+        indexes = self._get_indexes()
+        member  = indexes.resolve(identity)
+        return member is not None and team_id in indexes.teams_by_member.get(member.id, ())
+
+    def _get_indexes(self):
+        with self._lock:
+            while True:
+                expired = self._loaded_at is None or self._clock() - self._loaded_at >= self.ttl
+                # The background thread keeps the cache fresh
+                if not expired or (self._stop is not None and self._indexes is not None):
+                    return self._indexes
+
+                if not self._loading:
+                    break
+
+                # Only one reader reloads, the others keep using the stale 
+                # indexes, or wait for the first load
+                if self._indexes is not None:
+                    return self._indexes
+                self._loaded.wait()
+
+            self._loading = True
+
+        # Reload outside the lock, so readers are not blocked by it
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._loading = False
+                self._loaded.notify_all()
+
+        return self._indexes
+
+    def _run(self, stop):
+        while not stop.wait(self.ttl):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the previous (stale) indexes, retry next time
+                pass
+
+class _Indexes(object):
+    def __init__(self):
+        self.by_id = {}
+        self.by_unique_name = {}
+        self.by_display_name = {}
+        self.teams = {}
+        self.teams_by_member = {}
+        self.members_by_team = {}
+
+    def add(self, team, members):
+        self.teams[team.id] = team
+        self.members_by_team[team.id] = [member.id for member in members]
+
+        for member in members:
+            self.by_id[member.id] = member
+            if member.unique_name:
+                self.by_unique_name[member.unique_name.lower()] = member
+            if member.display_name:
+                self.by_display_name.setdefault(member.display_name.lower(), member)
+            self.teams_by_member.setdefault(member.id, set()).add(team.id)
+
+    def resolve(self, value):
+        if value is None:
+            return None
+
+        # Identity reference, e.g. the value of System.AssignedTo
+        if isinstance(value, dict):
+            return self.resolve(value.get('id')) or self.resolve(value.get('uniqueName')) or self.resolve(value.get('displayName'))
+
+        # An Identity object
+        if hasattr(value, 'id'):
+            return self.by_id.get(value.id)
+
+        if value in self.by_id:
+            return self.by_id[value]
+
+        # 'Display Name <unique name>'
+        match = re.match(r'^(.*)<([^>]+)>\s*$', value)
+        if match:
+            return self.by_unique_name.get(match.group(2).lower()) or self.by_display_name.get(match.group(1).strip().lower())
+
+        key = value.lower()
+        return self.by_unique_name.get(key) or self.by_display_name.get(key)
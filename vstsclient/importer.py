@@ -0,0 +1,295 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import contextlib
+import csv
+import io
+import json
+import os
+import threading
+import time
+
+from ._concurrency import _get_executor, _imap_unordered
+from ._error import _validate_not_none
+from .models import JsonPatchDocument, JsonPatchOperation
+
+class WorkitemImporter(object):
+    '''
+    Creates work items in bulk, e.g. when migrating from another tracker, 
+    in a way that can be interrupted and resumed without creating duplicates.
+
+    Every row has a unique key in the source. Before a work item is created, 
+    the intent is written to an append-only journal and flushed to disk; the 
+    resulting work item id is recorded once it is created. The key is also 
+    added to the tags of the work item (e.g. ``import:1234``).
+
+    When the import is run again with the same journal, rows that completed 
+    are skipped without any request. Rows that were in flight when the 
+    import was interrupted are looked up by their tag first, and only created 
+    if they don't exist yet.
+
+    :ivar int imported:
+        the number of work items created.
+    :ivar int skipped:
+        the number of rows that were already imported.
+    :ivar int failed:
+        the number of rows that could not be imported, see ``errors``.
+    :ivar dict errors:
+        the errors of the rows that failed, by key.
+    :ivar float elapsed:
+        the time spent importing, in seconds.
+    '''
+
+    def __init__(self, client, project_name, workitem_type_name, journal_path, key, mapping=None, max_workers=8, batch_size=100, tag_prefix='import:', bypass_rules=False):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param str project_name:
+            the team project to create the work items in.
+        :param str workitem_type_name:
+            the type of the work items, e.g. Task.
+        :param str journal_path:
+            the path of the journal file, created if it doesn't exist.
+        :param key:
+            the name of the column that uniquely identifies a row, or a 
+            function that returns the key of a row.
+        :param mapping:
+            function that maps a row to a JsonPatchDocument or to a dict of 
+            field values by reference name. By default the row is used as 
+            the dict of field values.
+        :param int max_workers:
+            the maximum number of concurrent requests.
+        :param int batch_size:
+            the number of intents flushed to the journal at once.
+        :param str tag_prefix:
+            the prefix of the tag that holds the key of a row.
+        :param bool bypass_rules:
+            whether to bypass the work item type rules.
+        '''
+        _validate_not_none('client', client)
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('workitem_type_name', workitem_type_name)
+        _validate_not_none('journal_path', journal_path)
+        _validate_not_none('key', key)
+
+        self.client = client
+        self.project_name = project_name
+        self.workitem_type_name = workitem_type_name
+        self.journal_path = journal_path
+        self.key = key if callable(key) else (lambda row: row[key])
+        self.mapping = mapping
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.tag_prefix = tag_prefix
+        self.bypass_rules = bypass_rules
+
+        self.imported = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = {}
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def throughput(self):
+        '''
+        The number of work items created per second.
+        '''
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def run(self, rows):
+        '''
+        Imports the rows, skipping the ones that were imported before.
+
+        :param iterable rows:
+            the rows of the source, e.g. from ``read_ndjson`` or ``read_csv``.
+        :return: a dict of the ids of the work items created by this run, by key.
+        '''
+        _validate_not_none('rows', rows)
+
+        created = {}
+        started = time.monotonic()
+
+        with _Journal(self.journal_path) as journal:
+            try:
+                results = _imap_unordered(self._import, self._journal_intents(rows, journal), self.max_workers, _get_executor(self.client))
+                for (key, _, _), (id, error) in results:
+                    if error is None:
+                        journal.append([{ 'key': key, 'state': 'done', 'id': id }])
+                        created[key] = id
+                        with self._lock:
+                            self.imported += 1
+                    else:
+                        journal.append([{ 'key': key, 'state': 'failed', 'error': str(error) }])
+                        with self._lock:
+                            self.failed += 1
+                            self.errors[key] = error
+            finally:
+                with self._lock:
+                    self.elapsed += time.monotonic() - started
+        return created
+
+    def _journal_intents(self, rows, journal):
+        # Yields the rows that still need to be imported, after their intents 
+        # are on disk. Intents are written in batches to limit the number of 
+        # disk flushes.
+        batch = []
+        for row in rows:
+            key = str(self.key(row))
+
+            state = journal.states.get(key)
+            if state == 'done':
+                with self._lock:
+                    self.skipped += 1
+                continue
+
+            # A row that has been attempted before may have been created
+            batch.append((key, row, state is not None))
+            if len(batch) >= self.batch_size:
+                journal.append([{ 'key': key, 'state': 'intent' } for key, _, _ in batch], sync=True)
+                for item in batch:
+                    yield item
+                batch = []
+
+        if batch:
+            journal.append([{ 'key': key, 'state': 'intent' } for key, _, _ in batch], sync=True)
+            for item in batch:
+                yield item
+
+    def _import(self, item):
+        # Returns a tuple of the work item id and error, errors are recorded 
+        # in the journal rather than aborting the import
+        key, row, attempted = item
+        try:
+            if attempted:
+                id = self._find(key)
+                if id is not None:
+                    return id, None
+
+            workitem = self.client.create_workitem(self.project_name, self.workitem_type_name, self._to_document(key, row), self.bypass_rules)
+            return workitem.id, None
+        except Exception as e:
+            return None, e
+
+    def _find(self, key):
+        query = "SELECT [System.Id] FROM WorkItems WHERE [System.TeamProject] = '{}' AND [System.Tags] CONTAINS '{}'".format(
+            self.project_name.replace("'", "''"), (self.tag_prefix + key).replace("'", "''"))
+
+        result = self.client.query(query, self.project_name)
+        return result.rows[0]['id'] if result.rows else None
+
+    def _to_document(self, key, row):
+        document = self.mapping(row) if self.mapping is not None else row
+        if not isinstance(document, JsonPatchDocument):
+            fields = document
+            document = JsonPatchDocument()
+            for name, value in fields.items():
+                document.add(JsonPatchOperation('add', '/fields/{}'.format(name), value))
+        else:
+            document = JsonPatchDocument(document)
+
+        # Add the idempotency tag to the tags set by the mapping, if any
+        tag = self.tag_prefix + key
+        for index, operation in enumerate(document):
+            if operation.path == '/fields/System.Tags':
+                tags = '{}; {}'.format(operation.value, tag) if operation.value else tag
+                document[index] = JsonPatchOperation(operation.op, operation.path, tags)
+                return document
+
+        document.add(JsonPatchOperation('add', '/fields/System.Tags', tag))
+        return document
+
+class _Journal(object):
+    # Append-only log of JSON lines. The last record of a key is its state.
+
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        self._file = None
+
+    def __enter__(self):
+        complete = True
+        if os.path.exists(self.path):
+            with io.open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    complete = line.endswith('\n')
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # The last line may be incomplete after a crash
+                        continue
+                    self.states[record['key']] = record['state']
+
+        self._file = io.open(self.path, 'a', encoding='utf-8')
+        if not complete:
+            self._file.write('\n')
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def append(self, records, sync=False):
+        # Intents are synced before the requests are sent. Results are only 
+        # flushed, a lost result is recovered by looking up the tag.
+        self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+        for record in records:
+            self.states[record['key']] = record['state']
+
+def read_ndjson(source):
+    '''
+    Yields the rows of a newline delimited JSON file one at a time.
+
+    :param source:
+        the path of the file, or a file object.
+    '''
+    with _open(source) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def read_csv(source, **kwargs):
+    '''
+    Yields the rows of a CSV file one at a time, as dicts by column name.
+
+    :param source:
+        the path of the file, or a file object.
+    '''
+    with _open(source, newline='') as f:
+        for row in csv.DictReader(f, **kwargs):
+            yield row
+
+@contextlib.contextmanager
+def _open(source, **kwargs):
+    # Opens a path, but leaves a file object open
+    if not isinstance(source, (str, bytes, os.PathLike)):
+        yield source
+        return
+
+    with io.open(source, 'r', encoding='utf-8', **kwargs) as f:
+        yield f
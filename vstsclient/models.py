@@ -21,6 +21,26 @@
 # SOFTWARE.
 # -----------------------------------------------------------------------------
 
+import re
+
+class Team(object):
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.description = None
+        self.url = None
+        self.project_id = None
+        self.project_name = None
+
+class Identity(object):
+    def __init__(self):
+        self.id = None
+        self.display_name = None
+        self.unique_name = None
+        self.url = None
+        self.image_url = None
+        self.descriptor = None
+
 class WorkitemType(object):
     def __init__(self):
         self.id = None
@@ -37,12 +57,121 @@ class Project(object):
         self.visibility = 'private'
         self.capabilities = None
 
+class Operation(object):
+    def __init__(self):
+        self.id = None
+        self.status = None
+        self.url = None
+        self.result_message = None
+
+    @property
+    def completed(self):
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
 class Workitem(object):
     def __init__(self):
         self.id = None
         self.rev = 1
         self.url = None
         self.fields = None
+        self.relations = None
+        self._original_fields = {}
+        self._original_relations = []
+
+    def accept_changes(self):
+        # Snapshot the current state, changes are tracked against it. Every 
+        # work item read is snapshotted, so the copy is kept shallow: field 
+        # values are replaced rather than changed in place, only the 
+        # attributes of relations are.
+        self._original_fields = dict(self.fields or {})
+        self._original_relations = [_copy_relation(relation) for relation in self.relations or []]
+
+    def has_changes(self):
+        return len(self.get_changes(test_rev=False)) > 0
+
+    def add_tags(self, tags):
+        if self.fields is None:
+            self.fields = {}
+
+        current = [tag.strip() for tag in self.fields.get('System.Tags', '').split(';') if tag.strip()]
+        known   = set(tag.lower() for tag in current)
+        for tag in tags:
+            if tag.lower() not in known:
+                current.append(tag)
+                known.add(tag.lower())
+        self.fields['System.Tags'] = '; '.join(current)
+
+    def add_relation(self, rel, url, attributes=None):
+        if self.relations is None:
+            self.relations = []
+
+        relation = { 'rel': rel, 'url': url }
+        if attributes:
+            relation['attributes'] = attributes
+
+        key = _relation_key(relation)
+        for existing in self.relations:
+            if _relation_key(existing) == key:
+                return existing
+        self.relations.append(relation)
+        return relation
+
+    def remove_relation(self, rel, url):
+        key = _relation_key({ 'rel': rel, 'url': url })
+        self.relations = [r for r in (self.relations or []) if _relation_key(r) != key]
+
+    def add_hyperlink(self, url, comment=None):
+        return self.add_relation('Hyperlink', url, { 'comment': comment } if comment else None)
+
+    def get_changes(self, test_rev=True):
+        '''
+        Compares the fields and relations with the state the work item was 
+        fetched in and returns the smallest JsonPatchDocument that applies 
+        the local changes. Unless disabled, the document starts with a test 
+        on the revision, so the update fails if the work item was changed 
+        by somebody else in the meantime.
+        '''
+        doc = JsonPatchDocument()
+        if test_rev and self.id is not None:
+            doc.add(JsonPatchOperation('test', '/rev', self.rev))
+
+        # Fields
+        fields = self.fields or {}
+        for name, value in fields.items():
+            if name not in self._original_fields:
+                doc.add(JsonPatchOperation('add', '/fields/{}'.format(name), value))
+            elif self._original_fields[name] != value:
+                doc.add(JsonPatchOperation('replace', '/fields/{}'.format(name), value))
+
+        for name in self._original_fields:
+            if name not in fields:
+                doc.add(JsonPatchOperation('remove', '/fields/{}'.format(name), None))
+
+        # Relations, removed from the end so the indexes remain valid
+        current = dict((_relation_key(r), r) for r in (self.relations or []))
+        for index in reversed(range(len(self._original_relations))):
+            original = self._original_relations[index]
+            relation = current.pop(_relation_key(original), None)
+            if relation is None:
+                doc.add(JsonPatchOperation('remove', '/relations/{}'.format(index), None))
+            elif relation.get('attributes') != original.get('attributes'):
+                doc.add(JsonPatchOperation('replace', '/relations/{}/attributes'.format(index), relation.get('attributes')))
+
+        for relation in current.values():
+            doc.add(JsonPatchOperation('add', '/relations/-', relation))
+
+        return doc
+
+class WorkitemUpdate(object):
+    def __init__(self):
+        self.id = None
+        self.workitem_id = None
+        self.rev = None
+        self.revised_by = None
+        self.revised_date = None
+        self.fields = None
+        self.relations = None
+        self.url = None
 
 class Area(object):
     def __init__(self):
@@ -58,7 +187,7 @@ class Iteration(object):
         self.name = None
         self.structure_type = 'iteration'
         self.attributes = Attributes()
-        self.attributes.startDate = None,
+        self.attributes.startDate = None
         self.attributes.finishDate = None
         self.has_children = False
         self.children = []
@@ -79,6 +208,65 @@ class TestPlan(object):
         self.description = None
         self.start_date = None
         self.end_date = None
+        self.revision = None
+        self.root_suite_id = None
+        self._root_suite = None
+        self._loader = None
+
+    @property
+    def root_suite(self):
+        # The suite hierarchy is loaded on first access
+        if self._root_suite is None and self._loader is not None:
+            self._root_suite = self._loader(self)
+        return self._root_suite
+
+class TestSuite(object):
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.suite_type = None
+        self.parent_id = None
+        self.url = None
+        self.children = []
+        self.test_cases = []
+
+class TestCase(object):
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.url = None
+        self.points = []
+
+class TestPoint(object):
+    def __init__(self):
+        self.id = None
+        self.test_case_id = None
+        self.configuration = None
+        self.assigned_to = None
+        self.outcome = None
+        self.state = None
+        self.url = None
+
+class TestRun(object):
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.state = None
+        self.url = None
+        self.is_automated = False
+        self.total_tests = 0
+        self.passed_tests = 0
+
+class TestResult(object):
+    def __init__(self):
+        self.id = None
+        self.outcome = None
+        self.state = None
+        self.test_case_title = None
+        self.automated_test_name = None
+        self.duration_in_ms = None
+        self.error_message = None
+        self.url = None
 
 class QueryResult(object):
     def __init__(self):
@@ -111,4 +299,21 @@ class Field(object):
         self.is_identity = False
         self.is_picklist = False
         self.is_picklist_suggested = False
-        self.url = None
\ No newline at end of file
+        self.picklist_id = None
+        self.url = None
+
+_WORKITEM_URL = re.compile(r'/workItems/(-?\d+)$', re.IGNORECASE)
+
+def _copy_relation(relation):
+    copy = dict(relation)
+    if copy.get('attributes') is not None:
+        copy['attributes'] = dict(copy['attributes'])
+    return copy
+
+def _relation_key(relation):
+    # Links to work items are compared by id, the host and collection in 
+    # the url vary with the way the client is connected
+    match = _WORKITEM_URL.search(relation['url'])
+    if match is not None:
+        return (relation['rel'], int(match.group(1)))
+    return (relation['rel'], relation['url'].lower())
\ No newline at end of file
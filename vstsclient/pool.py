@@ -0,0 +1,277 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import collections
+import hashlib
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ._error import _validate_not_none
+from .deadline import _submit, _wait_condition
+from .transports import Urllib3Transport, _create_transport
+
+class VstsClientPool(object):
+    '''
+    Hands out clients for many organizations (or TFS collections) that share 
+    a single transport with its connections, a worker pool, a cache backend 
+    and a circuit breaker.
+
+    The number of concurrent requests is capped overall and per organization. 
+    When the overall cap is reached, waiting requests are served round-robin 
+    across organizations, so a busy organization cannot starve the others.
+
+    Clients are created on first use and dropped after ``idle_timeout`` 
+    seconds without requests.
+    '''
+
+    def __init__(self, max_concurrency=64, max_concurrency_per_org=8, transport=None, cache=None, circuit_breaker=None, rate_limiter=None, idle_timeout=600.0, clock=time.monotonic):
+        '''
+        :param int max_concurrency:
+            the maximum number of concurrent requests, and the size of the 
+            worker pool.
+        :param int max_concurrency_per_org:
+            the maximum number of concurrent requests per organization.
+        :param transport:
+            the shared transport, a Transport instance or the name of a 
+            built-in one. Defaults to urllib3, keeping up to max_concurrency 
+            connections per host.
+        :param cache:
+            optional shared response cache (e.g. MemoryCache or DiskCache).
+        :param CircuitBreaker circuit_breaker:
+            optional shared circuit breaker, which tracks every organization 
+            separately.
+        :param RateLimiter rate_limiter:
+            optional shared rate limiter.
+        :param float idle_timeout:
+            the time, in seconds, after which a client without requests is 
+            dropped.
+        :param clock:
+            function returning the current time in seconds (for testing).
+        '''
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self.transport = _create_transport(transport) if transport is not None else Urllib3Transport(maxsize=max_concurrency)
+        self.cache = cache
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.clock = clock
+
+        self.scheduler = _FairScheduler(max_concurrency, max_concurrency_per_org, clock)
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._created = {}
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_client(self, instance, personal_access_token, collection='DefaultCollection'):
+        '''
+        :return: the VstsClient of the organization, created on first use.
+        '''
+        _validate_not_none('instance', instance)
+        _validate_not_none('personal_access_token', personal_access_token)
+
+        key = (instance, collection, hashlib.sha256(personal_access_token.encode('utf-8')).hexdigest())
+
+        self.evict_idle()
+        executor = self._get_executor()
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                from .vstsclient import VstsClient
+                client = VstsClient(instance, personal_access_token, collection,
+                    rate_limiter    = self.rate_limiter,
+                    cache           = self.cache,
+                    transport       = self.transport,
+                    circuit_breaker = self.circuit_breaker)
+                client._http_client.scheduler = self.scheduler
+                # Composite operations and hedged requests run on the shared 
+                # worker pool, instead of each starting threads of their own
+                client.executor = executor
+                client._http_client.executor = client.executor
+                self._clients[key] = client
+                self._created[key] = self.clock()
+            return client
+
+    def submit(self, func, *args, **kwargs):
+        '''
+        Runs func on the shared worker pool, within the deadline and 
+        cancellation scope of the caller.
+
+        :return: a :class:`concurrent.futures.Future` of the result.
+        '''
+        return _submit(self._get_executor(), func, *args, **kwargs)
+
+    def evict_idle(self):
+        '''
+        Drops the clients that have not sent a request for idle_timeout seconds.
+
+        :return: the number of clients dropped.
+        '''
+        now = self.clock()
+        with self._lock:
+            idle = [key for key, client in self._clients.items()
+                    if now - self.scheduler.last_used(client.instance, self._created[key]) >= self.idle_timeout]
+            for key in idle:
+                client = self._clients.pop(key)
+                del self._created[key]
+                self.scheduler.forget(client.instance)
+            return len(idle)
+
+    def get_metrics(self):
+        '''
+        :return: a dict with the number of clients, and the number of active 
+            and waiting requests overall and by organization.
+        '''
+        metrics = self.scheduler.get_metrics()
+        with self._lock:
+            metrics['clients'] = len(self._clients)
+        return metrics
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+            return self._executor
+
+    def close(self):
+        '''
+        Waits for the submitted work to complete and closes the connections.
+        '''
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._clients = {}
+            self._created = {}
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.transport.close()
+
+class _FairScheduler(object):
+    # Limits the number of concurrent requests overall and per key. Waiting 
+    # requests are granted round-robin across keys, and first in, first out 
+    # within a key.
+
+    def __init__(self, limit, limit_per_key, clock=time.monotonic):
+        self.limit = limit
+        self.limit_per_key = limit_per_key
+        self.clock = clock
+
+        self._condition = threading.Condition()
+        self._active = 0
+        self._active_by_key = collections.Counter()
+        self._waiting = collections.OrderedDict()
+        self._last_used = {}
+
+    def acquire(self, key):
+        with self._condition:
+            if not self._waiting and self._can_run(key):
+                self._start(key)
+                return
+
+            waiter = [False]
+            self._waiting.setdefault(key, collections.deque()).append(waiter)
+            self._grant()
+            try:
+                while not waiter[0]:
+                    _wait_condition(self._condition)
+            except BaseException:
+                # The caller gave up (deadline or cancellation), give the 
+                # turn back if it was granted in the meantime
+                if waiter[0]:
+                    self.release(key)
+                else:
+                    self._remove_waiter(key, waiter)
+                raise
+
+    def release(self, key):
+        with self._condition:
+            self._active -= 1
+            self._active_by_key[key] -= 1
+            if not self._active_by_key[key]:
+                del self._active_by_key[key]
+            self._last_used[key] = self.clock()
+            self._grant()
+
+    def last_used(self, key, default):
+        # Keys with requests in progress count as used now
+        with self._condition:
+            if key in self._active_by_key or key in self._waiting:
+                return self.clock()
+            return self._last_used.get(key, default)
+
+    def forget(self, key):
+        with self._condition:
+            self._last_used.pop(key, None)
+
+    def get_metrics(self):
+        with self._condition:
+            return {
+                'active': self._active,
+                'waiting': sum(len(waiters) for waiters in self._waiting.values()),
+                'active_by_org': dict(self._active_by_key),
+                'waiting_by_org': dict((key, len(waiters)) for key, waiters in self._waiting.items())
+            }
+
+    def _remove_waiter(self, key, waiter):
+        waiters = self._waiting[key]
+        for index, other in enumerate(waiters):
+            if other is waiter:
+                del waiters[index]
+                break
+        if not waiters:
+            del self._waiting[key]
+        self._grant()
+
+    def _can_run(self, key):
+        return self._active < self.limit and self._active_by_key[key] < self.limit_per_key
+
+    def _start(self, key):
+        self._active += 1
+        self._active_by_key[key] += 1
+        self._last_used[key] = self.clock()
+
+    def _grant(self):
+        # Serves the keys in turn, a key that was served moves to the back
+        granted = False
+        while self._active < self.limit:
+            for key in self._waiting:
+                if self._active_by_key[key] < self.limit_per_key:
+                    break
+            else:
+                break
+
+            waiters = self._waiting.pop(key)
+            waiters.popleft()[0] = True
+            if waiters:
+                self._waiting[key] = waiters
+            self._start(key)
+            granted = True
+
+        if granted:
+            self._condition.notify_all()
@@ -0,0 +1,113 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ._error import _validate_not_none, ERROR_OPERATION_TIMEOUT
+from .deadline import _sleep, _submit
+
+class ProjectProvisioner(object):
+    '''
+    Creates team projects concurrently and waits until they can be used.
+
+    Creating a project queues an operation on the server. Every project 
+    returns a :class:`concurrent.futures.Future` that resolves to the 
+    :class:`Project` once the operation succeeded and the project is 
+    WellFormed, or fails with an :class:`OperationError` or ``TimeoutError``.
+
+    Azure DevOps processes only a few project creations at a time, so at 
+    most ``max_concurrent`` creations are in progress; the others wait 
+    before they are queued.
+
+    Use the provisioner as a context manager, or call :meth:`close` to wait 
+    for the pending creations.
+    '''
+
+    def __init__(self, client, max_concurrent=4, timeout=1800, interval=1.0, max_interval=15.0):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param int max_concurrent:
+            the maximum number of projects being created at the same time.
+        :param float timeout:
+            the maximum time, in seconds, to wait for a project once queued.
+        :param float interval:
+            the initial polling interval, in seconds.
+        :param float max_interval:
+            the maximum polling interval, in seconds.
+        '''
+        _validate_not_none('client', client)
+
+        self.client = client
+        self.timeout = timeout
+        self.interval = interval
+        self.max_interval = max_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def create_project(self, name, description, source_control_type='Git', template_type_id='6b724908-ef14-45cf-84f8-768b5384da45'):
+        '''
+        :return: a Future that resolves to the WellFormed :class:`Project`.
+        '''
+        _validate_not_none('name', name)
+        _validate_not_none('description', description)
+
+        return _submit(self._executor, self._create, name, description, source_control_type, template_type_id)
+
+    def create_projects(self, projects):
+        '''
+        :param iterable projects:
+            dicts with the arguments of ``create_project``.
+        :return: a list of Futures, in the order of the given projects.
+        '''
+        return [self.create_project(**project) for project in projects]
+
+    def close(self):
+        '''
+        Waits for all pending creations to complete.
+        '''
+        self._executor.shutdown(wait=True)
+
+    def _create(self, name, description, source_control_type, template_type_id):
+        started = time.monotonic()
+        operation = self.client.queue_project(name, description, source_control_type, template_type_id)
+        self.client.wait_for_operation(operation.id, self.timeout, self.interval, self.max_interval)
+
+        # The project may become WellFormed shortly after the operation succeeded
+        delay = self.interval
+        while True:
+            project = self.client.get_project(name)
+            if project.state is not None and project.state.lower() == 'wellformed':
+                return project
+
+            if time.monotonic() - started + delay > self.timeout:
+                raise TimeoutError(ERROR_OPERATION_TIMEOUT.format(operation.id, self.timeout))
+            _sleep(delay)
+            delay = min(delay * 1.5, self.max_interval)
@@ -0,0 +1,237 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import itertools
+
+from ._concurrency import _get_executor, _imap_unordered
+from ._conversion import _datetime_to_utc_string
+from ._error import _validate_not_none, ERROR_UNKNOWN_STRUCTURE, ERROR_NODE_NOT_FOUND
+
+class ProvisioningPlan(object):
+    '''
+    The changes needed to make the area or iteration tree of a project match 
+    the desired tree.
+
+    :ivar list create:
+        the (path, start_date, finish_date) of the nodes to create, parents 
+        before children.
+    :ivar list update:
+        the (path, start_date, finish_date) of the iterations whose dates change.
+    :ivar list delete:
+        the paths of the nodes to delete, only the topmost of every subtree.
+    '''
+
+    def __init__(self):
+        self.create = []
+        self.update = []
+        self.delete = []
+
+    @property
+    def has_changes(self):
+        return bool(self.create or self.update or self.delete)
+
+class TreeProvisioner(object):
+    '''
+    Provisions the areas or iterations of a project from a declarative spec.
+
+    The spec maps paths, relative to the project root, to the dates of the 
+    iteration, or None for areas and for iterations without dates::
+
+        {
+            'Release 1':          None,
+            'Release 1/Sprint 1': (date(2020, 1, 6), date(2020, 1, 24)),
+            'Release 1/Sprint 2': (date(2020, 1, 27), date(2020, 2, 14)),
+        }
+
+    Parents that are not in the spec are implied. The current tree is fetched 
+    once and compared with the spec; missing nodes are created level by level, 
+    with the nodes of one level created concurrently.
+    '''
+
+    def __init__(self, client, project_name, structure='areas', max_workers=8, depth=100):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param str project_name:
+            the team project.
+        :param str structure:
+            areas or iterations.
+        :param int max_workers:
+            the maximum number of concurrent requests.
+        :param int depth:
+            the depth to which the current tree is fetched.
+        '''
+        _validate_not_none('client', client)
+        _validate_not_none('project_name', project_name)
+
+        if structure not in ('areas', 'iterations'):
+            raise ValueError(ERROR_UNKNOWN_STRUCTURE.format(structure))
+
+        self.client = client
+        self.project_name = project_name
+        self.structure = structure
+        self.max_workers = max_workers
+        self.depth = depth
+
+    def get_tree(self):
+        '''
+        :return: a dict of the current nodes (Area or Iteration) by path, 
+            the root node by the empty path.
+        '''
+        if self.structure == 'areas':
+            root = self.client.get_areas(self.project_name, self.depth)
+        else:
+            root = self.client.get_iterations(self.project_name, self.depth)
+
+        nodes = { '': root }
+        pending = [('', root)]
+        while pending:
+            path, node = pending.pop()
+            for child in node.children:
+                child_path = '{}/{}'.format(path, child.name) if path else child.name
+                nodes[child_path] = child
+                pending.append((child_path, child))
+        return nodes
+
+    def plan(self, spec, delete=False):
+        '''
+        Compares the spec with the current tree.
+
+        :param dict spec:
+            the desired nodes, see ``TreeProvisioner``. A list of paths is 
+            accepted for areas.
+        :param bool delete:
+            whether nodes that are not in the spec are deleted.
+        :rtype: ProvisioningPlan
+        '''
+        _validate_not_none('spec', spec)
+        return self._plan(_normalize(spec), self.get_tree(), delete)
+
+    def apply(self, spec, delete=False, reclassify_path=''):
+        '''
+        Makes the tree match the spec.
+
+        :param dict spec:
+            the desired nodes, see ``TreeProvisioner``.
+        :param bool delete:
+            whether nodes that are not in the spec are deleted.
+        :param str reclassify_path:
+            the path of the node that the work items of deleted nodes are 
+            moved to, the project root by default.
+        :return: the plan that was applied.
+        :rtype: ProvisioningPlan
+        '''
+        _validate_not_none('spec', spec)
+
+        tree = self.get_tree()
+        plan = self._plan(_normalize(spec), tree, delete)
+
+        # Parents must exist before their children are created
+        for _, level in itertools.groupby(plan.create, key=lambda node: node[0].count('/')):
+            for _ in _imap_unordered(self._create, list(level), self.max_workers, _get_executor(self.client)):
+                pass
+
+        for _ in _imap_unordered(self._update, plan.update, self.max_workers, _get_executor(self.client)):
+            pass
+
+        if plan.delete:
+            # The node to reclassify to may just have been created
+            reclassify = _find(tree, reclassify_path) or _find(self.get_tree(), reclassify_path)
+            if reclassify is None:
+                raise ValueError(ERROR_NODE_NOT_FOUND.format(reclassify_path))
+
+            for _ in _imap_unordered(lambda path: self._delete(path, reclassify.id), plan.delete, self.max_workers, _get_executor(self.client)):
+                pass
+
+        return plan
+
+    def _plan(self, spec, tree, delete):
+        # Paths are case-insensitive
+        current = dict((path.lower(), (path, node)) for path, node in tree.items())
+        plan = ProvisioningPlan()
+
+        for path in sorted(spec, key=lambda path: (path.count('/'), path)):
+            dates = spec[path]
+            if path.lower() not in current:
+                plan.create.append((path, dates[0], dates[1]))
+            elif self.structure == 'iterations' and _dates_differ(current[path.lower()][1], dates):
+                plan.update.append((current[path.lower()][0], dates[0], dates[1]))
+
+        if delete:
+            wanted = set(path.lower() for path in spec)
+            for key, (path, _) in sorted(current.items()):
+                parent = key.rsplit('/', 1)[0] if '/' in key else ''
+                # Deleting a node deletes its children, skip those
+                if key and key not in wanted and (parent == '' or parent in wanted):
+                    plan.delete.append(path)
+
+        return plan
+
+    def _create(self, node):
+        path, start_date, finish_date = node
+        parent_path, _, name = path.rpartition('/')
+
+        if self.structure == 'areas':
+            return self.client.create_area(self.project_name, name, parent_path or None)
+        return self.client.create_iteration(self.project_name, name, start_date, finish_date, parent_path or None)
+
+    def _update(self, node):
+        path, start_date, finish_date = node
+        return self.client.update_iteration(self.project_name, path, start_date, finish_date)
+
+    def _delete(self, path, reclassify_id):
+        if self.structure == 'areas':
+            return self.client.delete_area(self.project_name, path, reclassify_id)
+        return self.client.delete_iteration(self.project_name, path, reclassify_id)
+
+def _normalize(spec):
+    # Returns a dict of (start_date, finish_date) by path, including implied parents
+    if not isinstance(spec, dict):
+        spec = dict((path, None) for path in spec)
+
+    nodes = {}
+    for path, dates in spec.items():
+        path = path.strip('/')
+        nodes[path] = tuple(dates) if dates is not None else (None, None)
+
+        parent = path.rpartition('/')[0]
+        while parent and parent not in nodes:
+            nodes[parent] = (None, None)
+            parent = parent.rpartition('/')[0]
+    return nodes
+
+def _find(tree, path):
+    path = path.strip('/').lower()
+    for key, node in tree.items():
+        if key.lower() == path:
+            return node
+    return None
+
+def _dates_differ(node, dates):
+    # Iterations without dates in the spec are left as they are
+    if dates == (None, None):
+        return False
+
+    current = (node.attributes.startDate, node.attributes.finishDate)
+    return [_datetime_to_utc_string(date) if date is not None else None for date in current] != \
+           [_datetime_to_utc_string(date) if date is not None else None for date in dates]
@@ -0,0 +1,169 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import heapq
+import itertools
+import threading
+import time
+
+from .constants import Priority
+from .deadline import _wait_condition
+
+class RateLimiter(object):
+    '''
+    A token bucket that sits in front of the HTTP client and adapts its rate 
+    to the resource usage headers returned by Azure DevOps.
+
+    A single instance can be shared by multiple clients and threads. Callers 
+    waiting for a token are served by priority first (see :class:`Priority`) 
+    and in arrival order second, so interactive calls overtake background 
+    crawls that are queued against the same limiter.
+
+    :ivar float rate:
+        the current number of requests per second.
+    :ivar float min_rate:
+        the lower bound the rate backs off to when throttled.
+    :ivar float max_rate:
+        the upper bound the rate recovers to.
+    :ivar float capacity:
+        the maximum number of tokens (burst size).
+    '''
+
+    def __init__(self, rate=10.0, min_rate=0.5, max_rate=100.0, burst=None, increase=0.5, decrease=0.5, clock=time.monotonic, wallclock=time.time):
+        '''
+        :param float rate:
+            the initial number of requests per second.
+        :param float min_rate:
+            the lower bound of the rate.
+        :param float max_rate:
+            the upper bound of the rate.
+        :param float burst:
+            the bucket capacity, defaults to one second worth of tokens.
+        :param float increase:
+            requests per second added after every unthrottled response.
+        :param float decrease:
+            factor the rate is multiplied with when the server delays requests.
+        '''
+        self.rate      = float(rate)
+        self.min_rate  = float(min_rate)
+        self.max_rate  = float(max_rate)
+        self.capacity  = float(burst) if burst is not None else max(1.0, self.rate)
+        self.increase  = increase
+        self.decrease  = decrease
+
+        self._clock     = clock
+        self._wallclock = wallclock
+        self._tokens    = self.capacity
+        self._updated   = clock()
+        self._blocked_until = 0.0
+
+        self._condition = threading.Condition()
+        self._waiters   = []
+        self._sequence  = itertools.count()
+
+    def acquire(self, priority=Priority.INTERACTIVE):
+        '''
+        Blocks until a token is available for the caller, or until the 
+        deadline of the caller passes or it is cancelled.
+
+        :param int priority:
+            the priority class of the request, lower values are served first.
+        '''
+        if priority is None:
+            priority = Priority.INTERACTIVE
+
+        with self._condition:
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        now = self._clock()
+                        self._refill(now)
+                        timeout = self._time_until_available(now)
+                        if timeout <= 0:
+                            self._tokens -= 1
+                            return
+                    _wait_condition(self._condition, timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def update(self, headers):
+        '''
+        Adapts the rate to the throttling headers of a response.
+
+        :param dict headers:
+            the response headers, with lower case names.
+        '''
+        retry_after = _get_float(headers, 'retry-after')
+        delay       = _get_float(headers, 'x-ratelimit-delay')
+        remaining   = _get_float(headers, 'x-ratelimit-remaining')
+        reset       = _get_float(headers, 'x-ratelimit-reset')
+
+        with self._condition:
+            now = self._clock()
+            self._refill(now)
+
+            if retry_after is not None and retry_after > 0:
+                self._block(now + retry_after)
+                self._slow_down()
+            elif delay is not None and delay > 0:
+                self._slow_down()
+            elif remaining is not None and remaining <= 0 and reset is not None:
+                # The resource budget is exhausted until the window resets,
+                # which is reported as a UNIX epoch timestamp
+                self._block(now + max(0.0, reset - self._wallclock()))
+                self._slow_down()
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+            self._condition.notify_all()
+
+    def _slow_down(self):
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = min(self._tokens, 1.0)
+
+    def _block(self, until):
+        self._blocked_until = max(self._blocked_until, until)
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _time_until_available(self, now):
+        blocked = self._blocked_until - now
+        missing = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+        return max(blocked, missing)
+
+def _get_float(headers, name):
+    if name not in headers:
+        return None
+    try:
+        return float(headers[name])
+    except (TypeError, ValueError):
+        return None
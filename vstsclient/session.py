@@ -0,0 +1,225 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import re
+import threading
+
+from ._concurrency import _chunks
+from ._error import _validate_not_none
+from .models import Workitem
+
+_TEMPORARY_URL = re.compile(r'/workItems/(-\d+)$', re.IGNORECASE)
+
+class WorkitemSession(object):
+    '''
+    A unit of work for work items.
+
+    The session keeps an identity map of the work items it has loaded, so 
+    every work item is fetched only once and the same object is returned on 
+    subsequent reads. Changes to work items, new work items and links are 
+    staged locally and sent on :meth:`commit` in as few batch requests as 
+    possible: new work items are created first, after which the updates and 
+    the links that refer to the newly created work items are sent.
+    '''
+
+    def __init__(self, client, batch_size=200):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param int batch_size:
+            the maximum number of work items per request (200 at most).
+        '''
+        _validate_not_none('client', client)
+
+        self.client = client
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._identity_map = {}
+        self._new = {}
+        self._next_id = -1
+
+    def get(self, workitem_id):
+        '''
+        :return: the :class:`Workitem`, fetched only if it is not in the session.
+        '''
+        return self.get_many([workitem_id])[0]
+
+    def get_many(self, workitem_ids):
+        '''
+        :return: the :class:`Workitem` objects in the order of the given ids, 
+            fetching the ones that are not in the session in batches.
+        '''
+        workitem_ids = [int(id) for id in workitem_ids]
+        with self._lock:
+            missing = [id for id in dict.fromkeys(workitem_ids) if id not in self._identity_map and id not in self._new]
+
+        for chunk in _chunks(missing, self.batch_size):
+            for workitem in self.client.get_workitems_by_id(chunk, expand='all'):
+                self.attach(workitem)
+
+        with self._lock:
+            return [self._identity_map.get(id) or self._new[id][2] for id in workitem_ids]
+
+    def query(self, query, project_name=None):
+        '''
+        Runs a WIQL query and returns the resulting work items from the session.
+        '''
+        result = self.client.query(query, project_name)
+
+        ids = []
+        for row in result.rows:
+            # Flat queries return ids, link queries return source/target pairs
+            for item in (row, row.get('source'), row.get('target')):
+                if item and 'id' in item:
+                    ids.append(item['id'])
+        return self.get_many(list(dict.fromkeys(ids)))
+
+    def attach(self, workitem):
+        '''
+        Adds a work item to the session. If the session already holds the 
+        same work item, the most recent revision without pending changes wins.
+
+        :return: the work item tracked by the session.
+        '''
+        with self._lock:
+            existing = self._identity_map.get(workitem.id)
+            if existing is None:
+                self._identity_map[workitem.id] = workitem
+                return workitem
+
+            if workitem.rev > existing.rev and not existing.has_changes():
+                _copy_state(workitem, existing)
+            return existing
+
+    def create(self, project_name, workitem_type_name, fields=None):
+        '''
+        Stages a new work item. Until the session is committed, the work item 
+        has a temporary negative id that can be used to link to it.
+        '''
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('workitem_type_name', workitem_type_name)
+
+        workitem = Workitem()
+        workitem.fields = dict(fields or {})
+        workitem.relations = []
+
+        with self._lock:
+            workitem.id = self._next_id
+            self._next_id -= 1
+            self._new[workitem.id] = (project_name, workitem_type_name, workitem)
+        return workitem
+
+    def add_link(self, from_workitem, to_workitem, link_type, comment=None):
+        '''
+        Stages a link between two work items of the session, which may be 
+        new work items that have not been created yet.
+        '''
+        _validate_not_none('from_workitem', from_workitem)
+        _validate_not_none('to_workitem', to_workitem)
+        _validate_not_none('link_type', link_type)
+
+        url = self.client.get_workitem_url(to_workitem.id)
+        return from_workitem.add_relation(link_type, url, { 'comment': comment } if comment else None)
+
+    def commit(self, bypass_rules=False):
+        '''
+        Sends all staged changes.
+
+        :raises HTTPError: the first error returned for any of the operations. 
+            Work items that were saved successfully are updated in the session.
+        '''
+        with self._lock:
+            new = list(self._new.values())
+            existing = list(self._identity_map.values())
+
+        errors = []
+
+        # Create the new work items first. Links to work items that don't 
+        # exist yet are held back until their ids are known.
+        operations = []
+        deferred = []
+        for project_name, workitem_type_name, workitem in new:
+            held_back = [r for r in workitem.relations if _is_temporary(r)]
+            workitem.relations = [r for r in workitem.relations if not _is_temporary(r)]
+            deferred.append((workitem, held_back))
+
+            doc = workitem.get_changes(test_rev=False)
+            operations.append((workitem, ('PATCH', '/{}/_apis/wit/workitems/${}'.format(project_name, workitem_type_name), doc)))
+
+        ids = {}
+        for workitem, result in self._send(operations, bypass_rules, errors):
+            temporary_id = workitem.id
+            _copy_state(result, workitem)
+            ids[temporary_id] = workitem.id
+            with self._lock:
+                del self._new[temporary_id]
+                self._identity_map[workitem.id] = workitem
+
+        # Re-add the held back links and point all links to new work items 
+        # to the ids they were created with
+        for workitem, held_back in deferred:
+            if workitem.relations is None:
+                workitem.relations = []
+            workitem.relations.extend(held_back)
+
+        for workitem in existing + [workitem for workitem, _ in deferred]:
+            for relation in workitem.relations or []:
+                match = _TEMPORARY_URL.search(relation['url'])
+                if match is not None and int(match.group(1)) in ids:
+                    relation['url'] = self.client.get_workitem_url(ids[int(match.group(1))])
+
+        # Then update all work items with pending changes
+        operations = []
+        for workitem in existing + [workitem for workitem, _ in deferred if workitem.id > 0]:
+            # Links to work items that failed to be created stay pending
+            if any(_is_temporary(r) for r in workitem.relations or []):
+                continue
+            doc = workitem.get_changes()
+            if any(operation.op != 'test' for operation in doc):
+                operations.append((workitem, ('PATCH', '/_apis/wit/workitems/{}'.format(workitem.id), doc)))
+
+        for workitem, result in self._send(operations, bypass_rules, errors):
+            _copy_state(result, workitem)
+
+        if errors:
+            raise errors[0]
+
+    def _send(self, operations, bypass_rules, errors):
+        for chunk in _chunks(operations, self.batch_size):
+            results = self.client.batch_workitems([operation for _, operation in chunk], bypass_rules)
+            for (workitem, _), result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    errors.append(result)
+                else:
+                    yield workitem, result
+
+def _is_temporary(relation):
+    return _TEMPORARY_URL.search(relation['url']) is not None
+
+def _copy_state(source, target):
+    target.id = source.id
+    target.rev = source.rev
+    target.url = source.url
+    target.fields = source.fields
+    target.relations = source.relations
+    target.accept_changes()
@@ -0,0 +1,127 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+
+from ._concurrency import _get_executor, _imap_unordered
+from ._error import _validate_not_none
+
+class TestPlanCrawler(object):
+    '''
+    Reads the test plans of a project as trees of suites, test cases and 
+    test points.
+
+    The plans returned by :meth:`get_testplans` are expanded lazily: the 
+    suite hierarchy of a plan is loaded when its ``root_suite`` is first 
+    accessed. The test cases and test points of all suites of a plan are 
+    fetched concurrently. The suites and test cases are cached by plan id and 
+    revision, so they are only crawled again after the plan has been 
+    changed. The test points are read on every call, as their outcomes 
+    change without changing the plan.
+    '''
+
+    # Not a test class, despite the name
+    __test__ = False
+
+    def __init__(self, client, project_name, max_workers=8):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param str project_name:
+            the team project.
+        :param int max_workers:
+            the maximum number of concurrent requests.
+        '''
+        _validate_not_none('client', client)
+        _validate_not_none('project_name', project_name)
+
+        self.client = client
+        self.project_name = project_name
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def get_testplans(self):
+        '''
+        :return: the :class:`TestPlan` objects of the project.
+        '''
+        testplans = self.client.get_testplans(self.project_name)
+        for testplan in testplans:
+            testplan._loader = self.get_tree
+        return testplans
+
+    def get_testplan(self, plan_id):
+        testplan = self.client.get_testplan(self.project_name, plan_id)
+        testplan._loader = self.get_tree
+        return testplan
+
+    def get_tree(self, testplan):
+        '''
+        :return: the root :class:`TestSuite` of the plan, with all child 
+            suites, test cases and test points.
+        '''
+        key = (testplan.id, testplan.revision)
+        with self._lock:
+            cached = self._cache.get(key)
+
+        if cached is None:
+            cached = self._get_suites(testplan)
+            with self._lock:
+                # Trees of older revisions of the plan are no longer needed
+                for previous in [k for k in self._cache if k[0] == testplan.id]:
+                    del self._cache[previous]
+                self._cache[key] = cached
+        root, suites = cached
+
+        # The points are read every time, their outcomes change without 
+        # changing the revision of the plan
+        def fetch(suite):
+            return self.client.get_testpoints(self.project_name, testplan.id, suite.id)
+
+        for suite, points in _imap_unordered(fetch, suites, self.max_workers, _get_executor(self.client)):
+            by_case = {}
+            for point in points:
+                by_case.setdefault(point.test_case_id, []).append(point)
+            for case in suite.test_cases:
+                case.points = by_case.get(case.id, [])
+        return root
+
+    def _get_suites(self, testplan):
+        # The suite hierarchy and the test cases of all suites
+        suites = self.client.get_testsuites(self.project_name, testplan.id)
+        by_id  = dict((suite.id, suite) for suite in suites)
+
+        root = None
+        for suite in suites:
+            parent = by_id.get(suite.parent_id)
+            if parent is not None:
+                parent.children.append(suite)
+            if suite.id == testplan.root_suite_id or (root is None and parent is None):
+                root = suite
+
+        def fetch(suite):
+            return self.client.get_testcases(self.project_name, testplan.id, suite.id)
+
+        for suite, cases in _imap_unordered(fetch, suites, self.max_workers, _get_executor(self.client)):
+            suite.test_cases = cases
+        return root, suites
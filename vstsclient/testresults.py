@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import threading
+import time
+
+from ._concurrency import _chunks, _get_executor, _imap_unordered
+from ._error import _validate_not_none
+
+class TestResultPublisher(object):
+    '''
+    Publishes the results of a test run.
+
+    Results are consumed from any iterable (e.g. a generator reading a test 
+    report), split into chunks of ``chunk_size`` results and the chunks are 
+    uploaded concurrently. Only a limited number of chunks is in memory at 
+    any time.
+
+    :ivar int published:
+        the number of results published so far.
+    :ivar float elapsed:
+        the time spent publishing results, in seconds.
+    '''
+
+    # Not a test class, despite the name
+    __test__ = False
+
+    def __init__(self, client, project_name, run_id, chunk_size=1000, max_workers=4):
+        '''
+        :param VstsClient client:
+            the client used to make the requests.
+        :param str project_name:
+            the team project of the test run.
+        :param int run_id:
+            the id of the test run, see ``VstsClient.create_testrun``.
+        :param int chunk_size:
+            the number of results per request.
+        :param int max_workers:
+            the maximum number of concurrent uploads.
+        '''
+        _validate_not_none('client', client)
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('run_id', run_id)
+
+        self.client = client
+        self.project_name = project_name
+        self.run_id = run_id
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+        self.published = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def throughput(self):
+        '''
+        The number of results published per second.
+        '''
+        return self.published / self.elapsed if self.elapsed else 0.0
+
+    def publish(self, results):
+        '''
+        Publishes the results.
+
+        :param iterable results:
+            the results, as dicts (see ``VstsClient.add_testresults``).
+        :return: the number of results published.
+        '''
+        _validate_not_none('results', results)
+
+        count = 0
+        started = time.monotonic()
+        try:
+            uploads = _imap_unordered(
+                lambda chunk: self.client.add_testresults(self.project_name, self.run_id, chunk),
+                _chunks(results, self.chunk_size),
+                self.max_workers,
+                _get_executor(self.client)
+            )
+            for chunk, _ in uploads:
+                count += len(chunk)
+                with self._lock:
+                    self.published += len(chunk)
+        finally:
+            with self._lock:
+                self.elapsed += time.monotonic() - started
+        return count
+
+    def attach(self, filename, stream, result_id=None, comment=None):
+        '''
+        Attaches a file (e.g. a log) to the test run or one of its results. 
+        The file is streamed, not read into memory.
+        '''
+        return self.client.create_testrun_attachment(self.project_name, self.run_id, filename, stream, result_id, comment)
+
+    def complete(self, comment=None):
+        '''
+        Marks the test run as completed.
+        '''
+        return self.client.update_testrun(self.project_name, self.run_id, 'Completed', comment)
@@ -0,0 +1,432 @@
+# -----------------------------------------------------------------------------
+# The MIT License (MIT)
+# Copyright (c) 2020 Robbie Coenmans
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+
+import json
+import threading
+import time
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from ._http import HTTPResponse
+from ._error import ERROR_INCOMPLETE_BODY, ERROR_UNKNOWN_TRANSPORT
+
+# The size of the chunks in which streamed responses are read
+_CHUNK_SIZE = 64 * 1024
+
+# The most memory allocated for a response body before its data arrives
+_MAX_PREALLOCATED = 4 * 1024 * 1024
+
+class Transport(object):
+    '''
+    Sends a single HTTP request and returns the response. The client takes 
+    care of everything else (caching, hedging, rate limiting), so a transport 
+    only needs to put the request on the wire.
+
+    Transports are shared by all threads of a client and must be thread-safe.
+    '''
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        '''
+        :param str method:
+            the HTTP method (GET, POST, PATCH, ...).
+        :param str url:
+            the URL without the query string.
+        :param query:
+            the query string, as a str or dict.
+        :param dict headers:
+            the request headers.
+        :param body:
+            the request body, as bytes, str, an iterable of bytes or None.
+        :param float timeout:
+            the timeout, in seconds.
+        :param dict proxies:
+            the proxies per scheme, or None.
+        :param bool stream:
+            if True, the body of the response is an iterable of byte chunks 
+            that is read as it is consumed, and the response must be closed.
+        :return: the response, with lowercase header names.
+        :rtype: :class:`~vstsclient._http.HTTPResponse`
+        '''
+        raise NotImplementedError()
+
+    def close(self):
+        '''
+        Releases the connections held by the transport.
+        '''
+        pass
+
+class RequestsTransport(Transport):
+    '''
+    Sends requests with a requests session. This is the default transport.
+    '''
+
+    def __init__(self, session=None):
+        '''
+        :param requests.Session session:
+            session object created with requests library (or compatible). 
+            If omitted, a session is created on first use.
+        '''
+        self._lock = threading.Lock()
+        self._session = None
+
+        if session is not None:
+            self.session = session
+
+    @property
+    def session(self):
+        '''
+        The requests session, created on first use so that neither importing 
+        nor constructing the client pays for importing requests.
+        '''
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    self.session = requests.Session()
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        # By default, requests adds an Accept:*/* and Accept-Encoding to the session, 
+        # which causes issues with some Azure REST APIs. Removing these here gives us 
+        # the flexibility to add it back on a case by case basis.
+        if 'Accept' in session.headers:
+            del session.headers['Accept']
+
+        if 'Accept-Encoding' in session.headers:
+            del session.headers['Accept-Encoding']
+
+        self._session = session
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        response = self.session.request(method,
+                                        url,
+                                        params=query,
+                                        headers=headers,
+                                        data=body or None,
+                                        timeout=timeout,
+                                        proxies=proxies,
+                                        stream=True)
+
+        response_headers = {}
+        for key, name in response.headers.items():
+            response_headers[key.lower()] = name
+
+        if stream:
+            return HTTPResponse(int(response.status_code), response.reason, response_headers, response.iter_content(_CHUNK_SIZE), response.close)
+
+        try:
+            body = _read_body(response.iter_content(_CHUNK_SIZE), response_headers, int(response.status_code), method)
+        finally:
+            response.close()
+
+        return HTTPResponse(int(response.status_code), response.reason, response_headers, body)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+class Urllib3Transport(Transport):
+    '''
+    Sends requests with urllib3 directly, skipping the session, hooks and 
+    adapters of requests. Connections are kept alive in a pool per host.
+    '''
+
+    def __init__(self, maxsize=64):
+        '''
+        :param int maxsize:
+            the maximum number of connections kept alive per host.
+        '''
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._managers = {}
+
+    def _get_manager(self, url, proxies):
+        proxy = None
+        if proxies:
+            proxy = proxies.get(url.split(':', 1)[0])
+
+        manager = self._managers.get(proxy)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(proxy)
+                if manager is None:
+                    import urllib3
+
+                    if proxy is None:
+                        manager = urllib3.PoolManager(maxsize=self.maxsize)
+                    else:
+                        # urllib3 does not pick up the credentials from the proxy URL
+                        auth = urllib3.util.parse_url(proxy).auth
+                        proxy_headers = urllib3.make_headers(proxy_basic_auth=auth) if auth else None
+                        manager = urllib3.ProxyManager(proxy, maxsize=self.maxsize, proxy_headers=proxy_headers)
+                    self._managers[proxy] = manager
+        return manager
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        manager = self._get_manager(url, proxies)
+
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        response = manager.request(method,
+                                   _build_url(url, query),
+                                   body=body or None,
+                                   headers=headers,
+                                   timeout=timeout,
+                                   retries=False,
+                                   chunked=not isinstance(body, (bytes, type(None))),
+                                   preload_content=False)
+
+        response_headers = {}
+        for key, name in response.headers.items():
+            response_headers[key.lower()] = name
+
+        if stream:
+            return HTTPResponse(response.status, response.reason, response_headers, response.stream(_CHUNK_SIZE), lambda: _release(response))
+
+        try:
+            body = _read_body(response.stream(_CHUNK_SIZE), response_headers, response.status, method)
+        finally:
+            _release(response)
+
+        return HTTPResponse(response.status, response.reason, response_headers, body)
+
+    def close(self):
+        with self._lock:
+            for manager in self._managers.values():
+                manager.clear()
+            self._managers = {}
+
+class Http2Transport(Transport):
+    '''
+    Sends requests over HTTP/2 with httpx. Concurrent requests to the same host 
+    are multiplexed as streams over a single connection, instead of needing a 
+    connection each.
+
+    Requires httpx with HTTP/2 support (``pip install httpx[http2]``).
+    '''
+
+    def __init__(self, max_connections=10):
+        '''
+        :param int max_connections:
+            the maximum number of connections per proxy, each carrying many 
+            concurrent streams.
+        '''
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def _get_client(self, url, proxies):
+        proxy = None
+        if proxies:
+            proxy = proxies.get(url.split(':', 1)[0])
+
+        client = self._clients.get(proxy)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(proxy)
+                if client is None:
+                    try:
+                        import httpx
+                    except ImportError:
+                        raise ImportError('The HTTP/2 transport requires httpx, install it with: pip install httpx[http2]')
+
+                    client = httpx.Client(
+                        http2  = True,
+                        proxy  = proxy,
+                        limits = httpx.Limits(max_connections=self.max_connections))
+                    self._clients[proxy] = client
+        return client
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        client = self._get_client(url, proxies)
+
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        request = client.build_request(method,
+                                       url,
+                                       params=query or None,
+                                       headers=headers,
+                                       content=body or None,
+                                       timeout=timeout)
+        response = client.send(request, stream=True)
+
+        response_headers = {}
+        for key, name in response.headers.items():
+            response_headers[key.lower()] = name
+
+        if stream:
+            return HTTPResponse(response.status_code, response.reason_phrase, response_headers, response.iter_bytes(_CHUNK_SIZE), response.close)
+
+        try:
+            body = _read_body(response.iter_bytes(_CHUNK_SIZE), response_headers, response.status_code, method)
+        finally:
+            response.close()
+
+        return HTTPResponse(response.status_code, response.reason_phrase, response_headers, body)
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients = {}
+
+class InMemoryTransport(Transport):
+    '''
+    Answers requests with a handler function instead of sending them, for 
+    tests and benchmarks.
+
+    The handler is called with the method, URL (including the query string) 
+    and body, and returns either the response body, or a tuple of the status 
+    code and the body. Bodies that are not bytes or str are serialized as JSON.
+
+    :ivar list requests:
+        the (method, url, headers, body) of every request received.
+    '''
+
+    def __init__(self, handler, latency=0.0):
+        '''
+        :param handler:
+            the function that produces the responses.
+        :param float latency:
+            the time to wait before responding, in seconds.
+        '''
+        self.handler = handler
+        self.latency = latency
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send(self, method, url, query, headers, body, timeout, proxies, stream=False):
+        url = _build_url(url, query)
+
+        # Consume streamed bodies like a real transport would
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = b''.join(body)
+
+        with self._lock:
+            self.requests.append((method, url, dict(headers), body))
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        result = self.handler(method, url, body)
+        status = 200
+        if isinstance(result, tuple):
+            status, result = result
+
+        if result is None:
+            result = b''
+        elif isinstance(result, str):
+            result = result.encode('utf-8')
+        elif not isinstance(result, bytes):
+            result = json.dumps(result).encode('utf-8')
+
+        if stream:
+            result = _iter_chunks(result)
+
+        return HTTPResponse(status, 'OK' if status < 300 else 'Error', {'content-type': 'application/json'}, result)
+
+_TRANSPORTS = {
+    'requests': RequestsTransport,
+    'urllib3':  Urllib3Transport,
+    'http2':    Http2Transport,
+}
+
+def _create_transport(transport):
+    if transport is None:
+        return RequestsTransport()
+
+    if isinstance(transport, Transport):
+        return transport
+
+    if transport not in _TRANSPORTS:
+        raise ValueError(ERROR_UNKNOWN_TRANSPORT.format(transport, ', '.join(sorted(_TRANSPORTS))))
+
+    return _TRANSPORTS[transport]()
+
+def _read_body(chunks, headers, status=200, method='GET'):
+    # Copies the chunks into a single buffer as they arrive, instead of 
+    # keeping them all and joining them into a second copy. The buffer is 
+    # allocated up front when the length is known, up to a limit so a bogus 
+    # Content-Length can't claim the memory before any data arrives; beyond 
+    # that the buffer grows. The length of an encoded body is not the length 
+    # of the decoded chunks, so those grow the buffer from the start.
+    # Responses without a body (RFC 7230 3.3.3) may still announce the 
+    # length of the representation, e.g. a 304 or the response to a HEAD.
+    length = 0
+    if 'content-encoding' not in headers and not _is_bodyless(status, method):
+        length = int(headers.get('content-length') or 0)
+
+    buffer = bytearray(min(length, _MAX_PREALLOCATED))
+    size = 0
+    with memoryview(buffer) as view:
+        for chunk in chunks:
+            end = size + len(chunk)
+            if end > len(buffer):
+                break
+            view[size:end] = chunk
+            size = end
+        else:
+            chunk = None
+
+    # The remainder, when the body is larger than what was allocated
+    del buffer[size:]
+    if chunk is not None:
+        buffer += chunk
+        for chunk in chunks:
+            buffer += chunk
+
+    # The connection was closed before the whole body arrived
+    if len(buffer) < length:
+        raise ConnectionError(ERROR_INCOMPLETE_BODY.format(len(buffer), length))
+
+    return buffer
+
+def _is_bodyless(status, method):
+    return method == 'HEAD' or status < 200 or status in (204, 304)
+
+def _iter_chunks(data):
+    for i in range(0, len(data), _CHUNK_SIZE):
+        yield data[i:i + _CHUNK_SIZE]
+
+def _release(response):
+    # Only a fully read urllib3 response leaves a connection that can be 
+    # reused, otherwise the connection is closed
+    if response.isclosed():
+        response.release_conn()
+    else:
+        response.close()
+
+def _build_url(url, query):
+    if not query:
+        return url
+
+    if not isinstance(query, str):
+        query = urlencode(query)
+
+    return '{}?{}'.format(url, query)
@@ -21,9 +21,12 @@
 # SOFTWARE.
 # -----------------------------------------------------------------------------
 
-import requests
+import datetime
 import json
 import logging
+import time
+
+from urllib.parse import quote
 
 from ._http import HTTPRequest, HTTPError
 from ._http.httpclient import _HTTPClient
@@ -33,37 +36,63 @@ from ._deserialize import (
     _parse_json_to_workitemtypes,
     _parse_json_to_projects,
     _parse_json_to_project,
+    _parse_json_to_operation,
     _parse_json_to_workitem,
     _parse_json_to_workitems,
+    _parse_json_to_workitem_updates,
+    _parse_json_to_workitem_batch,
     _parse_json_to_iteration,
     _parse_json_to_area,
     _parse_json_to_query_result,
     _parse_json_to_attachment,
     _parse_json_to_testplan,
-    _parse_json_to_field
+    _parse_json_to_testplans,
+    _parse_json_to_testsuites,
+    _parse_json_to_testcases,
+    _parse_json_to_testpoints,
+    _parse_json_to_testrun,
+    _parse_json_to_testresults,
+    _parse_json_to_field,
+    _parse_json_to_fields
 )
 
+from ._concurrency import _iter_pages, _imap_unordered, _chunks
 from ._conversion import _datetime_to_utc_string
-from ._error import _validate_not_none
+from ._error import _validate_not_none, OperationError, ERROR_OPERATION_TIMEOUT, ERROR_WORKITEM_NOT_FOUND
+from ._serialization import _stream_json_with_base64
+from ._streaming import _iter_json_array
 from ._hosts import _is_new_azure_devops_host
+from .deadline import _accepts_deadline, _sleep, Cancelled, DeadlineExceeded
 
+from .constants import Priority
 from .models import JsonPatchDocument, JsonPatchOperation
 
+logger = logging.getLogger(__name__)
+
+@_accepts_deadline
 class VstsClient(object):
-    def __init__(self, instance, personal_access_token, collection='DefaultCollection'):
+    def __init__(self, instance, personal_access_token, collection='DefaultCollection', rate_limiter=None, priority=Priority.INTERACTIVE, hedging=None, cache=None, transport=None, circuit_breaker=None):
         _validate_not_none('instance', instance)
         _validate_not_none('personal_access_token', personal_access_token)
 
         self.instance = instance if _is_new_azure_devops_host(instance) else '{}/{}'.format(instance, collection)
         self.personal_access_token = personal_access_token      
+        self.priority = priority
+        self.field_registry = None
+        # The executor shared with the other clients of a VstsClientPool, 
+        # composite operations create their own when None
+        self.executor = None
+        # The transport connects on the first request
         self._http_client = _HTTPClient(
-            protocol = 'HTTPS',
-            session  = requests.Session(),
-            timeout  = 30,
+            protocol        = 'HTTPS',
+            timeout         = 30,
+            rate_limiter    = rate_limiter,
+            hedging         = hedging,
+            cache           = cache,
+            transport       = transport,
+            circuit_breaker = circuit_breaker,
         )
 
-        logging.basicConfig(level=logging.DEBUG, filename='vsts-client.log', filemode='w', format='%(name)s - %(levelname)s - %(message)s')
-
     def set_proxy(self, host, port, user, password):
         _validate_not_none('host', host)
         self._http_client.set_proxy(host, port, user, password)
@@ -101,6 +130,23 @@ class VstsClient(object):
         _validate_not_none('name', name)
         _validate_not_none('description', description)
 
+        request = self._create_project_request(name, description, source_control_type, template_type_id)
+        return self._perform_request(request, _parse_json_to_project)
+
+    # POST {account}.visualstudio.com/{collection}/_apis/projects?api-version=2.0-preview
+    def queue_project(self, name, description, source_control_type='Git', template_type_id='6b724908-ef14-45cf-84f8-768b5384da45'):
+        '''
+        Queues the creation of a project.
+
+        :return: the Operation that creates the project, see ``wait_for_operation``.
+        '''
+        _validate_not_none('name', name)
+        _validate_not_none('description', description)
+
+        request = self._create_project_request(name, description, source_control_type, template_type_id)
+        return self._perform_request(request, _parse_json_to_operation)
+
+    def _create_project_request(self, name, description, source_control_type, template_type_id):
         payload = {
             'name': name,
             'description': description,
@@ -119,7 +165,51 @@ class VstsClient(object):
         request.query   = 'api-version=2.0-preview'
         request.body    = json.dumps(payload)
         request.headers = {'content-type': 'application/json'}
-        return self._perform_request(request, _parse_json_to_project)
+        return request
+
+    # GET {account}.visualstudio.com/{collection}/_apis/operations/{operation_id}?api-version=5.0
+    def get_operation(self, operation_id):
+        _validate_not_none('operation_id', operation_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/_apis/operations/{}'.format(operation_id)
+        request.query   = 'api-version=5.0'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_operation)
+
+    def wait_for_operation(self, operation_id, timeout=600, interval=0.5, max_interval=10.0):
+        '''
+        Polls an operation until it completes. The polling interval grows 
+        by half after every poll that finds the operation unchanged, up to 
+        max_interval, and starts over when its status changes.
+
+        :return: the succeeded Operation.
+        :raises OperationError: if the operation failed or was cancelled.
+        :raises TimeoutError: if the operation did not complete within timeout seconds.
+        '''
+        _validate_not_none('operation_id', operation_id)
+
+        deadline = time.monotonic() + timeout
+        delay = interval
+        status = None
+        while True:
+            operation = self.get_operation(operation_id)
+            if operation.status == 'succeeded':
+                return operation
+            if operation.completed:
+                raise OperationError(operation)
+
+            if operation.status != status:
+                status = operation.status
+                delay = interval
+            else:
+                delay = min(delay * 1.5, max_interval)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(ERROR_OPERATION_TIMEOUT.format(operation_id, timeout))
+            _sleep(min(delay, remaining))
 
     # GET {account}.visualstudio.com/{collection}/{project}/_apis/wit/workItemTypes?api-version={version}
     def get_workitem_types(self, project_name):
@@ -169,8 +259,8 @@ class VstsClient(object):
         request.headers = {'content-type': 'application/json'}
         return self._perform_request(request, _parse_json_to_area)
 
-    # POST {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/areas?api-version=1.0
-    def create_area(self, project_name, name):
+    # POST {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/areas[/{parent}]?api-version=1.0
+    def create_area(self, project_name, name, parent_path=None):
         _validate_not_none('project_name', project_name)
         _validate_not_none('name', name)
 
@@ -181,6 +271,11 @@ class VstsClient(object):
         request.query   = 'api-version=1.0'
         request.body    = json.dumps(payload)
         request.headers = {'content-type': 'application/json'}
+
+        # Create the area under another area instead of the root
+        if parent_path:
+            request.path += '/{}'.format(parent_path)
+
         return self._perform_request(request, _parse_json_to_area)
 
     # DELETE {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/areas/{area}?$reclassifyId={id}&api-version=1.0
@@ -218,26 +313,52 @@ class VstsClient(object):
         request.headers = {'content-type': 'application/json'}
         return self._perform_request(request, _parse_json_to_iteration)
 
-    # POST {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/iterations?api-version=1.0
-    def create_iteration(self, project_name, name, start_date, finish_date):
+    # POST {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/iterations[/{parent}]?api-version=1.0
+    def create_iteration(self, project_name, name, start_date=None, finish_date=None, parent_path=None):
         _validate_not_none('project_name', project_name)
         _validate_not_none('name', name)
-        _validate_not_none('start_date', start_date)
-        _validate_not_none('finish_date', finish_date)
 
-        payload = {
-            'name': name,
-            'attributes': {
+        payload = { 'name': name }
+
+        # Iterations that group other iterations (e.g. releases) have no dates
+        if start_date is not None or finish_date is not None:
+            _validate_not_none('start_date', start_date)
+            _validate_not_none('finish_date', finish_date)
+            payload['attributes'] = {
                 'startDate': _datetime_to_utc_string(start_date),
                 'finishDate': _datetime_to_utc_string(finish_date)
             }
-        }
+
         request = HTTPRequest()
         request.method  = 'POST'
         request.path    = '/{}/_apis/wit/classificationNodes/iterations'.format(project_name)
         request.query   = 'api-version=1.0'
         request.body    = json.dumps(payload)
         request.headers = {'content-type': 'application/json'}
+
+        # Create the iteration under another iteration instead of the root
+        if parent_path:
+            request.path += '/{}'.format(parent_path)
+
+        return self._perform_request(request, _parse_json_to_iteration)
+
+    # PATCH {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/iterations/{iteration}?api-version=1.0
+    def update_iteration(self, project_name, iteration_path, start_date, finish_date):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('iteration_path', iteration_path)
+
+        payload = {
+            'attributes': {
+                'startDate': _datetime_to_utc_string(start_date) if start_date is not None else None,
+                'finishDate': _datetime_to_utc_string(finish_date) if finish_date is not None else None
+            }
+        }
+        request = HTTPRequest()
+        request.method  = 'PATCH'
+        request.path    = '/{}/_apis/wit/classificationNodes/iterations/{}'.format(project_name, iteration_path)
+        request.query   = 'api-version=1.0'
+        request.body    = json.dumps(payload)
+        request.headers = {'content-type': 'application/json'}
         return self._perform_request(request, _parse_json_to_iteration)
 
     # DELETE {account}.visualstudio.com/{collection}/{project}/_apis/wit/classificationNodes/iterations/{iteration}?$reclassifyId={id}&api-version=1.0
@@ -265,15 +386,55 @@ class VstsClient(object):
         return self.update_workitem(workitem_id, doc)
 
     # GET {account}.visualstudio.com/{collection}/_apis/wit/workitems?ids=297,299,300&api-version=1.0
-    def get_workitems_by_id(self, workitem_ids):
+    def get_workitems_by_id(self, workitem_ids, expand=None, fields=None, error_policy=None):
         _validate_not_none('workitem_ids', workitem_ids)
 
+        # Accept a list of ids as well as a comma separated string
+        if not isinstance(workitem_ids, str):
+            workitem_ids = ','.join(str(id) for id in workitem_ids)
+
+        request = self._create_workitems_request(workitem_ids, expand, fields, error_policy)
+        return self._perform_request(request, _parse_json_to_workitems)
+
+    # GET {account}.visualstudio.com/DefaultCollection/_apis/wit/workitems?ids={ids}
+    def iter_workitems_by_id(self, workitem_ids, expand=None, fields=None, chunk_size=200, error_policy=None):
+        '''
+        Yields the work items one at a time as they are read from the 
+        responses, so that only a single work item is held in memory. The ids 
+        are requested in chunks of chunk_size.
+        '''
+        _validate_not_none('workitem_ids', workitem_ids)
+
+        if isinstance(workitem_ids, str):
+            workitem_ids = workitem_ids.split(',')
+
+        for chunk in _chunks(workitem_ids, chunk_size):
+            request = self._create_workitems_request(','.join(str(id) for id in chunk), expand, fields, error_policy)
+            for value in self._perform_streaming_request(request, ('value',)):
+                # Omitted (missing or deleted) work items are returned as null
+                if value is not None:
+                    yield _parse_json_to_workitem(value)
+
+    def _create_workitems_request(self, workitem_ids, expand, fields, error_policy=None):
         request = HTTPRequest()
         request.method  = 'GET'
         request.path    = '/_apis/wit/workitems'
         request.query   = 'ids={}&api-version=1.0'.format(workitem_ids)
         request.headers = {'content-type': 'application/json'}
-        return self._perform_request(request, _parse_json_to_workitems)
+
+        # With errorPolicy=omit, missing or deleted ids don't fail the request 
+        # but are left out; the option requires a later API version
+        if error_policy is not None:
+            request.query = 'ids={}&errorPolicy={}&api-version=5.1'.format(workitem_ids, error_policy)
+
+        if expand is not None:
+            request.query += '&$expand={}'.format(expand)
+
+        # Only the given fields are returned, can't be combined with expand
+        if fields is not None:
+            request.query += '&fields={}'.format(','.join(fields))
+
+        return request
     
     # GET {account}.visualstudio.com/{collection}/_apis/wit/workitems/{workitem_id}?api-version=1.0
     def get_workitem(self, workitem_id):
@@ -286,12 +447,72 @@ class VstsClient(object):
         request.headers = {'content-type': 'application/json'}
         return self._perform_request(request, _parse_json_to_workitem)
 
+    # GET {account}.visualstudio.com/{collection}/_apis/wit/workitems/{workitem_id}/revisions?$top={top}&$skip={skip}&api-version=5.1
+    def get_revisions(self, workitem_id, top=200, skip=0):
+        _validate_not_none('workitem_id', workitem_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/_apis/wit/workitems/{}/revisions'.format(workitem_id)
+        request.query   = 'api-version=5.1&$expand=all&$top={}&$skip={}'.format(top, skip)
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_workitems)
+
+    # GET {account}.visualstudio.com/{collection}/_apis/wit/workitems/{workitem_id}/updates?$top={top}&$skip={skip}&api-version=5.1
+    def get_updates(self, workitem_id, top=200, skip=0):
+        _validate_not_none('workitem_id', workitem_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/_apis/wit/workitems/{}/updates'.format(workitem_id)
+        request.query   = 'api-version=5.1&$top={}&$skip={}'.format(top, skip)
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_workitem_updates)
+
+    def iter_revisions(self, workitem_id, page_size=200, prefetch=True):
+        _validate_not_none('workitem_id', workitem_id)
+
+        # The next page is fetched while the current one is being consumed
+        return _iter_pages(
+            lambda top, skip: self.get_revisions(workitem_id, top, skip), 
+            page_size, 
+            prefetch,
+            self.executor
+        )
+
+    def iter_updates(self, workitem_id, page_size=200, prefetch=True):
+        _validate_not_none('workitem_id', workitem_id)
+
+        return _iter_pages(
+            lambda top, skip: self.get_updates(workitem_id, top, skip), 
+            page_size, 
+            prefetch,
+            self.executor
+        )
+
+    def iter_history(self, workitem_ids, updates=False, max_workers=8):
+        _validate_not_none('workitem_ids', workitem_ids)
+
+        # Fetch the history of many work items concurrently, yielding 
+        # (workitem_id, [revisions or updates]) tuples as they complete
+        iterate = self.iter_updates if updates else self.iter_revisions
+        return _imap_unordered(
+            lambda workitem_id: list(iterate(workitem_id, prefetch=False)), 
+            workitem_ids, 
+            max_workers,
+            self.executor
+        )
+
     # PATCH {account}.visualstudio.com/{collection}/{project}/_apis/wit/workitems/${workItemTypeName}?api-version=1.0
     def create_workitem(self, project_name, workitem_type_name, document: JsonPatchDocument, bypass_rules=False):
         _validate_not_none('project_name', project_name)
         _validate_not_none('workitem_type_name', workitem_type_name)
         _validate_not_none('document', document)
 
+        # Fail fast on invalid field updates
+        if self.field_registry is not None:
+            self.field_registry.validate(document, bypass_rules)
+
         payload = []
         for operation in document:
             payload.append({ 'op': operation.op, 'path': operation.path, 'value': operation.value })
@@ -309,6 +530,10 @@ class VstsClient(object):
         _validate_not_none('id', id)
         _validate_not_none('document', document)
 
+        # Fail fast on invalid field updates
+        if self.field_registry is not None:
+            self.field_registry.validate(document, bypass_rules)
+
         payload = []
         for operation in document:
             payload.append({ 'op': operation.op, 'path': operation.path, 'value': operation.value })
@@ -321,6 +546,44 @@ class VstsClient(object):
         request.headers = {'content-type': 'application/json-patch+json'}
         return self._perform_request(request, _parse_json_to_workitem)
 
+    def save_workitem(self, workitem, bypass_rules=False):
+        _validate_not_none('workitem', workitem)
+
+        # Send all local changes in a single, minimal update
+        doc = workitem.get_changes()
+        if not any(operation.op != 'test' for operation in doc):
+            return workitem
+
+        return self.update_workitem(workitem.id, doc, bypass_rules)
+
+    # POST {account}.visualstudio.com/{collection}/_apis/wit/$batch?api-version=5.1
+    def batch_workitems(self, operations, bypass_rules=False):
+        _validate_not_none('operations', operations)
+
+        # Each operation is a (method, path, JsonPatchDocument) tuple, e.g. 
+        # ('PATCH', '/_apis/wit/workitems/13', doc). The server accepts 
+        # up to 200 operations per batch.
+        payload = []
+        for method, path, document in operations:
+            # Fail fast on invalid field updates, before any is sent
+            if self.field_registry is not None:
+                self.field_registry.validate(document, bypass_rules)
+
+            payload.append({
+                'method': method,
+                'uri': '{}?api-version=5.1&bypassRules={}'.format(path, bypass_rules),
+                'headers': { 'Content-Type': 'application/json-patch+json' },
+                'body': [{ 'op': operation.op, 'path': operation.path, 'value': operation.value } for operation in document]
+            })
+
+        request = HTTPRequest()
+        request.method  = 'POST'
+        request.path    = '/_apis/wit/$batch'
+        request.query   = 'api-version=5.1'
+        request.body    = json.dumps(payload)
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_workitem_batch)
+
     # DELETE {account}.visualstudio.com/{collection}/_apis/wit/workitems/{workitem_id}?api-version=1.0
     def delete_workitem(self, id: int):
         _validate_not_none('id', id)
@@ -412,7 +675,7 @@ class VstsClient(object):
                 '/relations/-', 
                 {
                     'rel': link_type,
-                    'url': '{}://{}/_apis/wit/workItems/{}'.format(self._http_client.protocol, self.instance, to_workitem_id),
+                    'url': self.get_workitem_url(to_workitem_id),
                     'attributes': {
                         'comment': comment
                     }
@@ -421,6 +684,63 @@ class VstsClient(object):
         )
         return self.update_workitem(from_workitem_id, doc)
 
+    def add_links(self, links, comment=None, max_workers=8, batch_size=200):
+        _validate_not_none('links', links)
+
+        # Group the (from_workitem_id, to_workitem_id, link_type) tuples by 
+        # source, so all new links of a work item are sent in one update
+        links_by_source = {}
+        for from_workitem_id, to_workitem_id, link_type in links:
+            links_by_source.setdefault(int(from_workitem_id), []).append((int(to_workitem_id), link_type))
+
+        attributes = { 'comment': comment } if comment else None
+
+        def link(chunk):
+            operations = []
+            results = {}
+            try:
+                workitems = self.get_workitems_by_id(chunk, expand='relations', error_policy='omit')
+            except (DeadlineExceeded, Cancelled):
+                raise
+            except Exception as e:
+                # Report the failure against every source of the chunk, the 
+                # other chunks carry on
+                return dict((workitem_id, e) for workitem_id in chunk)
+
+            for workitem_id in set(chunk) - set(workitem.id for workitem in workitems):
+                results[workitem_id] = HTTPError(404, ERROR_WORKITEM_NOT_FOUND.format(workitem_id), {}, b'')
+
+            for workitem in workitems:
+                # Links that already exist are skipped
+                for to_workitem_id, link_type in links_by_source[workitem.id]:
+                    workitem.add_relation(link_type, self.get_workitem_url(to_workitem_id), attributes)
+
+                doc = workitem.get_changes(test_rev=False)
+                if len(doc) == 0:
+                    results[workitem.id] = workitem
+                else:
+                    operations.append((workitem.id, ('PATCH', '/_apis/wit/workitems/{}'.format(workitem.id), doc)))
+
+            if operations:
+                try:
+                    updated = self.batch_workitems([operation for _, operation in operations])
+                except (DeadlineExceeded, Cancelled):
+                    raise
+                except Exception as e:
+                    updated = [e] * len(operations)
+                for (workitem_id, _), result in zip(operations, updated):
+                    results[workitem_id] = result
+            return results
+
+        # Returns the updated work item, or the HTTPError, per source
+        results = {}
+        for _, chunk_results in _imap_unordered(link, _chunks(links_by_source, batch_size), max_workers, self.executor):
+            results.update(chunk_results)
+        return results
+
+    def get_workitem_url(self, workitem_id):
+        return '{}://{}/_apis/wit/workItems/{}'.format(self._http_client.protocol, self.instance, workitem_id)
+
     # PATCH {account}.visualstudio.com/{collection}/_apis/wit/workitems/{workitem_id}?api-version=1.0
     def add_hyperlink(self, workitem_id, url, comment=None):
         _validate_not_none('workitem_id', workitem_id)
@@ -477,25 +797,25 @@ class VstsClient(object):
         return self.update_workitem(workitem_id, doc)
     
     # GET {account}.visualstudio.com/{collection}/_apis/projects/{project}/teams
-    def get_teams(self, project_name):
+    def get_teams(self, project_name, top=100, skip=0):
         _validate_not_none('project_name', project_name)
         
         request = HTTPRequest()
         request.method  = 'GET'
         request.path    = '/_apis/projects/{}/teams'.format(project_name)
-        request.query   = 'api-version=5.1&$expand=all'
+        request.query   = 'api-version=5.1&$expand=all&$top={}&$skip={}'.format(top, skip)
         request.headers = {'content-type': 'application/json'}
         return self._perform_request(request)
 
     # GET {account}.visualstudio.com/{collection}/_apis/projects/{project}/teams/{team_id}/members
-    def get_team_members(self, project_name, team_id):
+    def get_team_members(self, project_name, team_id, top=100, skip=0):
         _validate_not_none('project_name', project_name)
         _validate_not_none('team_id', team_id)
 
         request = HTTPRequest()
         request.method  = 'GET'
         request.path    = '/_apis/projects/{}/teams/{}/members'.format(project_name, team_id)
-        request.query   = 'api-version=5.1&$expand=all'
+        request.query   = 'api-version=5.1&$expand=all&$top={}&$skip={}'.format(top, skip)
         request.headers = {'content-type': 'application/json'}
         return self._perform_request(request)
 
@@ -524,10 +844,181 @@ class VstsClient(object):
         request.headers = {'content-type': 'application/json'}
         return self._perform_request(request, _parse_json_to_testplan)
 
+    # GET {account}.visualstudio.com/{collection}/{project}/_apis/testplan/plans?api-version=5.1-preview.1
+    def get_testplans(self, project_name):
+        _validate_not_none('project_name', project_name)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/{}/_apis/testplan/plans'.format(project_name)
+        request.query   = 'api-version=5.1-preview.1'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_testplans)
+
+    # GET {account}.visualstudio.com/{collection}/{project}/_apis/testplan/plans/{plan_id}?api-version=5.1-preview.1
+    def get_testplan(self, project_name, plan_id):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('plan_id', plan_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/{}/_apis/testplan/plans/{}'.format(project_name, plan_id)
+        request.query   = 'api-version=5.1-preview.1'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_testplan)
+
+    # GET {account}.visualstudio.com/{collection}/{project}/_apis/testplan/plans/{plan_id}/suites?api-version=5.1-preview.1
+    def get_testsuites(self, project_name, plan_id):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('plan_id', plan_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/{}/_apis/testplan/plans/{}/suites'.format(project_name, plan_id)
+        request.query   = 'api-version=5.1-preview.1'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_continued_request(request, _parse_json_to_testsuites)
+
+    # GET {account}.visualstudio.com/{collection}/{project}/_apis/testplan/plans/{plan_id}/suites/{suite_id}/testcase?api-version=5.1-preview.2
+    def get_testcases(self, project_name, plan_id, suite_id):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('plan_id', plan_id)
+        _validate_not_none('suite_id', suite_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/{}/_apis/testplan/plans/{}/suites/{}/testcase'.format(project_name, plan_id, suite_id)
+        request.query   = 'api-version=5.1-preview.2'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_continued_request(request, _parse_json_to_testcases)
+
+    # GET {account}.visualstudio.com/{collection}/{project}/_apis/testplan/plans/{plan_id}/suites/{suite_id}/testpoint?api-version=5.1-preview.2
+    def get_testpoints(self, project_name, plan_id, suite_id):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('plan_id', plan_id)
+        _validate_not_none('suite_id', suite_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/{}/_apis/testplan/plans/{}/suites/{}/testpoint'.format(project_name, plan_id, suite_id)
+        request.query   = 'api-version=5.1-preview.2'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_continued_request(request, _parse_json_to_testpoints)
+
+    # POST {account}.visualstudio.com/{collection}/{project}/_apis/test/runs?api-version=5.1
+    def create_testrun(self, project_name, name, plan_id=None, is_automated=True, build_id=None):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('name', name)
+
+        payload = {
+            'name': name,
+            'automated': is_automated,
+            'state': 'InProgress'
+        }
+        if plan_id is not None:
+            payload['plan'] = { 'id': plan_id }
+        if build_id is not None:
+            payload['build'] = { 'id': build_id }
+
+        request = HTTPRequest()
+        request.method  = 'POST'
+        request.path    = '/{}/_apis/test/runs'.format(project_name)
+        request.query   = 'api-version=5.1'
+        request.body    = json.dumps(payload)
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_testrun)
+
+    # GET {account}.visualstudio.com/{collection}/{project}/_apis/test/runs/{run_id}?api-version=5.1
+    def get_testrun(self, project_name, run_id):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('run_id', run_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/{}/_apis/test/runs/{}'.format(project_name, run_id)
+        request.query   = 'api-version=5.1'
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_testrun)
+
+    # PATCH {account}.visualstudio.com/{collection}/{project}/_apis/test/runs/{run_id}?api-version=5.1
+    def update_testrun(self, project_name, run_id, state='Completed', comment=None):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('run_id', run_id)
+
+        payload = { 'state': state }
+        if comment is not None:
+            payload['comment'] = comment
+
+        request = HTTPRequest()
+        request.method  = 'PATCH'
+        request.path    = '/{}/_apis/test/runs/{}'.format(project_name, run_id)
+        request.query   = 'api-version=5.1'
+        request.body    = json.dumps(payload)
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_testrun)
+
+    # POST {account}.visualstudio.com/{collection}/{project}/_apis/test/runs/{run_id}/results?api-version=5.1
+    def add_testresults(self, project_name, run_id, results):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('run_id', run_id)
+        _validate_not_none('results', results)
+
+        # Results are dicts, e.g. { 'testCaseTitle': 'Login', 'automatedTestName': 
+        # 'Tests.Login', 'outcome': 'Passed', 'state': 'Completed', 'durationInMs': 12 }
+        request = HTTPRequest()
+        request.method  = 'POST'
+        request.path    = '/{}/_apis/test/runs/{}/results'.format(project_name, run_id)
+        request.query   = 'api-version=5.1'
+        request.body    = json.dumps(list(results))
+        request.headers = {'content-type': 'application/json'}
+        return self._perform_request(request, _parse_json_to_testresults)
+
+    # POST {account}.visualstudio.com/{collection}/{project}/_apis/test/runs/{run_id}/[results/{result_id}/]attachments?api-version=5.1-preview.1
+    def create_testrun_attachment(self, project_name, run_id, filename, stream, result_id=None, comment=None, attachment_type='GeneralAttachment'):
+        _validate_not_none('project_name', project_name)
+        _validate_not_none('run_id', run_id)
+        _validate_not_none('filename', filename)
+        _validate_not_none('stream', stream)
+
+        payload = {
+            'fileName': filename,
+            'comment': comment,
+            'attachmentType': attachment_type
+        }
+
+        # The attachment is read from the (file-like) stream and sent base64 
+        # encoded as it is read, it is never held in memory as a whole
+        request = HTTPRequest()
+        request.method  = 'POST'
+        request.path    = '/{}/_apis/test/runs/{}/attachments'.format(project_name, run_id)
+        request.query   = 'api-version=5.1-preview.1'
+        request.body    = _stream_json_with_base64(payload, 'stream', stream)
+        request.headers = {'content-type': 'application/json'}
+
+        if result_id is not None:
+            request.path = '/{}/_apis/test/runs/{}/results/{}/attachments'.format(project_name, run_id, result_id)
+
+        return self._perform_request(request)
+
     # POST {account}.visualstudio.com/{collection}/[{project}/]_apis/wit/wiql?api-version=1.0
     def query(self, query, project_name=None):
         _validate_not_none('query', query)
 
+        request = self._create_query_request(query, project_name)
+        return self._perform_request(request, _parse_json_to_query_result)
+
+    # POST {account}.visualstudio.com/DefaultCollection/[{project}/]_apis/wit/wiql
+    def iter_query(self, query, project_name=None):
+        '''
+        Runs a query and yields its rows (work item or link references) as 
+        they are read from the response, rather than after parsing all of it.
+        '''
+        _validate_not_none('query', query)
+
+        request = self._create_query_request(query, project_name)
+        return self._perform_streaming_request(request, ('workItems', 'workItemRelations'))
+
+    def _create_query_request(self, query, project_name):
         request = HTTPRequest()
         request.method  = 'POST'
         request.path    = '/_apis/wit/wiql'
@@ -535,10 +1026,13 @@ class VstsClient(object):
         request.headers = { 'Content-Type': 'application/json' }
         request.body    = json.dumps({ 'query': query })
 
+        # WIQL queries are read-only and can be hedged
+        request.idempotent = True
+
         if project_name is not None:
             request.path = '/{}/_apis/wit/wiql'.format(project_name)
 
-        return self._perform_request(request, _parse_json_to_query_result)
+        return request
 
     # POST {account}.visualstudio.com/_apis/wit/fields?api-version=5.1
     def create_field(self, name, ref_name, project_name=None, description=None, field_type='string', field_usage='workItem', supported_operations=[], read_only=False, can_sort_by=True, is_queryable=True, is_identity=False, is_picklist=False, is_picklist_suggested=False, url=None):
@@ -588,6 +1082,30 @@ class VstsClient(object):
 
         return self._perform_request(request, _parse_json_to_field)
 
+    # GET {account}.visualstudio.com/{organization}/{project}/_apis/wit/fields?api-version=5.1
+    def get_fields(self, project_name=None):
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/_apis/wit/fields'
+        request.query   = 'api-version=5.1'
+        request.headers = { 'Content-Type': 'application/json' }
+
+        if project_name is not None:
+            request.path = '/{}/_apis/wit/fields'.format(project_name)
+
+        return self._perform_request(request, _parse_json_to_fields)
+
+    # GET {account}.visualstudio.com/{organization}/_apis/work/processes/lists/{listId}?api-version=5.1-preview.1
+    def get_picklist(self, picklist_id):
+        _validate_not_none('picklist_id', picklist_id)
+
+        request = HTTPRequest()
+        request.method  = 'GET'
+        request.path    = '/_apis/work/processes/lists/{}'.format(picklist_id)
+        request.query   = 'api-version=5.1-preview.1'
+        request.headers = { 'Content-Type': 'application/json' }
+        return self._perform_request(request)
+
     # DELETE {account}.visualstudio.com/{organization}/{project}/_apis/wit/fields/{fieldNameOrRefName}?api-version=5.1
     def delete_field(self, field_name_or_ref_name, project_name=None):
         _validate_not_none('field_name_or_ref_name', field_name_or_ref_name)
@@ -603,26 +1121,89 @@ class VstsClient(object):
 
         self._perform_request(request)
 
-    def _perform_request(self, request, parser=None):
-        request.host = self.instance
-        request.headers['Accept'] = 'application/json'
-        request.headers['Authorization'] = _get_auth_header(self.personal_access_token)
+    def _perform_request(self, request, parser=None, headers=None):
+        self._prepare_request(request)
         
-        logging.debug(request.body)
+        # Bodies are only formatted when debug logging is enabled
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(request.body)
 
         response = self._http_client.perform_request(request)
         
-        logging.debug(response.body.decode('UTF-8'))
+        # The response headers, for the callers that need them
+        if headers is not None:
+            headers.update(response.headers)
 
         if response.status >= 300:
+            if debug:
+                logger.debug(response.body.decode('UTF-8'))
             raise HTTPError(response.status, response.message, response.headers, response.body)
 
-        if response.body == b'':
+        if not response.body:
             return None
 
-        result = json.loads(response.body.decode('UTF-8'))
+        # Decode the body once, and let go of the raw bytes before the objects 
+        # are built, so that both are not held while the JSON is parsed
+        text = response.body.decode('UTF-8')
+        response = None
+
+        if debug:
+            logger.debug(text)
+
+        result = json.loads(text)
+        text = None
 
         if parser:
             return parser(result)
         
-        return result
\ No newline at end of file
+        return result
+
+    def _perform_continued_request(self, request, parser):
+        # Follows the continuation tokens of a listing that is returned in 
+        # pages, the values of all pages are parsed at once
+        values = []
+        token  = None
+        while True:
+            page = HTTPRequest()
+            page.method  = request.method
+            page.path    = request.path
+            page.query   = request.query
+            page.headers = dict(request.headers)
+            if token is not None:
+                page.query += '&continuationToken={}'.format(quote(token, safe=''))
+
+            headers = {}
+            result = self._perform_request(page, headers=headers)
+            if result is not None:
+                values.extend(result['value'])
+
+            token = headers.get('x-ms-continuation-token')
+            if not token:
+                return parser({ 'count': len(values), 'value': values })
+
+    def _perform_streaming_request(self, request, keys, parser=None):
+        # Yields the items of the array under one of the keys of the response 
+        # as they are read, parsing a single item at a time
+        self._prepare_request(request)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(request.body)
+
+        response = self._http_client.perform_request(request, stream=True)
+        try:
+            if response.status >= 300:
+                raise HTTPError(response.status, response.message, response.headers, b''.join(response.body))
+
+            for item in _iter_json_array(response.body, keys):
+                yield parser(item) if parser else item
+        finally:
+            response.close()
+
+    def _prepare_request(self, request):
+        request.host = self.instance
+        request.headers['Accept'] = 'application/json'
+        request.headers['Authorization'] = _get_auth_header(self.personal_access_token)
+
+        if request.priority is None:
+            request.priority = self.priority